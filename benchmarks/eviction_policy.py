@@ -0,0 +1,107 @@
+"""Compares the hit ratio of the LocalTTLCache eviction policies.
+
+The trace mixes a Zipf distributed working set with bursts of one-off keys,
+similar to a report job scanning a cached function with unique arguments.
+
+Run with `python benchmarks/eviction_policy.py`.
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import time
+
+import jwm.cache
+
+
+def zipf_scan_trace(
+    length: int,
+    universe: int,
+    skew: float,
+    scan_every: int,
+    scan_length: int,
+    seed: int = 0,
+) -> list[bytes]:
+    """Creates a request trace of Zipf distributed keys with periodic scans.
+
+    Args:
+        length (int): Number of Zipf distributed requests.
+        universe (int): Number of distinct Zipf distributed keys.
+        skew (float): Zipf exponent, higher values are more skewed.
+        scan_every (int): Number of Zipf requests between scans.
+        scan_length (int): Number of unique keys in each scan.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[bytes]: Keys in request order.
+    """
+    random_ = random.Random(seed)
+    cumulative = list(
+        itertools.accumulate(1 / pow(rank, skew) for rank in range(1, universe + 1))
+    )
+
+    trace: list[bytes] = []
+    scanned = 0
+    for index in range(length):
+        rank = bisect.bisect(cumulative, random_.random() * cumulative[-1])
+        trace.append(b"zipf-%d" % rank)
+
+        if (index + 1) % scan_every == 0:
+            trace.extend(b"scan-%d" % (scanned + i) for i in range(scan_length))
+            scanned += scan_length
+
+    return trace
+
+
+def hit_ratio(policy: str, trace: list[bytes], maxsize: int) -> float:
+    """Replays a trace against a LocalTTLCache, storing every miss.
+
+    Args:
+        policy (str): Eviction policy name.
+        trace (list[bytes]): Keys in request order.
+        maxsize (int): Cache maxsize.
+
+    Returns:
+        float: Proportion of requests that hit.
+    """
+    cache = jwm.cache.LocalTTLCache(maxsize=maxsize, policy=policy)
+
+    hits = 0
+    for key in trace:
+        if cache.get(b"benchmark", key) is not None:
+            hits += 1
+        else:
+            cache.set(b"benchmark", key, b"", ttl_seconds=3_600)
+
+    return hits / len(trace)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=200_000)
+    parser.add_argument("--universe", type=int, default=50_000)
+    parser.add_argument("--skew", type=float, default=0.9)
+    parser.add_argument("--scan-every", type=int, default=10_000)
+    parser.add_argument("--scan-length", type=int, default=5_000)
+    parser.add_argument("--maxsize", type=int, default=2_000)
+    arguments = parser.parse_args()
+
+    trace = zipf_scan_trace(
+        arguments.length,
+        arguments.universe,
+        arguments.skew,
+        arguments.scan_every,
+        arguments.scan_length,
+    )
+    print(f"{len(trace)} requests, maxsize {arguments.maxsize}")
+
+    for policy in ("lru", "wtinylfu"):
+        start = time.perf_counter()
+        ratio = hit_ratio(policy, trace, arguments.maxsize)
+        elapsed = time.perf_counter() - start
+        print(f"{policy:>10}: hit ratio {ratio:.3f} ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -289,3 +289,128 @@ def hash_bound(
         object_ = tuple((key, value) for key, value in sorted_arguments)
 
     return persistent_hash(object_)
+
+
+_MISSING = object()
+
+
+def make_key_builder(
+    signature: inspect.Signature,
+    *,
+    typed: bool = False,
+) -> typing.Callable[[tuple, dict], int]:
+    """Creates a function hashing call arguments identically to `hash_bound`
+    without binding them to the signature on every call.
+
+    Parameter order and defaults are resolved once. Calls passing only
+    positional arguments skip keyword matching entirely, calls the builder
+    cannot match cheaply, including invalid calls, fall back to
+    `Signature.bind` which also raises the usual TypeError.
+
+    Args:
+        signature (Signature): Signature of the function being called.
+        typed (bool, optional): Include types as part of the hash. Defaults to
+            False.
+
+    Returns:
+        Callable[[tuple, dict], int]: Function of positional and keyword
+            arguments returning their hash, trimmed to the systems Py_size_t.
+    """
+    positional: list[str] = []
+    defaults: list[typing.Any] = []
+    keyword_indexes: dict[str, int] = {}
+    var_positional: int | None = None
+    var_keyword: int | None = None
+    names: list[str] = []
+    for index, parameter in enumerate(signature.parameters.values()):
+        names.append(parameter.name)
+        default = parameter.default
+        if default is inspect.Parameter.empty:
+            default = _MISSING
+
+        match parameter.kind:
+            case inspect.Parameter.POSITIONAL_ONLY:
+                positional.append(parameter.name)
+            case inspect.Parameter.POSITIONAL_OR_KEYWORD:
+                positional.append(parameter.name)
+                keyword_indexes[parameter.name] = index
+            case inspect.Parameter.VAR_POSITIONAL:
+                var_positional = index
+                default = ()
+            case inspect.Parameter.KEYWORD_ONLY:
+                keyword_indexes[parameter.name] = index
+            case inspect.Parameter.VAR_KEYWORD:
+                var_keyword = index
+                default = _MISSING
+        defaults.append(default)
+
+    positional_count = len(positional)
+    # Positional parameters with defaults can only follow required ones
+    required_count = sum(default is _MISSING for default in defaults[:positional_count])
+    # Slots after the positional parameters, filled when no keywords are passed
+    trailing = tuple(defaults[positional_count:])
+    trailing_complete = all(
+        default is not _MISSING or index == var_keyword
+        for index, default in enumerate(trailing, positional_count)
+    )
+    # hash_bound hashes arguments sorted by parameter name
+    order = sorted(range(len(names)), key=names.__getitem__)
+    sorted_names = tuple(names[index] for index in order)
+
+    def slow(args: tuple, kwargs: dict) -> int:
+        return hash_bound(signature.bind(*args, **kwargs), typed=typed)
+
+    def hash_slots(slots: list[typing.Any]) -> int:
+        if typed:
+            object_ = tuple(
+                (name, type(slots[index]), slots[index])
+                for name, index in zip(sorted_names, order)
+            )
+        else:
+            object_ = tuple(
+                (name, slots[index]) for name, index in zip(sorted_names, order)
+            )
+        return persistent_hash(object_)
+
+    def build(args: tuple, kwargs: dict) -> int:
+        count = len(args)
+        if count > positional_count and var_positional is None:
+            return slow(args, kwargs)
+
+        if not kwargs:
+            if count < required_count or not trailing_complete:
+                return slow(args, kwargs)
+            slots = list(args[:positional_count])
+            slots.extend(defaults[count:positional_count])
+            slots.extend(trailing)
+            if var_positional is not None:
+                slots[var_positional] = args[positional_count:]
+            if var_keyword is not None:
+                slots[var_keyword] = {}
+            return hash_slots(slots)
+
+        slots = list(args[:positional_count])
+        given = len(slots)
+        slots.extend(defaults[given:])
+        if var_positional is not None:
+            slots[var_positional] = args[positional_count:]
+        extra: dict[str, typing.Any] = {}
+        for name, value in kwargs.items():
+            index = keyword_indexes.get(name, None)
+            if index is None:
+                if var_keyword is None:
+                    return slow(args, kwargs)
+                extra[name] = value
+            elif index < given:
+                # Multiple values for one parameter
+                return slow(args, kwargs)
+            else:
+                slots[index] = value
+        if var_keyword is not None:
+            slots[var_keyword] = extra
+        for slot in slots:
+            if slot is _MISSING:
+                return slow(args, kwargs)
+        return hash_slots(slots)
+
+    return build
@@ -1,6 +1,41 @@
+import copy
 import json
 import pickle
+import threading
+import time
 import typing
+import zlib
+
+# Optional in Python builds without the underlying libraries
+try:
+    import bz2
+except ModuleNotFoundError:
+    bz2 = None
+try:
+    import lzma
+except ModuleNotFoundError:
+    lzma = None
+
+COMPRESSION_MIN_SIZE: int = 1_024
+"Default smallest serialized size in bytes that CompressingSerializer compresses"
+
+_UNCOMPRESSED = 0
+_ALGORITHMS: dict[str, tuple[int, typing.Any]] = {
+    name: (header, module)
+    for name, header, module in (("zlib", 1, zlib), ("lzma", 2, lzma), ("bz2", 3, bz2))
+    if module is not None
+}
+_MODULES = {header: module for header, module in _ALGORITHMS.values()}
+
+
+def _compress(algorithm: str, data: bytes, level: int | None) -> bytes:
+    if level is None:
+        return _ALGORITHMS[algorithm][1].compress(data)
+    if algorithm == "zlib":
+        return zlib.compress(data, level)
+    if algorithm == "lzma":
+        return lzma.compress(data, preset=level)
+    return bz2.compress(data, level)
 
 
 class Serializer(typing.Protocol):
@@ -74,4 +109,161 @@ class JsonSerializer(Serializer):
         return json.dumps(obj).encode(self.encoding)
 
     def deserialize(self, value: bytes) -> typing.Any:
-        return json.loads(value.decode(self.encoding))
+        return json.loads(str(value, self.encoding))
+
+
+class IdentitySerializer(Serializer):
+    "Serializer keeping Python objects as they are, for in process caches."
+
+    def __init__(self, copy_values: bool = False) -> None:
+        """Creates an identity serializer, skipping serialization entirely.
+
+        Values are stored as live objects, so they can only be kept by
+        caches within the process such as LocalTTLCache. Size limits in bytes
+        only account for entry overhead and snapshots cannot be written.
+
+        Cached values are shared between callers, mutating a returned value
+        changes it for every later hit unless `copy_values` is set.
+
+        Args:
+            copy_values (bool, optional): Deep copy values when storing and
+                returning them so callers never share a cached object.
+                Defaults to False.
+        """
+        self.copy_values = copy_values
+
+    def serialize(self, obj: typing.Any) -> tuple[typing.Any]:
+        # Boxed so a None result is not mistaken for a miss
+        if self.copy_values:
+            return (copy.deepcopy(obj),)
+        return (obj,)
+
+    def deserialize(self, value: tuple[typing.Any]) -> typing.Any:
+        if self.copy_values:
+            return copy.deepcopy(value[0])
+        return value[0]
+
+
+class CompressionStats(typing.NamedTuple):
+    "Statistics about CompressingSerializer performance"
+
+    compressed: int
+    uncompressed: int
+    bytes_in: int
+    bytes_out: int
+    compress_seconds: float
+    decompress_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        "Serialized size divided by stored size, above one saves space."
+        return self.bytes_in / self.bytes_out if self.bytes_out > 0 else 1.0
+
+
+class CompressingSerializer(Serializer):
+    "Serializer wrapper compressing large values."
+
+    def __init__(
+        self,
+        inner: Serializer | None = None,
+        algorithm: typing.Literal["zlib", "lzma", "bz2"] = "zlib",
+        level: int | None = None,
+        min_size: int = COMPRESSION_MIN_SIZE,
+    ) -> None:
+        """Serializer wrapper compressing values of at least `min_size`
+        bytes, such as large pickled results stored in Redis.
+
+        Every value starts with a one byte header naming its algorithm, or
+        that it is uncompressed, so values written with any algorithm or
+        threshold can be read back. Values that do not shrink are stored
+        uncompressed.
+
+        Counts, sizes and the CPU time spent compressing and decompressing
+        are reported by `get_stats` to help tune `min_size`.
+
+        Args:
+            inner (Serializer | None, optional): Serializer whose output is
+                compressed. Defaults to None which uses PickleSerializer.
+            algorithm (Literal["zlib", "lzma", "bz2"], optional): Compression
+                algorithm. Defaults to "zlib".
+            level (int | None, optional): Compression level or lzma preset.
+                Defaults to None which uses the algorithm default.
+            min_size (int, optional): Smallest serialized size in bytes that
+                is compressed. Defaults to 1,024.
+        """
+        if algorithm not in _ALGORITHMS:
+            raise ValueError(f"Unavailable compression algorithm {algorithm!r}.")
+        if min_size < 0:
+            raise ValueError("min_size must be greater than or equal to zero.")
+
+        self.inner = PickleSerializer() if inner is None else inner
+        self.algorithm = algorithm
+        self.level = level
+        self.min_size = min_size
+
+        self._header = bytes((_ALGORITHMS[algorithm][0],))
+        self._lock = threading.Lock()
+        self._compressed = 0
+        self._uncompressed = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._compress_seconds = 0.0
+        self._decompress_seconds = 0.0
+
+    def serialize(self, obj: typing.Any) -> bytes:
+        data = self.inner.serialize(obj)
+
+        value = None
+        elapsed = 0.0
+        if len(data) >= self.min_size:
+            start = time.thread_time()
+            compressed = _compress(self.algorithm, data, self.level)
+            elapsed = time.thread_time() - start
+            if len(compressed) < len(data):
+                value = self._header + compressed
+        if value is None:
+            value = bytes((_UNCOMPRESSED,)) + data
+
+        with self._lock:
+            if value[0] == _UNCOMPRESSED:
+                self._uncompressed += 1
+            else:
+                self._compressed += 1
+            self._bytes_in += len(data)
+            self._bytes_out += len(value)
+            self._compress_seconds += elapsed
+        return value
+
+    def deserialize(self, value: bytes) -> typing.Any:
+        header = value[0]
+        data = memoryview(value)[1:]
+        if header == _UNCOMPRESSED:
+            return self.inner.deserialize(data)
+
+        module = _MODULES.get(header, None)
+        if module is None:
+            raise ValueError(f"Unknown or unavailable compression header {header}.")
+
+        start = time.thread_time()
+        data = module.decompress(data)
+        elapsed = time.thread_time() - start
+        with self._lock:
+            self._decompress_seconds += elapsed
+        return self.inner.deserialize(data)
+
+    def get_stats(self) -> CompressionStats:
+        """Gets statistics of the values serialized and deserialized so far.
+
+        Returns:
+            CompressionStats: Counts of compressed and uncompressed values,
+                serialized and stored bytes and CPU seconds spent.
+        """
+        with self._lock:
+            return CompressionStats(
+                self._compressed,
+                self._uncompressed,
+                self._bytes_in,
+                self._bytes_out,
+                self._compress_seconds,
+                self._decompress_seconds,
+            )
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import collections.abc
+import typing
+
+import jwm._cache.ttl.cache
+
+MAX_BATCH_SIZE: int = 1_000
+"Default number of distinct keys that dispatches a batch immediately"
+
+
+class BatchingAsyncTTLCache(jwm._cache.ttl.cache.AsyncTTLCache):
+    "Async TTL Cache that coalesces concurrent gets into one get_many."
+
+    def __init__(
+        self,
+        cache: jwm._cache.ttl.cache.AsyncTTLCache,
+        window_seconds: float = 0,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ) -> None:
+        """Async TTL Cache that coalesces concurrent gets into one get_many,
+        such as a single MGET for an AsyncRedisTTLCache.
+
+        Gets of a namespace issued in the same event loop iteration, or
+        within `window_seconds` of the first one, are sent to the wrapped
+        cache together and the results fanned back out to every waiting
+        coroutine. Gets of the same key share one lookup. A batch is sent
+        early once it holds `max_batch_size` distinct keys.
+
+        Every other operation is passed straight through to the wrapped
+        cache, including optional methods such as `get_evictions`. The cache
+        must only be used from one event loop at a time.
+
+        Args:
+            cache (AsyncTTLCache): Cache to read from and write to.
+            window_seconds (float, optional): Time to wait for more gets
+                after the first of a batch. Defaults to 0 which only waits
+                for the current event loop iteration.
+            max_batch_size (int, optional): Number of distinct keys that
+                dispatches a batch immediately. Defaults to 1,000.
+        """
+        if window_seconds < 0:
+            raise ValueError("window_seconds must be greater than or equal to zero.")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than zero.")
+
+        self.cache = cache
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+
+        self._batches: dict[bytes, dict[bytes, list[asyncio.Future]]] = {}
+        self._timers: dict[bytes, asyncio.Handle] = {}
+        # Strong references so in flight lookups are not garbage collected
+        self._lookups: set[asyncio.Task] = set()
+
+    def __getattr__(self, name: str) -> typing.Any:
+        # Only called for attributes not found on the batching cache
+        if "cache" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__["cache"], name)
+
+    async def get(self, namespace: bytes, key: bytes) -> bytes | None:
+        loop = asyncio.get_running_loop()
+
+        batch = self._batches.get(namespace, None)
+        if batch is None:
+            batch = self._batches[namespace] = {}
+            if self.window_seconds > 0:
+                self._timers[namespace] = loop.call_later(
+                    self.window_seconds, self._dispatch, namespace
+                )
+            else:
+                self._timers[namespace] = loop.call_soon(self._dispatch, namespace)
+
+        future = loop.create_future()
+        waiters = batch.get(key, None)
+        if waiters is None:
+            waiters = batch[key] = []
+        waiters.append(future)
+
+        if len(batch) >= self.max_batch_size:
+            self._timers[namespace].cancel()
+            self._dispatch(namespace)
+
+        return await future
+
+    async def set(
+        self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+    ) -> None:
+        await self.cache.set(namespace, key, value, ttl_seconds)
+
+    async def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        return await jwm._cache.ttl.cache.async_get_many(self.cache, namespace, keys)
+
+    async def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        set_many = getattr(self.cache, "set_many", None)
+        if set_many is None:
+            for key, value in items.items():
+                await self.cache.set(namespace, key, value, ttl_seconds)
+            return
+        await set_many(namespace, items, ttl_seconds)
+
+    async def clear(self, namespace: bytes) -> None:
+        await self.cache.clear(namespace)
+
+    async def get_size(self, namespace: bytes) -> int:
+        return await self.cache.get_size(namespace)
+
+    def _dispatch(self, namespace: bytes) -> None:
+        "Start the lookup of the pending batch of a namespace."
+        batch = self._batches.pop(namespace)
+        del self._timers[namespace]
+
+        lookup = asyncio.get_running_loop().create_task(self._lookup(namespace, batch))
+        self._lookups.add(lookup)
+        lookup.add_done_callback(self._lookups.discard)
+
+    async def _lookup(
+        self, namespace: bytes, batch: dict[bytes, list[asyncio.Future]]
+    ) -> None:
+        keys = list(batch)
+        try:
+            values = await self.get_many(namespace, keys)
+        except BaseException as error:
+            for waiters in batch.values():
+                for waiter in waiters:
+                    # Waiters may have been cancelled while the batch ran
+                    if not waiter.done():
+                        if isinstance(error, asyncio.CancelledError):
+                            waiter.cancel()
+                        else:
+                            waiter.set_exception(error)
+            if not isinstance(error, Exception):
+                raise
+            return
+
+        for key, value in zip(keys, values):
+            for waiter in batch[key]:
+                if not waiter.done():
+                    waiter.set_result(value)
@@ -1,3 +1,5 @@
+import asyncio
+import collections.abc
 import typing
 
 
@@ -28,6 +30,39 @@ class TTLCache(typing.Protocol):
                 Defaults to 60.
         """
 
+    def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        """Get many values from the cache in one operation. Caches that do
+        not override this call `get` for each key.
+
+        Args:
+            namespace (bytes): Namespace to search for keys
+            keys (Sequence[bytes]): Keys to search
+
+        Returns:
+            list[bytes | None]: Value or None on miss for each key, in order
+        """
+        return [self.get(namespace, key) for key in keys]
+
+    def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        """Sets many values in the cache with the same time to live in one
+        operation. Caches that do not override this call `set` for each item.
+
+        Args:
+            namespace (bytes): Key namespace
+            items (Mapping[bytes, bytes]): Values by key
+            ttl_seconds (float, optional): Time to live in seconds.
+                Defaults to 60.
+        """
+        for key, value in items.items():
+            self.set(namespace, key, value, ttl_seconds)
+
     def clear(self, namespace: bytes) -> None:
         """Clears all values in a namespace
 
@@ -73,6 +108,40 @@ class AsyncTTLCache(typing.Protocol):
                 Defaults to 60.
         """
 
+    async def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        """Get many values from the cache in one operation. Caches that do
+        not override this await `get` for each key.
+
+        Args:
+            namespace (bytes): Namespace to search for keys
+            keys (Sequence[bytes]): Keys to search
+
+        Returns:
+            list[bytes | None]: Value or None on miss for each key, in order
+        """
+        return [await self.get(namespace, key) for key in keys]
+
+    async def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        """Sets many values in the cache with the same time to live in one
+        operation. Caches that do not override this await `set` for each
+        item.
+
+        Args:
+            namespace (bytes): Key namespace
+            items (Mapping[bytes, bytes]): Values by key
+            ttl_seconds (float, optional): Time to live in seconds.
+                Defaults to 60.
+        """
+        for key, value in items.items():
+            await self.set(namespace, key, value, ttl_seconds)
+
     async def clear(self, namespace: bytes) -> None:
         """Clears all values in a namespace
 
@@ -89,3 +158,55 @@ class AsyncTTLCache(typing.Protocol):
         Returns:
             int: Number of values
         """
+
+
+def get_many(
+    cache: TTLCache, namespace: bytes, keys: collections.abc.Sequence[bytes]
+) -> list[bytes | None]:
+    """Get many values from a cache, calling `get` for each key when the
+    cache does not subclass TTLCache and has no get_many.
+
+    Args:
+        cache (TTLCache): Cache to search
+        namespace (bytes): Namespace to search for keys
+        keys (Sequence[bytes]): Keys to search
+
+    Returns:
+        list[bytes | None]: Value or None on miss for each key, in order
+    """
+    get_many_ = getattr(cache, "get_many", None)
+    if get_many_ is None:
+        return [cache.get(namespace, key) for key in keys]
+    return get_many_(namespace, keys)
+
+
+async def async_get_many(
+    cache: AsyncTTLCache | TTLCache,
+    namespace: bytes,
+    keys: collections.abc.Sequence[bytes],
+) -> list[bytes | None]:
+    """Get many values from an async or sync cache, calling `get` for each key
+    when the cache does not subclass a protocol and has no get_many.
+
+    Args:
+        cache (AsyncTTLCache | TTLCache): Cache to search
+        namespace (bytes): Namespace to search for keys
+        keys (Sequence[bytes]): Keys to search
+
+    Returns:
+        list[bytes | None]: Value or None on miss for each key, in order
+    """
+    get_many_ = getattr(cache, "get_many", None)
+    if get_many_ is not None:
+        values = get_many_(namespace, keys)
+        if asyncio.iscoroutine(values):
+            values = await values
+        return values
+
+    values = []
+    for key in keys:
+        value = cache.get(namespace, key)
+        if asyncio.iscoroutine(value):
+            value = await value
+        values.append(value)
+    return values
@@ -23,12 +23,26 @@ class TTLDecorator:
         identifier: bytes,
         cache: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache,
         serializer: jwm._cache.serializers.Serializer,
+        maxsize: int | None = None,
+        lock_timeout_seconds: float | None = None,
+        stale_ttl_seconds: float | None = None,
+        early_refresh_beta: float | None = None,
+        cache_exceptions: tuple[type[BaseException], ...] = (),
+        exception_ttl_seconds: float | None = None,
+        none_ttl_seconds: float | None = None,
     ) -> None:
         self.ttl_seconds = ttl_seconds
         self.typed = typed
         self.identifier = identifier
         self.cache = cache
         self.serializer = serializer
+        self.maxsize = maxsize
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.early_refresh_beta = early_refresh_beta
+        self.cache_exceptions = cache_exceptions
+        self.exception_ttl_seconds = exception_ttl_seconds
+        self.none_ttl_seconds = none_ttl_seconds
 
     @typing.overload
     def __call__(
@@ -63,6 +77,13 @@ class TTLDecorator:
                 self.identifier,
                 self.cache,
                 self.serializer,
+                self.maxsize,
+                self.lock_timeout_seconds,
+                self.stale_ttl_seconds,
+                self.early_refresh_beta,
+                self.cache_exceptions,
+                self.exception_ttl_seconds,
+                self.none_ttl_seconds,
             )
         else:
             return jwm._cache.ttl.wrapper.TTLWrapper[P0, T0](
@@ -72,6 +93,13 @@ class TTLDecorator:
                 self.identifier,
                 self.cache,
                 self.serializer,
+                self.maxsize,
+                self.lock_timeout_seconds,
+                self.stale_ttl_seconds,
+                self.early_refresh_beta,
+                self.cache_exceptions,
+                self.exception_ttl_seconds,
+                self.none_ttl_seconds,
             )
 
 
@@ -91,8 +119,15 @@ def ttl_cache(
         | typing.Literal["local", "async_local"]
     ) = "local",
     serializer: (
-        jwm._cache.serializers.Serializer | typing.Literal["pickle", "json"]
+        jwm._cache.serializers.Serializer | typing.Literal["pickle", "json", "identity"]
     ) = "pickle",
+    maxsize: int | None = None,
+    lock_timeout_seconds: float | None = None,
+    stale_ttl_seconds: float | None = None,
+    early_refresh_beta: float | None = None,
+    cache_exceptions: tuple[type[BaseException], ...] = (),
+    exception_ttl_seconds: float | None = None,
+    none_ttl_seconds: float | None = None,
 ) -> TTLDecorator: ...
 
 
@@ -127,8 +162,15 @@ def ttl_cache(
         | typing.Literal["local", "async_local"]
     ) = "local",
     serializer: (
-        jwm._cache.serializers.Serializer | typing.Literal["pickle", "json"]
+        jwm._cache.serializers.Serializer | typing.Literal["pickle", "json", "identity"]
     ) = "pickle",
+    maxsize: int | None = None,
+    lock_timeout_seconds: float | None = None,
+    stale_ttl_seconds: float | None = None,
+    early_refresh_beta: float | None = None,
+    cache_exceptions: tuple[type[BaseException], ...] = (),
+    exception_ttl_seconds: float | None = None,
+    none_ttl_seconds: float | None = None,
 ) -> (
     TTLDecorator
     | jwm._cache.ttl.wrapper.TTLWrapper[P1, T1]
@@ -172,9 +214,52 @@ def ttl_cache(
             functions.
         cache (TTLCache | AsyncTTLCache | Literal["local", "async_local"], optional):
             Cache where the values will be stored. Defaults to "local".
-        serializer (Serializer  |  Literal["pickle", "json"], optional):
+        serializer (Serializer | Literal["pickle", "json", "identity"], optional):
             Serializer to use when creating keys and storing values in the
-            cache. Defaults to "pickle".
+            cache. "identity" stores the returned objects themselves, which
+            is fastest but only supported by LocalTTLCache and
+            AsyncLocalTTLCache and shares values between callers. Defaults
+            to "pickle".
+        maxsize (int | None, optional): Maximum number of entries kept for
+            the function, the least recently used entry is evicted when
+            exceeded. The cache must support size limits (`set_maxsize`).
+            A LocalTTLCache with several shards gives each shard an equal
+            share rounded up, so it may keep up to `shards - 1` more entries.
+            Defaults to None which is unbounded.
+        lock_timeout_seconds (float | None, optional): Enables stampede
+            protection. On a miss only the caller holding the lock of the
+            key runs the function, others wait up to this long for its
+            value before running the function themselves. The lock expires
+            after this long if its holder crashes. The cache must support
+            locking (`acquire_lock`), such as RedisTTLCache. Defaults to
+            None which runs the function on every miss.
+        stale_ttl_seconds (float | None, optional): Enables stale while
+            revalidate. Values are kept this long past `ttl_seconds`, a hit
+            on such a stale value returns it immediately while a single
+            background refresh recomputes it, in a thread pool for sync
+            functions or a task for async functions. Failed refreshes are
+            ignored so the stale value is served until it expires. Defaults
+            to None which expires values after `ttl_seconds`.
+        early_refresh_beta (float | None, optional): Enables probabilistic
+            early recomputation (XFetch). Each hit recomputes the value
+            early with a probability rising as `ttl_seconds` runs out,
+            scaled by the time the value took to compute and this factor,
+            1 is a good default and higher values refresh earlier. Spreads
+            out the refreshes of values that expire together. Early
+            refreshes run in the background when `stale_ttl_seconds` is set,
+            otherwise in the caller. Defaults to None which never refreshes
+            early.
+        cache_exceptions (tuple[type[BaseException], ...], optional):
+            Exceptions raised by the function that are cached and raised
+            again by hits, sparing a failing dependency from every retry.
+            Exceptions are pickled whatever the serializer, those that
+            cannot be pickled are not cached. Defaults to () which caches no
+            exceptions.
+        exception_ttl_seconds (float | None, optional): Time to live for
+            cached exceptions. Defaults to None which uses `ttl_seconds`.
+        none_ttl_seconds (float | None, optional): Time to live for None
+            results, 0 does not cache them. Defaults to None which uses
+            `ttl_seconds`.
 
     Returns:
         TTLDecorator | TTLWrapper[P1, T1] | AsyncTTLWrapper[P1, T1]: A
@@ -188,6 +273,30 @@ def ttl_cache(
     if ttl_seconds < 0:
         raise ValueError("ttl_seconds must be greater than or equal to zero.")
 
+    if maxsize is not None and maxsize < 0:
+        raise ValueError("maxsize must be greater than or equal to zero.")
+
+    if lock_timeout_seconds is not None and lock_timeout_seconds <= 0:
+        raise ValueError("lock_timeout_seconds must be greater than zero.")
+
+    if stale_ttl_seconds is not None and stale_ttl_seconds < 0:
+        raise ValueError("stale_ttl_seconds must be greater than or equal to zero.")
+
+    if early_refresh_beta is not None and early_refresh_beta <= 0:
+        raise ValueError("early_refresh_beta must be greater than zero.")
+
+    if not all(
+        isinstance(exception, type) and issubclass(exception, BaseException)
+        for exception in cache_exceptions
+    ):
+        raise TypeError("cache_exceptions must be a tuple of exception types.")
+
+    if exception_ttl_seconds is not None and exception_ttl_seconds < 0:
+        raise ValueError("exception_ttl_seconds must be greater than or equal to zero.")
+
+    if none_ttl_seconds is not None and none_ttl_seconds < 0:
+        raise ValueError("none_ttl_seconds must be greater than or equal to zero.")
+
     if identifier is None:
         _identifier = uuid.uuid4().bytes
     else:
@@ -201,12 +310,52 @@ def ttl_cache(
         case _:
             pass
 
+    if maxsize is not None:
+        set_maxsize = getattr(cache, "set_maxsize", None)
+        if set_maxsize is None:
+            raise ValueError(f"{type(cache).__name__} does not support maxsize.")
+        set_maxsize(_identifier, maxsize)
+
+    if lock_timeout_seconds is not None and not hasattr(cache, "acquire_lock"):
+        raise ValueError(f"{type(cache).__name__} does not support locking.")
+
     match serializer:
         case "pickle":
             serializer = jwm._cache.serializers.PickleSerializer()
         case "json":
             serializer = jwm._cache.serializers.JsonSerializer()
+        case "identity":
+            serializer = jwm._cache.serializers.IdentitySerializer()
         case _:
             pass
 
-    return TTLDecorator(ttl_seconds, typed, _identifier, cache, serializer)
+    if isinstance(serializer, jwm._cache.serializers.IdentitySerializer):
+        if not isinstance(
+            cache,
+            (
+                jwm._cache.ttl.local.LocalTTLCache,
+                jwm._cache.ttl.local.AsyncLocalTTLCache,
+            ),
+        ):
+            raise ValueError(f"{type(cache).__name__} cannot store live objects.")
+        if stale_ttl_seconds is not None or early_refresh_beta is not None:
+            raise ValueError(
+                "stale_ttl_seconds and early_refresh_beta require serialized values."
+            )
+        if cache_exceptions:
+            raise ValueError("cache_exceptions requires serialized values.")
+
+    return TTLDecorator(
+        ttl_seconds,
+        typed,
+        _identifier,
+        cache,
+        serializer,
+        maxsize,
+        lock_timeout_seconds,
+        stale_ttl_seconds,
+        early_refresh_beta,
+        tuple(cache_exceptions),
+        exception_ttl_seconds,
+        none_ttl_seconds,
+    )
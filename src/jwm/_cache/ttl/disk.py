@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+import threading
+import time
+import typing
+import weakref
+
+import jwm._cache.ttl.cache
+
+SEGMENT_BYTES: int = 64 * 1024 * 1024
+"Default size of a segment file"
+
+COMPACT_INTERVAL_SECONDS: float = 1
+"Default time between compaction passes"
+
+_SEGMENT_SUFFIX = ".segment"
+
+
+class _Segment:
+    """Append only file of values mapped into memory.
+
+    The mapping is never closed explicitly, it is unmapped once the segment
+    and every memoryview of it have been garbage collected. Readers may
+    therefore keep values after the segment is compacted away.
+    """
+
+    __slots__ = ("path", "size", "used", "live_bytes", "pending", "keys", "view")
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+        self.used = 0
+        self.live_bytes = 0
+        # Reserved writes that have not been installed in the index yet
+        self.pending = 0
+        self.keys: set[tuple[bytes, bytes]] = set()
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # Sparse, only written pages take up disk space
+            os.ftruncate(fd, size)
+            self.view = memoryview(mmap.mmap(fd, size))
+        finally:
+            os.close(fd)
+
+
+class _Entry(typing.NamedTuple):
+    segment: _Segment
+    offset: int
+    length: int
+    deadline: float
+
+
+def _remove_segments(segments: dict[int, _Segment]) -> None:
+    for segment in segments.values():
+        with contextlib.suppress(OSError):
+            os.remove(segment.path)
+    segments.clear()
+
+
+def _compact(cache_ref: weakref.ref, wakeup: threading.Event) -> None:
+    """Compactor thread target, periodically rewrites mostly dead segments.
+
+    Sleeps `compact_interval_seconds` between passes, exits once the cache
+    is collected.
+
+    Args:
+        cache_ref (ref): Weak reference to the DiskTTLCache being compacted.
+        wakeup (Event): Set when the cache is collected.
+    """
+    while True:
+        cache: DiskTTLCache | None = cache_ref()
+        if cache is None:
+            return
+
+        cache._compact_once()
+        interval = cache.compact_interval_seconds
+        del cache
+
+        wakeup.wait(interval)
+
+
+class DiskTTLCache(jwm._cache.ttl.cache.TTLCache):
+    "Log structured disk TTL Cache implementation."
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        segment_bytes: int = SEGMENT_BYTES,
+        compact_ratio: float = 0.5,
+        max_bytes: int | None = None,
+        compact_interval_seconds: float = COMPACT_INTERVAL_SECONDS,
+    ) -> None:
+        """Log structured disk TTL Cache implementation, suited to large
+        values.
+
+        Values are appended to memory mapped segment files while the index
+        of namespaces and keys lives in memory. `get` returns a read only
+        memoryview of the mapping rather than copying the value, the page
+        cache decides which values stay in memory. Values larger than
+        `segment_bytes` receive a segment of their own.
+
+        Overwritten, cleared and expired values are dead space. A background
+        thread drops segments without live values and rewrites segments
+        once at least `compact_ratio` of their bytes are dead. Returned
+        memoryviews stay valid after their segment is compacted.
+
+        The segments are scratch space owned by this instance. Existing
+        segments in the directory are deleted on creation and the rest when
+        the cache is garbage collected, the directory must not be shared.
+
+        Args:
+            directory (str | PathLike): Directory for segment files, created
+                if missing.
+            segment_bytes (int, optional): Size of each segment file.
+                Defaults to 64 MiB.
+            compact_ratio (float, optional): Proportion of dead bytes that
+                triggers rewriting a segment. Defaults to 0.5.
+            max_bytes (int | None, optional): Maximum bytes of all segments,
+                the oldest segments are dropped when exceeded. Defaults to
+                None which is unbounded.
+            compact_interval_seconds (float, optional): Time between
+                compaction passes. Defaults to 1.
+        """
+        if segment_bytes < 1:
+            raise ValueError("segment_bytes must be greater than zero.")
+        if not 0 < compact_ratio <= 1:
+            raise ValueError("compact_ratio must be greater than zero and at most one.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be greater than or equal to zero.")
+
+        self.directory = os.fspath(directory)
+        self.segment_bytes = segment_bytes
+        self.compact_ratio = compact_ratio
+        self.max_bytes = max_bytes
+        self.compact_interval_seconds = compact_interval_seconds
+
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if name.endswith(_SEGMENT_SUFFIX):
+                os.remove(os.path.join(self.directory, name))
+
+        self._lock = threading.Lock()
+        self._index: dict[bytes, dict[bytes, _Entry]] = {}
+        self._evictions: dict[bytes, int] = {}
+        # Oldest first
+        self._segments: dict[int, _Segment] = {}
+        self._next_segment = 0
+        self._active: _Segment | None = None
+        self._used_bytes = 0
+
+        weakref.finalize(self, _remove_segments, self._segments)
+
+        wakeup = threading.Event()
+        cache_ref = weakref.ref(self, lambda _: wakeup.set())
+        threading.Thread(
+            target=_compact,
+            args=(cache_ref, wakeup),
+            name="jwm.cache-compactor",
+            daemon=True,
+        ).start()
+
+    def get(self, namespace: bytes, key: bytes) -> memoryview | None:
+        with self._lock:
+            entry = self._index.get(namespace, {}).get(key, None)
+            if entry is None:
+                return None
+            if entry.deadline <= time.monotonic():
+                self._remove(namespace, key, entry)
+                return None
+
+        return entry.segment.view[
+            entry.offset : entry.offset + entry.length
+        ].toreadonly()
+
+    def set(
+        self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+    ) -> None:
+        deadline = time.monotonic() + ttl_seconds
+        length = len(value)
+
+        with self._lock:
+            if ttl_seconds <= 0 or (
+                self.max_bytes is not None and length > self.max_bytes
+            ):
+                entry = self._index.get(namespace, {}).get(key, None)
+                if entry is not None:
+                    self._remove(namespace, key, entry)
+                if ttl_seconds > 0:
+                    self._evictions[namespace] = self._evictions.get(namespace, 0) + 1
+                return
+
+            segment, offset = self._reserve(length)
+
+        # Copy outside the lock, the reserved range is not visible to readers
+        try:
+            segment.view[offset : offset + length] = value
+        except BaseException:
+            with self._lock:
+                segment.pending -= 1
+            raise
+
+        with self._lock:
+            segment.pending -= 1
+            self._install(namespace, key, _Entry(segment, offset, length, deadline))
+
+    def clear(self, namespace: bytes) -> None:
+        with self._lock:
+            for key, entry in self._index.pop(namespace, {}).items():
+                entry.segment.live_bytes -= entry.length
+                entry.segment.keys.discard((namespace, key))
+            self._evictions.pop(namespace, None)
+
+    def get_size(self, namespace: bytes) -> int:
+        now = time.monotonic()
+        with self._lock:
+            namespace_index = self._index.get(namespace, {})
+            for key, entry in list(namespace_index.items()):
+                if entry.deadline <= now:
+                    self._remove(namespace, key, entry)
+            return len(namespace_index)
+
+    def get_bytes(self, namespace: bytes) -> int:
+        """Gets the number of bytes used by live values in the namespace.
+
+        Args:
+            namespace (bytes): Namespace to query.
+
+        Returns:
+            int: Number of bytes.
+        """
+        with self._lock:
+            return sum(
+                entry.length for entry in self._index.get(namespace, {}).values()
+            )
+
+    def get_evictions(self, namespace: bytes) -> int:
+        """Gets the number of values dropped from the namespace because of
+        max_bytes.
+
+        Args:
+            namespace (bytes): Namespace to query.
+
+        Returns:
+            int: Number of evictions.
+        """
+        with self._lock:
+            return self._evictions.get(namespace, 0)
+
+    def _reserve(self, length: int) -> tuple[_Segment, int]:
+        "Reserve space for a value, the caller must install or abandon it."
+        if length > self.segment_bytes:
+            segment = self._new_segment(length)
+        else:
+            if self._active is None or self._active.used + length > self._active.size:
+                self._active = self._new_segment(self.segment_bytes)
+            segment = self._active
+
+        offset = segment.used
+        segment.used += length
+        segment.pending += 1
+        self._used_bytes += length
+
+        if self.max_bytes is not None:
+            for oldest in list(self._segments.values()):
+                if self._used_bytes <= self.max_bytes:
+                    break
+                if oldest is not self._active and oldest.pending == 0:
+                    self._drop(oldest, evicted=True)
+
+        return segment, offset
+
+    def _new_segment(self, size: int) -> _Segment:
+        number = self._next_segment
+        self._next_segment += 1
+
+        path = os.path.join(self.directory, f"{number:08d}{_SEGMENT_SUFFIX}")
+        segment = self._segments[number] = _Segment(path, max(1, size))
+        return segment
+
+    def _install(self, namespace: bytes, key: bytes, entry: _Entry) -> None:
+        old_entry = self._index.get(namespace, {}).get(key, None)
+        if old_entry is not None:
+            self._remove(namespace, key, old_entry)
+
+        # Fetched after removing, which drops the namespace once empty
+        namespace_index = self._index.get(namespace, None)
+        if namespace_index is None:
+            namespace_index = self._index[namespace] = {}
+        namespace_index[key] = entry
+        entry.segment.live_bytes += entry.length
+        entry.segment.keys.add((namespace, key))
+
+    def _remove(self, namespace: bytes, key: bytes, entry: _Entry) -> None:
+        namespace_index = self._index[namespace]
+        del namespace_index[key]
+        entry.segment.live_bytes -= entry.length
+        entry.segment.keys.discard((namespace, key))
+        if len(namespace_index) == 0:
+            del self._index[namespace]
+
+    def _drop(self, segment: _Segment, evicted: bool = False) -> None:
+        for namespace, key in list(segment.keys):
+            self._remove(namespace, key, self._index[namespace][key])
+            if evicted:
+                self._evictions[namespace] = self._evictions.get(namespace, 0) + 1
+
+        for number, candidate in self._segments.items():
+            if candidate is segment:
+                del self._segments[number]
+                break
+        self._used_bytes -= segment.used
+
+        # Mapped pages stay readable after unlinking
+        with contextlib.suppress(OSError):
+            os.remove(segment.path)
+
+    def _compact_once(self) -> None:
+        "Drop and rewrite sealed segments that are mostly dead."
+        now = time.monotonic()
+        candidates: list[_Segment] = []
+        with self._lock:
+            for segment in list(self._segments.values()):
+                if segment is self._active or segment.pending > 0:
+                    continue
+
+                for namespace, key in list(segment.keys):
+                    entry = self._index[namespace][key]
+                    if entry.deadline <= now:
+                        self._remove(namespace, key, entry)
+
+                if segment.live_bytes == 0:
+                    self._drop(segment)
+                elif segment.live_bytes <= segment.used * (1 - self.compact_ratio):
+                    candidates.append(segment)
+
+        for segment in candidates:
+            self._rewrite(segment)
+
+    def _rewrite(self, segment: _Segment) -> None:
+        "Move the live values of a segment to the active segment."
+        moves: list[tuple[bytes, bytes, _Entry, _Segment, int]] = []
+        with self._lock:
+            for namespace, key in list(segment.keys):
+                entry = self._index[namespace][key]
+                target, offset = self._reserve(entry.length)
+                moves.append((namespace, key, entry, target, offset))
+
+        for _, _, entry, target, offset in moves:
+            target.view[offset : offset + entry.length] = entry.segment.view[
+                entry.offset : entry.offset + entry.length
+            ]
+
+        with self._lock:
+            for namespace, key, entry, target, offset in moves:
+                target.pending -= 1
+                # Skip values overwritten, cleared or expired during the copy
+                if self._index.get(namespace, {}).get(key, None) is entry:
+                    self._install(
+                        namespace, key, entry._replace(segment=target, offset=offset)
+                    )
+
+            if segment.live_bytes == 0 and segment in self._segments.values():
+                self._drop(segment)
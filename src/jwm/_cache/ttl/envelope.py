@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+import pickle
+import random
+import struct
+import time
+
+_HEADER = struct.Struct("<dd")  # wall clock time the value goes stale, delta
+_VALUE = b"\x00"
+_EXCEPTION = b"\x01"
+
+
+def pack(serialized: bytes, fresh_seconds: float, delta_seconds: float = 0) -> bytes:
+    """Prefix a serialized value with the time it goes stale and the time it
+    took to compute.
+
+    Wall clock time is used so the envelope can be read by other processes
+    and hosts sharing the cache.
+
+    Args:
+        serialized (bytes): Serialized value.
+        fresh_seconds (float): Time until the value goes stale.
+        delta_seconds (float, optional): Time taken to compute the value.
+            Defaults to 0.
+
+    Returns:
+        bytes: Value to store in the cache.
+    """
+    return _HEADER.pack(time.time() + fresh_seconds, delta_seconds) + serialized
+
+
+def unpack(
+    stored: bytes | memoryview, beta: float = 0
+) -> tuple[bytes | memoryview, bool]:
+    """Split a value written by pack.
+
+    With a positive `beta` the value is reported stale early with a
+    probability rising as the time it goes stale approaches, following the
+    XFetch algorithm (Vattani et al., Optimal Probabilistic Cache Stampede
+    Prevention). Values that took longer to compute are refreshed earlier.
+
+    Args:
+        stored (bytes | memoryview): Value read from the cache.
+        beta (float, optional): Weight of early refreshes, higher values
+            refresh earlier. Defaults to 0 which is only stale once the
+            time has passed.
+
+    Returns:
+        tuple[bytes | memoryview, bool]: Serialized value and whether it is
+            stale.
+    """
+    stale_at, delta_seconds = _HEADER.unpack_from(stored, 0)
+    now = time.time()
+    if beta > 0:
+        # -log of a uniform sample in (0, 1] is exponentially distributed
+        now -= delta_seconds * beta * math.log(1.0 - random.random())
+    return stored[_HEADER.size :], stale_at <= now
+
+
+def pack_value(serialized: bytes) -> bytes:
+    """Tag a serialized value so it can share a namespace with exceptions.
+
+    Args:
+        serialized (bytes): Serialized value.
+
+    Returns:
+        bytes: Tagged value.
+    """
+    return _VALUE + serialized
+
+
+def pack_exception(error: BaseException) -> bytes | None:
+    """Pickle an exception tagged so it can share a namespace with values.
+
+    Exceptions are always pickled, whatever the serializer of the values.
+    The traceback is not kept.
+
+    Args:
+        error (BaseException): Exception to store.
+
+    Returns:
+        bytes | None: Tagged exception, None if it does not survive being
+            pickled and unpickled.
+    """
+    try:
+        pickled = pickle.dumps(error)
+        pickle.loads(pickled)
+    except Exception:
+        return None
+    return _EXCEPTION + pickled
+
+
+def unpack_outcome(stored: bytes | memoryview) -> tuple[bytes | memoryview, bool]:
+    """Split a value written by pack_value or pack_exception.
+
+    Args:
+        stored (bytes | memoryview): Tagged value.
+
+    Returns:
+        tuple[bytes | memoryview, bool]: Serialized value or pickled
+            exception, and whether it is an exception.
+    """
+    return stored[1:], stored[0] == _EXCEPTION[0]
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import collections.abc
+import contextlib
+import logging
+import os
+import struct
+import threading
+import typing
+
+try:
+    import redis
+    import redis.asyncio
+
+    HAS_TTL_INVALIDATION_BUS = True
+except ModuleNotFoundError:
+    HAS_TTL_INVALIDATION_BUS = False
+
+INVALIDATION_CHANNEL: bytes = b"jwm.cache.invalidate"
+"Default Redis channel invalidations are published on"
+
+RECONNECT_SECONDS: float = 1
+"Time the subscriber waits before resubscribing after a connection error"
+
+_MESSAGE = struct.Struct("<16sBI")  # origin, has key, namespace length
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _encode(origin: bytes, namespace: bytes, key: bytes | None) -> bytes:
+    return (
+        _MESSAGE.pack(origin, key is not None, len(namespace))
+        + namespace
+        + (key or b"")
+    )
+
+
+def _decode(message: bytes) -> tuple[bytes, bytes, bytes | None]:
+    """Split an invalidation message.
+
+    Returns:
+        tuple[bytes, bytes, bytes | None]: Origin, namespace and key, the key
+            is None when the whole namespace was invalidated.
+    """
+    origin, has_key, namespace_length = _MESSAGE.unpack_from(message, 0)
+    namespace_end = _MESSAGE.size + namespace_length
+    namespace = message[_MESSAGE.size : namespace_end]
+    return origin, namespace, message[namespace_end:] if has_key else None
+
+
+class InvalidationBus(typing.Protocol):
+    """Protocol for broadcasting invalidations between processes.
+
+    Invalidations are delivered to the subscribers of every other bus on the
+    same channel, never to the subscribers of the publishing bus.
+    """
+
+    def publish(self, namespace: bytes, key: bytes | None = None) -> None:
+        """Broadcast that an entry or a whole namespace changed.
+
+        Args:
+            namespace (bytes): Namespace that changed.
+            key (bytes | None, optional): Key that changed. Defaults to None
+                which invalidates the whole namespace.
+        """
+
+    def subscribe(
+        self, callback: collections.abc.Callable[[bytes, bytes | None], None]
+    ) -> None:
+        """Call the callback with the namespace and key of every invalidation
+        received from other processes.
+
+        Args:
+            callback (Callable[[bytes, bytes | None], None]): Called with the
+                namespace and key, None for the whole namespace.
+        """
+
+
+class AsyncInvalidationBus(typing.Protocol):
+    "Async protocol for broadcasting invalidations between processes."
+
+    async def publish(self, namespace: bytes, key: bytes | None = None) -> None:
+        """Broadcast that an entry or a whole namespace changed.
+
+        Args:
+            namespace (bytes): Namespace that changed.
+            key (bytes | None, optional): Key that changed. Defaults to None
+                which invalidates the whole namespace.
+        """
+
+    async def subscribe(
+        self,
+        callback: collections.abc.Callable[
+            [bytes, bytes | None], collections.abc.Awaitable[None] | None
+        ],
+    ) -> None:
+        """Call the callback with the namespace and key of every invalidation
+        received from other processes.
+
+        Args:
+            callback (Callable[[bytes, bytes | None], Awaitable[None] | None]):
+                Called with the namespace and key, None for the whole
+                namespace. Awaited if it returns an awaitable.
+        """
+
+
+if HAS_TTL_INVALIDATION_BUS:
+
+    class RedisInvalidationBus(InvalidationBus):
+        "Sync Redis pub/sub implementation of InvalidationBus."
+
+        def __init__(
+            self, client: redis.Redis, channel: bytes = INVALIDATION_CHANNEL
+        ) -> None:
+            """Redis pub/sub implementation of InvalidationBus.
+
+            A single daemon thread per bus, started by the first subscribe,
+            receives invalidations and calls every subscriber. Invalidations
+            published while the subscriber is disconnected are lost, entries
+            still expire by their TTL.
+
+            Args:
+                client (Redis): Redis client.
+                channel (bytes, optional): Channel to publish and subscribe
+                    on. Defaults to b"jwm.cache.invalidate".
+            """
+            self.client = client
+            self.channel = channel
+            self.origin = os.urandom(16)
+
+            self._callbacks: list[
+                collections.abc.Callable[[bytes, bytes | None], None]
+            ] = []
+            self._lock = threading.Lock()
+            self._closed = threading.Event()
+            self._listener: threading.Thread | None = None
+
+        def publish(self, namespace: bytes, key: bytes | None = None) -> None:
+            self.client.publish(self.channel, _encode(self.origin, namespace, key))
+
+        def subscribe(
+            self, callback: collections.abc.Callable[[bytes, bytes | None], None]
+        ) -> None:
+            with self._lock:
+                self._callbacks.append(callback)
+                if self._listener is not None:
+                    return
+
+                # Subscribe before returning so no later publish is missed
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._listener = threading.Thread(
+                    target=self._listen,
+                    args=(pubsub,),
+                    name="jwm.cache-invalidation",
+                    daemon=True,
+                )
+                self._listener.start()
+
+        def close(self) -> None:
+            "Stop receiving invalidations."
+            self._closed.set()
+            if self._listener is not None:
+                self._listener.join()
+
+        def _listen(self, pubsub: redis.client.PubSub) -> None:
+            while not self._closed.is_set():
+                try:
+                    message = pubsub.get_message(timeout=RECONNECT_SECONDS)
+                except redis.RedisError:
+                    self._closed.wait(RECONNECT_SECONDS)
+                    with contextlib.suppress(redis.RedisError):
+                        pubsub.close()
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    try:
+                        pubsub.subscribe(self.channel)
+                    except redis.RedisError:
+                        pass
+                    continue
+
+                if message is not None:
+                    self._deliver(message["data"])
+
+            pubsub.close()
+
+        def _deliver(self, data: bytes) -> None:
+            try:
+                origin, namespace, key = _decode(data)
+            except Exception:
+                _LOGGER.exception("Ignoring malformed invalidation message.")
+                return
+            if origin == self.origin:
+                return
+            # One failing subscriber must not stop the others or the listener
+            for callback in tuple(self._callbacks):
+                try:
+                    callback(namespace, key)
+                except Exception:
+                    _LOGGER.exception("Invalidation callback failed.")
+
+    class AsyncRedisInvalidationBus(AsyncInvalidationBus):
+        "Async Redis pub/sub implementation of AsyncInvalidationBus."
+
+        def __init__(
+            self, client: redis.asyncio.Redis, channel: bytes = INVALIDATION_CHANNEL
+        ) -> None:
+            """Async Redis pub/sub implementation of AsyncInvalidationBus.
+
+            A single task per bus, started by the first subscribe on the
+            running event loop, receives invalidations and calls every
+            subscriber. Invalidations published while the subscriber is
+            disconnected are lost, entries still expire by their TTL.
+
+            Args:
+                client (Redis): Async Redis client.
+                channel (bytes, optional): Channel to publish and subscribe
+                    on. Defaults to b"jwm.cache.invalidate".
+            """
+            self.client = client
+            self.channel = channel
+            self.origin = os.urandom(16)
+
+            self._callbacks: list[
+                collections.abc.Callable[
+                    [bytes, bytes | None], collections.abc.Awaitable[None] | None
+                ]
+            ] = []
+            self._listener: asyncio.Task | None = None
+
+        async def publish(self, namespace: bytes, key: bytes | None = None) -> None:
+            await self.client.publish(
+                self.channel, _encode(self.origin, namespace, key)
+            )
+
+        async def subscribe(
+            self,
+            callback: collections.abc.Callable[
+                [bytes, bytes | None], collections.abc.Awaitable[None] | None
+            ],
+        ) -> None:
+            self._callbacks.append(callback)
+            if self._listener is not None and not self._listener.done():
+                return
+
+            # Subscribe before returning so no later publish is missed
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(self.channel)
+            self._listener = asyncio.get_running_loop().create_task(
+                self._listen(pubsub)
+            )
+
+        async def close(self) -> None:
+            "Stop receiving invalidations."
+            if self._listener is not None:
+                self._listener.cancel()
+                try:
+                    await self._listener
+                except asyncio.CancelledError:
+                    pass
+                self._listener = None
+
+        async def _listen(self, pubsub: redis.asyncio.client.PubSub) -> None:
+            try:
+                while True:
+                    try:
+                        async for message in pubsub.listen():
+                            if message["type"] != "message":
+                                continue
+                            await self._deliver(message["data"])
+                    except redis.RedisError:
+                        pass
+
+                    await asyncio.sleep(RECONNECT_SECONDS)
+                    with contextlib.suppress(redis.RedisError):
+                        await pubsub.aclose()
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    try:
+                        await pubsub.subscribe(self.channel)
+                    except redis.RedisError:
+                        pass
+            finally:
+                await pubsub.aclose()
+
+        async def _deliver(self, data: bytes) -> None:
+            try:
+                origin, namespace, key = _decode(data)
+            except Exception:
+                _LOGGER.exception("Ignoring malformed invalidation message.")
+                return
+            if origin == self.origin:
+                return
+            # One failing subscriber must not stop the others or the listener
+            for callback in tuple(self._callbacks):
+                try:
+                    result = callback(namespace, key)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception:
+                    _LOGGER.exception("Invalidation callback failed.")
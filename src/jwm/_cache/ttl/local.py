@@ -1,121 +1,1042 @@
+import array
 import asyncio
+import collections.abc
+import contextlib
+import heapq
+import itertools
+import os
+import struct
+import sys
 import threading
+import time
+import typing
+import weakref
 
 import jwm._cache.ttl.cache
+import jwm._cache.ttl.policy
+
+REAPER_IDLE_SECONDS: float = 60
+"Longest time the reaper thread sleeps while there is nothing to expire"
+
+SWEEP_INTERVAL_SECONDS: float = 1
+"Default shortest time between async sweeps of expired entries"
+
+ENTRY_OVERHEAD_BYTES: int = 300
+"Approximate bookkeeping memory of an entry on top of its key and value"
+
+SNAPSHOT_MAGIC: bytes = b"JWMSNAP1"
+"Identifies a file written by LocalTTLCache.dump"
+
+_SNAPSHOT_HEADER = struct.Struct("<8sd")  # magic, wall clock time of the dump
+_SNAPSHOT_NAMESPACE = struct.Struct("<IQ")  # namespace length, entry count
+
+
+def _entry_size(key: bytes, value: bytes) -> int:
+    return len(key) + len(value) + ENTRY_OVERHEAD_BYTES
+
+
+def _resolve_policy(
+    policy: (
+        collections.abc.Callable[[int | None], jwm._cache.ttl.policy.EvictionPolicy]
+        | typing.Literal["lru", "wtinylfu"]
+    ),
+) -> collections.abc.Callable[[int | None], jwm._cache.ttl.policy.EvictionPolicy]:
+    if not isinstance(policy, str):
+        return policy
+
+    try:
+        return jwm._cache.ttl.policy.POLICIES[policy]
+    except KeyError:
+        raise ValueError(f"Unknown eviction policy {policy!r}.") from None
+
+
+class _TTLStore:
+    """Entry and deadline storage shared by the local caches.
+
+    Not thread safe, callers are responsible for any locking. Deadlines are
+    `time.monotonic` timestamps kept in a min-heap. Overwritten and cleared
+    entries leave stale heap items behind which are skipped when popped and
+    dropped whenever the heap grows past twice the number of live entries.
+
+    Store wide size and byte limits evict the entry chosen by the eviction
+    policy, which is only created when one of those limits is set. Namespace
+    limits always evict the least recently used entry of the namespace, the
+    namespace dictionaries are kept in recency order so they need no extra
+    structure.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        max_bytes: int | None = None,
+        policy: collections.abc.Callable[
+            [int | None], jwm._cache.ttl.policy.EvictionPolicy
+        ] = jwm._cache.ttl.policy.LRUPolicy,
+    ) -> None:
+        self.cache: dict[bytes, dict[bytes, tuple[bytes, float]]] = {}
+        self.deadlines: list[tuple[float, bytes, bytes]] = []
+        self.entries = 0
+        self.bytes = 0
+
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.namespace_maxsize: dict[bytes, int] = {}
+        self.namespace_bytes: dict[bytes, int] = {}
+        self.evictions: dict[bytes, int] = {}
+        self.policy: jwm._cache.ttl.policy.EvictionPolicy | None = None
+        if maxsize is not None or max_bytes is not None:
+            self.policy = policy(maxsize)
+
+    @property
+    def bounded(self) -> bool:
+        "Whether hits need to be recorded."
+        return self.policy is not None or len(self.namespace_maxsize) > 0
+
+    def lookup(self, namespace: bytes, key: bytes) -> tuple[bytes, float] | None:
+        """Get an entry without checking its deadline.
+
+        Args:
+            namespace (bytes): Entry namespace.
+            key (bytes): Entry key.
+
+        Returns:
+            tuple[bytes, float] | None: Value and deadline or None on miss.
+        """
+        return self.cache.get(namespace, {}).get(key, None)
+
+    def touch(self, namespace: bytes, key: bytes) -> None:
+        """Mark an entry as the most recently used.
+
+        Args:
+            namespace (bytes): Entry namespace.
+            key (bytes): Entry key.
+        """
+        namespace_cache = self.cache.get(namespace, None)
+        if namespace_cache is None or key not in namespace_cache:
+            return
+
+        if namespace in self.namespace_maxsize:
+            namespace_cache[key] = namespace_cache.pop(key)
+        if self.policy is not None:
+            self.policy.access((namespace, key))
+
+    def insert(
+        self, namespace: bytes, key: bytes, value: bytes, deadline: float
+    ) -> bool:
+        """Insert or overwrite an entry.
+
+        Args:
+            namespace (bytes): Entry namespace.
+            key (bytes): Entry key.
+            value (bytes): Entry value.
+            deadline (float): Monotonic time the entry expires at.
+
+        Returns:
+            bool: Whether the deadline is now the earliest in the store.
+        """
+        size = _entry_size(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Storing would evict everything else and still not fit
+            self.remove(namespace, key)
+            self.evictions[namespace] = self.evictions.get(namespace, 0) + 1
+            return False
+
+        namespace_cache = self.cache.get(namespace, None)
+        if namespace_cache is None:
+            namespace_cache = self.cache[namespace] = {}
+
+        # Re-insert so the namespace dictionary stays in recency order
+        old_entry = namespace_cache.pop(key, None)
+        if old_entry is None:
+            self.entries += 1
+        else:
+            size -= _entry_size(key, old_entry[0])
+        namespace_cache[key] = (value, deadline)
+        self.bytes += size
+        self.namespace_bytes[namespace] = self.namespace_bytes.get(namespace, 0) + size
+        if self.policy is not None:
+            if old_entry is None:
+                self.policy.insert((namespace, key))
+            else:
+                self.policy.access((namespace, key))
+
+        earliest = len(self.deadlines) == 0 or deadline < self.deadlines[0][0]
+        heapq.heappush(self.deadlines, (deadline, namespace, key))
+
+        self._enforce_limits(namespace)
+        self._maybe_compact()
+
+        return earliest
+
+    def insert_many(
+        self,
+        namespace: bytes,
+        keys: collections.abc.Sequence[bytes],
+        values: collections.abc.Sequence[bytes],
+        deadlines: collections.abc.Sequence[float],
+    ) -> None:
+        """Insert or overwrite many entries of a namespace.
+
+        When nothing needs evicting the entries are added in bulk and, for
+        batches that are large compared to the store, the deadline heap is
+        rebuilt once rather than pushed to for every entry.
+
+        Args:
+            namespace (bytes): Entries namespace.
+            keys (Sequence[bytes]): Entry keys, must be unique.
+            values (Sequence[bytes]): Entry values.
+            deadlines (Sequence[float]): Monotonic times the entries expire
+                at.
+        """
+        if self.bounded:
+            for key, value, deadline in zip(keys, values, deadlines):
+                self.insert(namespace, key, value, deadline)
+            return
+        if len(keys) == 0:
+            return
+
+        namespace_cache = self.cache.get(namespace, None)
+        if namespace_cache is None:
+            namespace_cache = self.cache[namespace] = {}
+
+        size = sum(map(len, keys)) + sum(map(len, values))
+        size += len(keys) * ENTRY_OVERHEAD_BYTES
+        overwritten = 0
+        if len(namespace_cache) > 0:
+            for key in keys:
+                old_entry = namespace_cache.get(key, None)
+                if old_entry is not None:
+                    size -= _entry_size(key, old_entry[0])
+                    overwritten += 1
+
+        namespace_cache.update(zip(keys, zip(values, deadlines)))
+        self.entries += len(keys) - overwritten
+        self.bytes += size
+        self.namespace_bytes[namespace] = self.namespace_bytes.get(namespace, 0) + size
+
+        items = zip(deadlines, itertools.repeat(namespace), keys)
+        # Rebuilding is linear in the heap size, only worth it for big batches
+        if len(keys) * 4 >= len(self.deadlines):
+            self.deadlines.extend(items)
+            heapq.heapify(self.deadlines)
+        else:
+            for item in items:
+                heapq.heappush(self.deadlines, item)
+        self._maybe_compact()
+
+    def set_maxsize(self, namespace: bytes, maxsize: int | None) -> None:
+        """Limit the number of entries in a namespace.
+
+        Args:
+            namespace (bytes): Namespace to limit.
+            maxsize (int | None): Maximum number of entries, None removes the
+                limit.
+        """
+        if maxsize is None:
+            self.namespace_maxsize.pop(namespace, None)
+            return
+
+        self.namespace_maxsize[namespace] = maxsize
+        self._enforce_limits(namespace)
+
+    def remove(
+        self, namespace: bytes, key: bytes, deadline: float | None = None
+    ) -> None:
+        """Remove an entry.
+
+        Args:
+            namespace (bytes): Entry namespace.
+            key (bytes): Entry key.
+            deadline (float | None, optional): Only remove the entry if it
+                still has this deadline, guards against removing an entry
+                that has since been overwritten. Defaults to None.
+        """
+        namespace_cache = self.cache.get(namespace, None)
+        if namespace_cache is None:
+            return
+
+        entry = namespace_cache.get(key, None)
+        if entry is None or (deadline is not None and entry[1] != deadline):
+            return
+
+        del namespace_cache[key]
+        size = _entry_size(key, entry[0])
+        self.entries -= 1
+        self.bytes -= size
+        self.namespace_bytes[namespace] -= size
+        if self.policy is not None:
+            self.policy.remove((namespace, key))
+        if len(namespace_cache) == 0:
+            del self.cache[namespace]
+            del self.namespace_bytes[namespace]
+
+    def clear(self, namespace: bytes) -> None:
+        namespace_cache = self.cache.pop(namespace, None)
+        if namespace_cache is not None:
+            self.entries -= len(namespace_cache)
+            self.bytes -= self.namespace_bytes.pop(namespace)
+            if self.policy is not None:
+                for key in namespace_cache:
+                    self.policy.remove((namespace, key))
+
+        self.evictions.pop(namespace, None)
+        self._maybe_compact()
+
+    def size(self, namespace: bytes) -> int:
+        return len(self.cache.get(namespace, {}))
+
+    def size_bytes(self, namespace: bytes) -> int:
+        return self.namespace_bytes.get(namespace, 0)
+
+    def evicted(self, namespace: bytes) -> int:
+        return self.evictions.get(namespace, 0)
+
+    def expire(self, now: float) -> float | None:
+        """Remove every entry whose deadline has passed.
+
+        Args:
+            now (float): Current monotonic time.
+
+        Returns:
+            float | None: Seconds until the next deadline, None if there are
+                no deadlines left.
+        """
+        while len(self.deadlines) > 0 and self.deadlines[0][0] <= now:
+            deadline, namespace, key = heapq.heappop(self.deadlines)
+            self.remove(namespace, key, deadline)
+
+        if len(self.deadlines) == 0:
+            return None
+        return self.deadlines[0][0] - now
+
+    def _enforce_limits(self, namespace: bytes) -> None:
+        "Evict entries until all size limits hold."
+        namespace_maxsize = self.namespace_maxsize.get(namespace, None)
+        namespace_over = (
+            namespace_maxsize is not None
+            and len(self.cache.get(namespace, {})) > namespace_maxsize
+        )
+        store_over = self._store_over()
+        if not namespace_over and not store_over:
+            return
+
+        # Prefer dropping expired entries to evicting live ones
+        self.expire(time.monotonic())
+
+        if namespace_maxsize is not None:
+            namespace_cache = self.cache.get(namespace, {})
+            while len(namespace_cache) > namespace_maxsize:
+                self._evict(namespace, next(iter(namespace_cache)))
+
+        while self._store_over():
+            self._evict(*self.policy.victim())
+
+    def _store_over(self) -> bool:
+        return (self.maxsize is not None and self.entries > self.maxsize) or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        )
+
+    def _evict(self, namespace: bytes, key: bytes) -> None:
+        self.remove(namespace, key)
+        self.evictions[namespace] = self.evictions.get(namespace, 0) + 1
+
+    def _maybe_compact(self) -> None:
+        if len(self.deadlines) <= 2 * self.entries + 64:
+            return
+
+        self.deadlines = [
+            (deadline, namespace, key)
+            for namespace, namespace_cache in self.cache.items()
+            for key, (_, deadline) in namespace_cache.items()
+        ]
+        heapq.heapify(self.deadlines)
+
+
+def _split_limit(limit: int | None, shards: int) -> int | None:
+    "Share of a limit each shard receives, rounded up."
+    if limit is None:
+        return None
+    return -(-limit // shards)
+
+
+def _write_array(file: typing.BinaryIO, values: array.array) -> None:
+    if sys.byteorder != "little":
+        values.byteswap()
+    file.write(values.tobytes())
+
+
+def _read_array(
+    typecode: str, data: bytes, offset: int, count_: int
+) -> tuple[array.array, int]:
+    values = array.array(typecode)
+    end = offset + count_ * values.itemsize
+    if end > len(data):
+        raise ValueError("Snapshot is truncated.")
+
+    values.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+
+def _split_blob(
+    data: bytes, offset: int, lengths: array.array
+) -> tuple[list[bytes], int]:
+    ends = list(itertools.accumulate(lengths, initial=offset))
+    if ends[-1] > len(data):
+        raise ValueError("Snapshot is truncated.")
+
+    # Slicing through map keeps the per entry work out of the interpreter
+    return list(map(data.__getitem__, map(slice, ends, ends[1:]))), ends[-1]
+
+
+def _write_snapshot_block(
+    file: typing.BinaryIO,
+    namespace: bytes,
+    items: list[tuple[bytes, tuple[bytes, float]]],
+    now: float,
+) -> int:
+    """Write the live bytes entries of a namespace as one snapshot block.
+
+    Blocks are columnar, the key lengths, value lengths and remaining times
+    are each stored as an array followed by the concatenated keys and values,
+    so loading splits them without unpacking entries one at a time.
+
+    Returns:
+        int: Number of entries written.
+    """
+    live = [
+        (key, value, deadline - now)
+        for key, (value, deadline) in items
+        if deadline > now and isinstance(value, bytes)
+    ]
+    if len(live) == 0:
+        return 0
+
+    keys, values, remainings = zip(*live)
+    file.write(_SNAPSHOT_NAMESPACE.pack(len(namespace), len(live)))
+    file.write(namespace)
+    _write_array(file, array.array("I", map(len, keys)))
+    _write_array(file, array.array("Q", map(len, values)))
+    _write_array(file, array.array("d", remainings))
+    file.write(b"".join(keys))
+    file.write(b"".join(values))
+    return len(live)
+
+
+def _read_snapshot_block(
+    data: bytes, offset: int
+) -> tuple[bytes, list[bytes], list[bytes], array.array, int]:
+    """Read a snapshot block written by `_write_snapshot_block`.
+
+    Returns:
+        tuple[bytes, list[bytes], list[bytes], array, int]: Namespace, keys,
+            values, remaining times and the offset of the next block.
+    """
+    namespace_length, count_ = _SNAPSHOT_NAMESPACE.unpack_from(data, offset)
+    offset += _SNAPSHOT_NAMESPACE.size
+    namespace = data[offset : offset + namespace_length]
+    offset += namespace_length
+
+    key_lengths, offset = _read_array("I", data, offset, count_)
+    value_lengths, offset = _read_array("Q", data, offset, count_)
+    remainings, offset = _read_array("d", data, offset, count_)
+    keys, offset = _split_blob(data, offset, key_lengths)
+    values, offset = _split_blob(data, offset, value_lengths)
+    return namespace, keys, values, remainings, offset
+
+
+def _reap(cache_ref: weakref.ref, wakeup: threading.Event) -> None:
+    """Reaper thread target, expires entries as their deadlines pass.
+
+    Sleeps until the earliest deadline of any shard, or `REAPER_IDLE_SECONDS`
+    when none are pending, and exits once the cache is collected.
+
+    Args:
+        cache_ref (ref): Weak reference to the LocalTTLCache being reaped.
+        wakeup (Event): Set when an earlier deadline is added or the cache is
+            collected.
+    """
+    while True:
+        cache: LocalTTLCache | None = cache_ref()
+        if cache is None:
+            return
+
+        delay: float | None = None
+        for store, lock in cache._shards:
+            with lock:
+                shard_delay = store.expire(time.monotonic())
+            if shard_delay is not None and (delay is None or shard_delay < delay):
+                delay = shard_delay
+        del cache
+
+        wakeup.wait(REAPER_IDLE_SECONDS if delay is None else delay)
+        wakeup.clear()
 
 
 class LocalTTLCache(jwm._cache.ttl.cache.TTLCache):
-    def __init__(self) -> None:
-        self._cache: dict[bytes, dict[bytes, bytes]] = {}
-        self._ttl_timers: dict[bytes, dict[bytes, threading.Timer]] = {}
-        self._lock = threading.Lock()
+    "In memory TTL Cache implementation."
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        max_bytes: int | None = None,
+        policy: (
+            collections.abc.Callable[[int | None], jwm._cache.ttl.policy.EvictionPolicy]
+            | typing.Literal["lru", "wtinylfu"]
+        ) = "lru",
+        shards: int = 1,
+    ) -> None:
+        """In memory TTL Cache implementation.
+
+        Deadlines are kept in a min-heap that is drained by a single daemon
+        reaper thread, started on the first set. Expired entries are also
+        dropped lazily on get so a hit never returns a stale value.
+
+        Entries can be split across shards by key hash, each with its own
+        lock, deadline heap and eviction policy, so threads writing different
+        keys rarely contend. Limits are divided evenly between shards, making
+        eviction approximate when there is more than one. Gets only lock a
+        shard when they need to record a hit for eviction.
+
+        Args:
+            maxsize (int | None, optional): Maximum number of entries across
+                all namespaces, an entry chosen by the policy is evicted
+                when exceeded. Defaults to None which is unbounded.
+            max_bytes (int | None, optional): Maximum memory in bytes used by
+                keys, values and an estimated per entry overhead across all
+                namespaces, an entry chosen by the policy is evicted when
+                exceeded. Defaults to None which is unbounded.
+            policy (Callable[[int | None], EvictionPolicy] | Literal["lru", "wtinylfu"], optional):
+                Chooses which entry is evicted when maxsize or max_bytes is
+                exceeded. Factories are called with the maxsize of a shard.
+                Defaults to "lru".
+            shards (int, optional): Number of independently locked shards.
+                Defaults to 1.
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be greater than or equal to zero.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be greater than or equal to zero.")
+        if shards < 1:
+            raise ValueError("shards must be greater than or equal to one.")
+
+        policy_factory = _resolve_policy(policy)
+        self._shards: tuple[tuple[_TTLStore, threading.Lock], ...] = tuple(
+            (
+                _TTLStore(
+                    _split_limit(maxsize, shards),
+                    _split_limit(max_bytes, shards),
+                    policy_factory,
+                ),
+                threading.Lock(),
+            )
+            for _ in range(shards)
+        )
+        self._wakeup = threading.Event()
+        self._reaper_lock = threading.Lock()
+        self._reaper: threading.Thread | None = None
+
+    def _shard(self, key: bytes) -> tuple[_TTLStore, threading.Lock]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _group(
+        self, keys: collections.abc.Sequence[bytes]
+    ) -> list[tuple[tuple[_TTLStore, threading.Lock], list[int]]]:
+        "Indices of the keys grouped by shard, so each lock is taken once."
+        if len(self._shards) == 1:
+            return [(self._shards[0], list(range(len(keys))))]
+
+        groups: dict[int, list[int]] = {}
+        for index, key in enumerate(keys):
+            groups.setdefault(hash(key) % len(self._shards), []).append(index)
+        return [(self._shards[shard], indices) for shard, indices in groups.items()]
 
     def get(self, namespace: bytes, key: bytes) -> bytes | None:
-        return self._cache.get(namespace, {}).get(key, None)
+        store, lock = self._shard(key)
+        entry = store.lookup(namespace, key)
+        if entry is None:
+            return None
+
+        value, deadline = entry
+        if deadline <= time.monotonic():
+            with lock:
+                store.remove(namespace, key, deadline)
+            return None
+
+        if store.bounded:
+            with lock:
+                store.touch(namespace, key)
+
+        return value
 
     def set(
         self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
     ) -> None:
-        with self._lock:
-            namespace_cache = self._cache.get(namespace, {})
-            namespace_cache[key] = value
-            self._cache[namespace] = namespace_cache
+        deadline = time.monotonic() + ttl_seconds
+        store, lock = self._shard(key)
+        with lock:
+            earliest = store.insert(namespace, key, value, deadline)
 
-            namespace_timers = self._ttl_timers.get(namespace, {})
+        # The reaper only needs waking when it may be sleeping past this
+        # deadline
+        if self._reaper is None:
+            self._start_reaper()
+        elif earliest:
+            self._wakeup.set()
 
-            old_timer = namespace_timers.get(key, None)
-            if old_timer is not None:
-                old_timer.cancel()
+    def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        values: list[bytes | None] = [None] * len(keys)
+        now = time.monotonic()
+        for (store, lock), indices in self._group(keys):
+            with lock:
+                for index in indices:
+                    key = keys[index]
+                    entry = store.lookup(namespace, key)
+                    if entry is None:
+                        continue
 
-            timer = threading.Timer(
-                ttl_seconds, LocalTTLCache._delete, (self, namespace, key)
-            )
-            timer.daemon = True
-            timer.start()
+                    value, deadline = entry
+                    if deadline <= now:
+                        store.remove(namespace, key, deadline)
+                        continue
 
-            namespace_timers[key] = timer
-            self._ttl_timers[namespace] = namespace_timers
+                    if store.bounded:
+                        store.touch(namespace, key)
+                    values[index] = value
 
-    def clear(self, namespace: bytes) -> None:
-        with self._lock:
-            self._cache.pop(namespace, None)
+        return values
+
+    def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        if len(items) == 0:
+            return
 
-            namespace_timers = self._ttl_timers.get(namespace, {})
-            for timer in namespace_timers.values():
-                timer.cancel()
+        keys = list(items)
+        deadline = time.monotonic() + ttl_seconds
+        earliest = False
+        for (store, lock), indices in self._group(keys):
+            shard_keys = [keys[index] for index in indices]
+            with lock:
+                earliest |= (
+                    len(store.deadlines) == 0 or deadline < store.deadlines[0][0]
+                )
+                store.insert_many(
+                    namespace,
+                    shard_keys,
+                    [items[key] for key in shard_keys],
+                    [deadline] * len(shard_keys),
+                )
 
-            self._ttl_timers.pop(namespace, None)
+        if self._reaper is None:
+            self._start_reaper()
+        elif earliest:
+            self._wakeup.set()
+
+    def clear(self, namespace: bytes) -> None:
+        for store, lock in self._shards:
+            with lock:
+                store.clear(namespace)
 
     def get_size(self, namespace: bytes) -> int:
-        return len(self._ttl_timers.get(namespace, {}))
+        size = 0
+        for store, lock in self._shards:
+            with lock:
+                store.expire(time.monotonic())
+                size += store.size(namespace)
+        return size
 
-    def _delete(self, namespace: bytes, key: bytes) -> None:
-        with self._lock:
-            namespace_cache = self._cache.get(namespace, None)
-            if namespace_cache is None:
-                return
+    def get_bytes(self, namespace: bytes) -> int:
+        """Gets the estimated memory used by values in the namespace
+
+        Args:
+            namespace (bytes): Namespace to query
+
+        Returns:
+            int: Number of bytes
+        """
+        bytes_ = 0
+        for store, lock in self._shards:
+            with lock:
+                store.expire(time.monotonic())
+                bytes_ += store.size_bytes(namespace)
+        return bytes_
+
+    def get_evictions(self, namespace: bytes) -> int:
+        """Gets the number of values evicted from the namespace to respect
+        size limits since it was last cleared.
+
+        Args:
+            namespace (bytes): Namespace to query
+
+        Returns:
+            int: Number of evictions
+        """
+        return sum(store.evicted(namespace) for store, _ in self._shards)
+
+    def set_maxsize(self, namespace: bytes, maxsize: int | None) -> None:
+        """Limits the number of values in a namespace, the least recently
+        used value is evicted when exceeded.
+
+        Each shard is given an equal share of the limit rounded up, so with
+        more than one shard up to `shards - 1` values beyond it may be kept.
+
+        Args:
+            namespace (bytes): Namespace to limit
+            maxsize (int | None): Maximum number of values, None removes the
+                limit
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be greater than or equal to zero.")
+
+        for store, lock in self._shards:
+            with lock:
+                store.set_maxsize(namespace, _split_limit(maxsize, len(self._shards)))
+
+    def dump(self, path: str | os.PathLike) -> int:
+        """Writes every live entry and its remaining time to live to a
+        snapshot file, to be restored with `load`.
+
+        Each shard is copied under its lock and written once the lock is
+        released. The snapshot is written beside the path and then renamed
+        over it, so a partially written snapshot is never loaded. Values
+        that are not bytes, stored by the "identity" serializer, are
+        skipped.
+
+        Args:
+            path (str | PathLike): Snapshot file, replaced if it exists.
+
+        Returns:
+            int: Number of entries written.
+        """
+        path = os.fspath(path)
+        temporary_path = f"{path}.tmp"
+
+        written = 0
+        try:
+            with open(temporary_path, "wb") as file:
+                file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, time.time()))
+                for store, lock in self._shards:
+                    with lock:
+                        now = time.monotonic()
+                        namespaces = [
+                            (namespace, list(namespace_cache.items()))
+                            for namespace, namespace_cache in store.cache.items()
+                        ]
+
+                    for namespace, items in namespaces:
+                        written += _write_snapshot_block(file, namespace, items, now)
+
+            os.replace(temporary_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            raise
+        return written
+
+    def load(self, path: str | os.PathLike) -> int:
+        """Adds the entries of a snapshot written by `dump`, overwriting
+        entries with the same key.
+
+        Time passed since the dump counts against the remaining time to live
+        and entries that have expired in the meantime are skipped. Limits are
+        enforced as entries are added.
+
+        Args:
+            path (str | PathLike): Snapshot file.
+
+        Raises:
+            ValueError: The file is not a complete snapshot.
+
+        Returns:
+            int: Number of entries added.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+
+        try:
+            magic, dumped_at = _SNAPSHOT_HEADER.unpack_from(data, 0)
+        except struct.error:
+            magic = None
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{os.fspath(path)} is not a LocalTTLCache snapshot.")
+
+        now = time.monotonic()
+        # Wall clock time spent restarting counts against remaining TTLs
+        base = now - max(0.0, time.time() - dumped_at)
+        shard_count = len(self._shards)
+
+        loaded = 0
+        offset = _SNAPSHOT_HEADER.size
+        while offset < len(data):
+            try:
+                namespace, keys, values, remainings, offset = _read_snapshot_block(
+                    data, offset
+                )
+            except (struct.error, ValueError):
+                raise ValueError(f"{os.fspath(path)} is truncated.") from None
+
+            deadlines = [base + remaining for remaining in remainings]
+            if len(deadlines) > 0 and min(deadlines) <= now:
+                live = [deadline > now for deadline in deadlines]
+                keys = list(itertools.compress(keys, live))
+                values = list(itertools.compress(values, live))
+                deadlines = list(itertools.compress(deadlines, live))
 
-            namespace_cache.pop(key, None)
-            if len(namespace_cache) == 0:
-                del self._cache[namespace]
+            if shard_count == 1:
+                shard_entries = [(keys, values, deadlines)]
             else:
-                self._cache[namespace] = namespace_cache
+                shard_entries = [([], [], []) for _ in range(shard_count)]
+                for key, value, deadline in zip(keys, values, deadlines):
+                    shard_keys, shard_values, shard_deadlines = shard_entries[
+                        hash(key) % shard_count
+                    ]
+                    shard_keys.append(key)
+                    shard_values.append(value)
+                    shard_deadlines.append(deadline)
+
+            for (store, lock), entries in zip(self._shards, shard_entries):
+                with lock:
+                    store.insert_many(namespace, *entries)
+            loaded += len(keys)
+
+        if loaded > 0:
+            if self._reaper is None:
+                self._start_reaper()
+            else:
+                self._wakeup.set()
+
+        return loaded
+
+    def delete(self, namespace: bytes, key: bytes) -> None:
+        """Removes a value from the cache if present.
+
+        Args:
+            namespace (bytes): Namespace of the key
+            key (bytes): Key to remove
+        """
+        store, lock = self._shard(key)
+        with lock:
+            store.remove(namespace, key)
+
+    def _start_reaper(self) -> None:
+        with self._reaper_lock:
+            if self._reaper is not None:
+                return
+
+            wakeup = self._wakeup
+            cache_ref = weakref.ref(self, lambda _: wakeup.set())
+            reaper = threading.Thread(
+                target=_reap,
+                args=(cache_ref, wakeup),
+                name="jwm.cache-reaper",
+                daemon=True,
+            )
+            reaper.start()
+            self._reaper = reaper
+
+
+async def _sweep(cache_ref: weakref.ref) -> None:
+    """Sweep task target, periodically expires entries.
+
+    Exits once there is nothing left to expire, the next set starts a new
+    sweep. Only holds a weak reference to the cache between sweeps.
+
+    Args:
+        cache_ref (ref): Weak reference to the AsyncLocalTTLCache being swept.
+    """
+    while True:
+        cache: AsyncLocalTTLCache | None = cache_ref()
+        if cache is None:
+            return
+
+        delay = cache._store.expire(time.monotonic())
+        if delay is None:
+            cache._sweeper = None
+            return
+
+        # Batch expiries together rather than waking for every deadline
+        delay = max(delay, cache.sweep_interval_seconds)
+        del cache
+
+        await asyncio.sleep(delay)
 
 
 class AsyncLocalTTLCache(jwm._cache.ttl.cache.AsyncTTLCache):
-    def __init__(self) -> None:
-        self._cache: dict[bytes, dict[bytes, bytes]] = {}
-        self._ttl_timers: dict[bytes, dict[bytes, asyncio.TimerHandle]] = {}
-        self._lock = asyncio.Lock()
+    "Async in memory TTL Cache implementation."
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        max_bytes: int | None = None,
+        policy: (
+            collections.abc.Callable[[int | None], jwm._cache.ttl.policy.EvictionPolicy]
+            | typing.Literal["lru", "wtinylfu"]
+        ) = "lru",
+        sweep_interval_seconds: float = SWEEP_INTERVAL_SECONDS,
+    ) -> None:
+        """Async in memory TTL Cache implementation.
+
+        Deadlines are stored next to the values and checked on get. A single
+        sweep task per cache, started on set, removes expired entries at most
+        once every `sweep_interval_seconds`. No timers or tasks are created
+        per entry.
+
+        All operations run to completion without awaiting so no lock is
+        needed, the cache must only be used from one event loop at a time.
+
+        Args:
+            maxsize (int | None, optional): Maximum number of entries across
+                all namespaces, an entry chosen by the policy is evicted
+                when exceeded. Defaults to None which is unbounded.
+            max_bytes (int | None, optional): Maximum memory in bytes used by
+                keys, values and an estimated per entry overhead across all
+                namespaces, an entry chosen by the policy is evicted when
+                exceeded. Defaults to None which is unbounded.
+            policy (Callable[[int | None], EvictionPolicy] | Literal["lru", "wtinylfu"], optional):
+                Chooses which entry is evicted when maxsize or max_bytes is
+                exceeded. Factories are called with maxsize. Defaults to
+                "lru".
+            sweep_interval_seconds (float, optional): Shortest time between
+                sweeps. Defaults to 1.
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be greater than or equal to zero.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be greater than or equal to zero.")
+
+        self.sweep_interval_seconds = sweep_interval_seconds
 
-    async def get(self, namespace: bytes, key: bytes) -> bytes:
-        return self._cache.get(namespace, {}).get(key, None)
+        self._store = _TTLStore(maxsize, max_bytes, _resolve_policy(policy))
+        self._sweeper: asyncio.Task | None = None
+
+    async def get(self, namespace: bytes, key: bytes) -> bytes | None:
+        entry = self._store.lookup(namespace, key)
+        if entry is None:
+            return None
+
+        value, deadline = entry
+        if deadline <= time.monotonic():
+            self._store.remove(namespace, key, deadline)
+            return None
+
+        if self._store.bounded:
+            self._store.touch(namespace, key)
+
+        return value
 
     async def set(
         self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
     ) -> None:
-        async with self._lock:
-            namespace_cache = self._cache.get(namespace, {})
-            namespace_cache[key] = value
-            self._cache[namespace] = namespace_cache
+        self._store.insert(namespace, key, value, time.monotonic() + ttl_seconds)
 
-            namespace_timers = self._ttl_timers.get(namespace, {})
+        loop = asyncio.get_running_loop()
+        if (
+            self._sweeper is None
+            or self._sweeper.done()
+            or self._sweeper.get_loop() is not loop
+        ):
+            self._sweeper = loop.create_task(_sweep(weakref.ref(self)))
 
-            old_timer = namespace_timers.get(key, None)
-            if old_timer is not None:
-                old_timer.cancel()
+    async def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        values: list[bytes | None] = [None] * len(keys)
+        now = time.monotonic()
+        for index, key in enumerate(keys):
+            entry = self._store.lookup(namespace, key)
+            if entry is None:
+                continue
 
-            timer = asyncio.get_running_loop().call_later(
-                ttl_seconds,
-                lambda: asyncio.create_task(
-                    AsyncLocalTTLCache._delete(self, namespace, key)
-                ),
-            )
+            value, deadline = entry
+            if deadline <= now:
+                self._store.remove(namespace, key, deadline)
+                continue
 
-            namespace_timers[key] = timer
-            self._ttl_timers[namespace] = namespace_timers
+            if self._store.bounded:
+                self._store.touch(namespace, key)
+            values[index] = value
 
-    async def clear(self, namespace: bytes) -> None:
-        async with self._lock:
-            self._cache.pop(namespace, None)
+        return values
 
-            namespace_timers = self._ttl_timers.get(namespace, {})
-            for timer in namespace_timers.values():
-                timer.cancel()
+    async def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        deadline = time.monotonic() + ttl_seconds
+        self._store.insert_many(
+            namespace, list(items), list(items.values()), [deadline] * len(items)
+        )
 
-            self._ttl_timers.pop(namespace, None)
+        loop = asyncio.get_running_loop()
+        if (
+            self._sweeper is None
+            or self._sweeper.done()
+            or self._sweeper.get_loop() is not loop
+        ):
+            self._sweeper = loop.create_task(_sweep(weakref.ref(self)))
+
+    async def clear(self, namespace: bytes) -> None:
+        self._store.clear(namespace)
 
     async def get_size(self, namespace: bytes) -> int:
-        return len(self._ttl_timers.get(namespace, {}))
+        self._store.expire(time.monotonic())
+        return self._store.size(namespace)
 
-    async def _delete(self, namespace: bytes, key: bytes) -> None:
-        async with self._lock:
-            namespace_cache = self._cache.get(namespace, None)
-            if namespace_cache is None:
-                return
+    async def get_bytes(self, namespace: bytes) -> int:
+        """Gets the estimated memory used by values in the namespace
 
-            namespace_cache.pop(key, None)
-            if len(namespace_cache) == 0:
-                del self._cache[namespace]
-            else:
-                self._cache[namespace] = namespace_cache
+        Args:
+            namespace (bytes): Namespace to query
+
+        Returns:
+            int: Number of bytes
+        """
+        self._store.expire(time.monotonic())
+        return self._store.size_bytes(namespace)
+
+    async def get_evictions(self, namespace: bytes) -> int:
+        """Gets the number of values evicted from the namespace to respect
+        size limits since it was last cleared.
+
+        Args:
+            namespace (bytes): Namespace to query
+
+        Returns:
+            int: Number of evictions
+        """
+        return self._store.evicted(namespace)
+
+    def set_maxsize(self, namespace: bytes, maxsize: int | None) -> None:
+        """Limits the number of values in a namespace, the least recently
+        used value is evicted when exceeded.
+
+        Not a coroutine as it only changes configuration, allowing it to be
+        called when decorating outside of a running event loop.
+
+        Args:
+            namespace (bytes): Namespace to limit
+            maxsize (int | None): Maximum number of values, None removes the
+                limit
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be greater than or equal to zero.")
+
+        self._store.set_maxsize(namespace, maxsize)
+
+    async def delete(self, namespace: bytes, key: bytes) -> None:
+        """Removes a value from the cache if present.
+
+        Args:
+            namespace (bytes): Namespace of the key
+            key (bytes): Key to remove
+        """
+        self._store.remove(namespace, key)
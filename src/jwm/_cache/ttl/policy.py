@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import collections
+import collections.abc
+import typing
+
+SKETCH_DEPTH: int = 4
+"Number of rows in the count-min sketch"
+
+SKETCH_MAX_COUNT: int = 15
+"Largest frequency a sketch counter can hold before saturating"
+
+_SKETCH_SEEDS: tuple[int, ...] = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+_SKETCH_HALVE = bytes(count >> 1 for count in range(256))
+_MASK_64 = (1 << 64) - 1
+
+
+class EvictionPolicy(typing.Protocol):
+    """Protocol for choosing which entry a bounded local cache evicts.
+
+    Keys are opaque hashable objects supplied by the cache. A policy is only
+    consulted while the cache is over one of its limits.
+    """
+
+    def insert(self, key: collections.abc.Hashable) -> None:
+        """Track a newly stored key.
+
+        Args:
+            key (Hashable): Key that was stored.
+        """
+
+    def access(self, key: collections.abc.Hashable) -> None:
+        """Record a hit or overwrite of a tracked key.
+
+        Args:
+            key (Hashable): Key that was accessed.
+        """
+
+    def remove(self, key: collections.abc.Hashable) -> None:
+        """Stop tracking a key, called for every removal including
+        evictions.
+
+        Args:
+            key (Hashable): Key that was removed.
+        """
+
+    def victim(self) -> collections.abc.Hashable:
+        """Choose the next key to evict. The cache removes the key
+        afterwards, the policy must not stop tracking it itself.
+
+        Returns:
+            Hashable: Key to evict.
+        """
+
+
+class LRUPolicy(EvictionPolicy):
+    "Least Recently Used (LRU) implementation of EvictionPolicy."
+
+    def __init__(self, capacity: int | None = None) -> None:
+        """Creates a LRU policy.
+
+        Args:
+            capacity (int | None, optional): Expected number of entries,
+                unused. Defaults to None.
+        """
+        self._order: collections.OrderedDict[collections.abc.Hashable, None] = (
+            collections.OrderedDict()
+        )
+
+    def insert(self, key: collections.abc.Hashable) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def access(self, key: collections.abc.Hashable) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: collections.abc.Hashable) -> None:
+        del self._order[key]
+
+    def victim(self) -> collections.abc.Hashable:
+        return next(iter(self._order))
+
+
+class CountMinSketch:
+    """Approximate frequency counter with 4 bit saturating counters.
+
+    Counters are halved once the number of recorded increments reaches the
+    sample size so frequencies decay and the sketch follows changes in
+    popularity.
+    """
+
+    def __init__(self, width: int, sample_size: int | None = None) -> None:
+        """Creates a count-min sketch.
+
+        Args:
+            width (int): Minimum number of counters per row, rounded up to a
+                power of two.
+            sample_size (int | None, optional): Number of increments between
+                halving every counter. Defaults to None which is ten times
+                the width.
+        """
+        self._shift = 64 - max(4, (width - 1).bit_length())
+        self._width = 1 << (64 - self._shift)
+        self._table = bytearray(SKETCH_DEPTH * self._width)
+        self._additions = 0
+        self._sample_size = sample_size or 10 * self._width
+
+    def _indexes(self, key: collections.abc.Hashable) -> list[int]:
+        hash_ = hash(key) & _MASK_64
+        return [
+            row * self._width + (((hash_ * seed) & _MASK_64) >> self._shift)
+            for row, seed in enumerate(_SKETCH_SEEDS)
+        ]
+
+    def increment(self, key: collections.abc.Hashable) -> None:
+        """Record an occurrence of the key.
+
+        Args:
+            key (Hashable): Key to count.
+        """
+        # Conservative update, only the smallest counters are incremented
+        # which keeps overestimates from colliding keys low
+        table = self._table
+        indexes = self._indexes(key)
+        count = min(table[index] for index in indexes)
+        if count < SKETCH_MAX_COUNT:
+            for index in indexes:
+                if table[index] == count:
+                    table[index] = count + 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._table = self._table.translate(_SKETCH_HALVE)
+            self._additions //= 2
+
+    def frequency(self, key: collections.abc.Hashable) -> int:
+        """Estimate how often the key occurred.
+
+        Args:
+            key (Hashable): Key to query.
+
+        Returns:
+            int: Estimated frequency, never an underestimate before decay.
+        """
+        table = self._table
+        return min(table[index] for index in self._indexes(key))
+
+
+class WTinyLFUPolicy(EvictionPolicy):
+    """Window TinyLFU (W-TinyLFU) implementation of EvictionPolicy.
+
+    New keys enter a small LRU admission window. Keys leaving the window join
+    the probation segment of a segmented LRU (SLRU) main region, and are
+    promoted to its protected segment when hit again. When an eviction is
+    needed the newest probation key competes with the oldest, and the one
+    with the lower frequency in a count-min sketch is evicted. One-off keys
+    from scans therefore rarely displace frequently used ones.
+
+    Segment sizes are proportions of the number of tracked keys so the
+    policy works with both entry and byte limits.
+    """
+
+    def __init__(
+        self,
+        capacity: int | None = None,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+    ) -> None:
+        """Creates a W-TinyLFU policy.
+
+        Args:
+            capacity (int | None, optional): Expected number of entries, used
+                to size the frequency sketch. Defaults to None which sizes
+                for 1024 entries.
+            window_ratio (float, optional): Proportion of keys kept in the
+                admission window. Defaults to 0.01.
+            protected_ratio (float, optional): Proportion of the main region
+                kept in the protected segment. Defaults to 0.8.
+        """
+        self.window_ratio = window_ratio
+        self.protected_ratio = protected_ratio
+
+        # A sketch wider than the capacity keeps collisions from making
+        # one-off keys look popular, aging still follows the capacity
+        capacity = max(capacity or 1024, 16)
+        self._sketch = CountMinSketch(8 * capacity, 10 * capacity)
+        self._window: collections.OrderedDict[collections.abc.Hashable, None] = (
+            collections.OrderedDict()
+        )
+        self._probation: collections.OrderedDict[collections.abc.Hashable, None] = (
+            collections.OrderedDict()
+        )
+        self._protected: collections.OrderedDict[collections.abc.Hashable, None] = (
+            collections.OrderedDict()
+        )
+
+    def insert(self, key: collections.abc.Hashable) -> None:
+        self._sketch.increment(key)
+        self._window[key] = None
+
+        total = len(self._window) + len(self._probation) + len(self._protected)
+        window_size = max(1, int(total * self.window_ratio))
+        while len(self._window) > window_size:
+            candidate, _ = self._window.popitem(last=False)
+            self._probation[candidate] = None
+
+    def access(self, key: collections.abc.Hashable) -> None:
+        self._sketch.increment(key)
+
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+
+            protected_size = int(
+                (len(self._probation) + len(self._protected)) * self.protected_ratio
+            )
+            while len(self._protected) > max(1, protected_size):
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+
+    def remove(self, key: collections.abc.Hashable) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                del segment[key]
+                return
+
+    def victim(self) -> collections.abc.Hashable:
+        if len(self._probation) == 0:
+            segment = self._protected if len(self._protected) > 0 else self._window
+            return next(iter(segment))
+
+        victim = next(iter(self._probation))
+        candidate = next(reversed(self._probation))
+        if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+            return victim
+        return candidate
+
+
+POLICIES: dict[str, collections.abc.Callable[[int | None], EvictionPolicy]] = {
+    "lru": LRUPolicy,
+    "wtinylfu": WTinyLFUPolicy,
+}
+"Eviction policy factories by name"
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import collections.abc
 import datetime
+import time
 
 try:
     import redis
@@ -12,144 +14,521 @@ except ModuleNotFoundError:
 
 import jwm._cache.ttl.cache
 
+GENERATION_TTL_SECONDS: float = 1
+"Default time a namespace generation is cached locally"
+
+FENCE_TTL_SECONDS: float = 7 * 24 * 60 * 60
+"Time a namespace's fencing counter is kept after its last lock"
+
+_GENERATION_PREFIX = b"jwm.cache.generation:"
+_INDEX_PREFIX = b"jwm.cache.index:"
+_LOCK_PREFIX = b"jwm.cache.lock:"
+_FENCE_PREFIX = b"jwm.cache.fence:"
+
+# KEYS: lock, fence counter. ARGV: lock ttl in milliseconds, fence counter ttl
+# in milliseconds. Tokens only need to increase while a lock may be alive, so
+# the counter outlives every lock it issued and then expires
+_ACQUIRE_LOCK = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return false
+end
+local token = redis.call("INCR", KEYS[2])
+redis.call("SET", KEYS[1], token, "PX", ARGV[1])
+redis.call("PEXPIRE", KEYS[2], math.max(tonumber(ARGV[1]), tonumber(ARGV[2])))
+return token
+"""
+
+# KEYS: lock, value, index. ARGV: token, value, ttl in milliseconds, deadline
+# in milliseconds, key. Matches _queue_set, the deadline less the ttl is now
+_SET_LOCKED = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call("DEL", KEYS[1])
+redis.call("SET", KEYS[2], ARGV[2], "PX", ARGV[3])
+redis.call("ZREMRANGEBYSCORE", KEYS[3], "-inf", tonumber(ARGV[4]) - tonumber(ARGV[3]))
+redis.call("ZADD", KEYS[3], ARGV[4], ARGV[5])
+redis.call("PEXPIRE", KEYS[3], ARGV[3], "NX")
+redis.call("PEXPIRE", KEYS[3], ARGV[3], "GT")
+return 1
+"""
+
+# KEYS: lock. ARGV: token
+_RELEASE_LOCK = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _generation_key(namespace: bytes) -> bytes:
+    return _GENERATION_PREFIX + namespace
+
+
+def _key_prefix(namespace: bytes, generation: int) -> bytes:
+    "Prefix of every key in a generation of a namespace."
+    return b"%b\x00%d\x00" % (namespace, generation)
+
+
+def _index_key(prefix: bytes) -> bytes:
+    "Sorted set of the keys of a namespace generation scored by deadline."
+    return _INDEX_PREFIX + prefix
+
+
+def _lock_key(prefix: bytes, key: bytes) -> bytes:
+    return _LOCK_PREFIX + prefix + key
+
+
+def _set_locked_args(
+    prefix: bytes, key: bytes, value: bytes, ttl_milliseconds: int, token: int
+) -> tuple[list[bytes], list[bytes | int | float]]:
+    "Keys and arguments of the set locked script, matching _queue_set."
+    return (
+        [_lock_key(prefix, key), prefix + key, _index_key(prefix)],
+        [
+            token,
+            value,
+            ttl_milliseconds,
+            time.time() * 1_000 + ttl_milliseconds,
+            key,
+        ],
+    )
+
+
+def _queue_set(
+    pipeline: redis.client.Pipeline | redis.asyncio.client.Pipeline,
+    prefix: bytes,
+    key: bytes,
+    value: bytes,
+    ttl_milliseconds: int,
+) -> None:
+    """Queue a write and its index entry. Expired entries are trimmed on every
+    write, as the index only expires with its last entry, which steady writes
+    keep pushing back. Extending its expiry needs Redis 7.0 or later."""
+    index_key = _index_key(prefix)
+    now = time.time() * 1_000
+    pipeline.set(prefix + key, value, px=ttl_milliseconds)
+    pipeline.zremrangebyscore(index_key, "-inf", now)
+    pipeline.zadd(index_key, {key: now + ttl_milliseconds})
+    pipeline.pexpire(index_key, ttl_milliseconds, nx=True)
+    pipeline.pexpire(index_key, ttl_milliseconds, gt=True)
+
+
+def _queue_delete(
+    pipeline: redis.client.Pipeline | redis.asyncio.client.Pipeline,
+    prefix: bytes,
+    key: bytes,
+) -> None:
+    pipeline.delete(prefix + key)
+    pipeline.zrem(_index_key(prefix), key)
+
+
+def _queue_size(
+    pipeline: redis.client.Pipeline | redis.asyncio.client.Pipeline,
+    prefix: bytes,
+) -> None:
+    "Queue trimming expired index entries and counting the rest."
+    index_key = _index_key(prefix)
+    pipeline.zremrangebyscore(index_key, "-inf", time.time() * 1_000)
+    pipeline.zcard(index_key)
+
+
+class _Generations:
+    """Short lived local copies of namespace generations.
+
+    A namespace is cleared by incrementing its generation in Redis, which
+    changes the prefix of every key in it. Other processes notice the new
+    generation once their copy expires.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._generations: dict[bytes, tuple[int, float]] = {}
+
+    def get(self, namespace: bytes) -> int | None:
+        entry = self._generations.get(namespace, None)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def store(self, namespace: bytes, generation: int) -> None:
+        self._generations[namespace] = (
+            generation,
+            time.monotonic() + self.ttl_seconds,
+        )
+
+    def forget(self, namespace: bytes) -> None:
+        self._generations.pop(namespace, None)
+
+
 if HAS_TTL_REDIS_CACHE:
 
     class RedisTTLCache(jwm._cache.ttl.cache.TTLCache):
         "Sync redis TTL Cache implementation."
 
-        def __init__(self, client: redis.asyncio.Redis) -> None:
+        def __init__(
+            self,
+            client: redis.Redis,
+            generation_ttl_seconds: float = GENERATION_TTL_SECONDS,
+        ) -> None:
             """Redis Cache implementation.
 
+            Every namespace has a generation counter stored in Redis which
+            prefixes its keys. Clearing a namespace increments the counter in
+            a single command, keys of older generations are no longer read
+            and expire by their TTL. Generations are cached locally for
+            `generation_ttl_seconds`, so other processes may read a cleared
+            namespace for up to that long.
+
+            Each namespace generation also keeps a sorted set of its keys
+            scored by expiry, so `get_size` costs a single round trip rather
+            than a scan of the keyspace. Keys evicted by Redis under memory
+            pressure are counted until their TTL passes. Requires Redis 7.0
+            or later.
+
             Args:
                 redis (Redis): Redis client.
+                generation_ttl_seconds (float, optional): Time a namespace
+                    generation is cached locally. Defaults to 1.
             """
             self.client = client
+            self._generations = _Generations(generation_ttl_seconds)
+            self._acquire_lock = client.register_script(_ACQUIRE_LOCK)
+            self._set_locked = client.register_script(_SET_LOCKED)
+            self._release_lock = client.register_script(_RELEASE_LOCK)
 
         @staticmethod
-        def from_url(url: str) -> RedisTTLCache:
+        def from_url(
+            url: str, generation_ttl_seconds: float = GENERATION_TTL_SECONDS
+        ) -> RedisTTLCache:
             """Create an RedisTTLCache from a redis server url.
 
             Args:
                 url (str): Redis URL.
+                generation_ttl_seconds (float, optional): Time a namespace
+                    generation is cached locally. Defaults to 1.
 
             Returns:
                 RedisTTLCache: Created RedisTTLCache instance.
             """
             client = redis.from_url(url)
-            return RedisTTLCache(client)
+            return RedisTTLCache(client, generation_ttl_seconds)
 
         def get(self, namespace: bytes, key: bytes) -> bytes | None:
-            return self.client.get(namespace + key)
+            return self.client.get(self._prefix(namespace) + key)
 
         def set(
             self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
         ) -> None:
+            prefix = self._prefix(namespace)
+            pipeline = self.client.pipeline()
             # Redis does not support ttl of zero
             if int(ttl_seconds * 1_000) == 0:
-                self.client.delete(namespace + key)
+                _queue_delete(pipeline, prefix, key)
+            else:
+                _queue_set(pipeline, prefix, key, value, int(ttl_seconds * 1_000))
+            pipeline.execute()
+
+        def get_many(
+            self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+        ) -> list[bytes | None]:
+            if len(keys) == 0:
+                return []
+            prefix = self._prefix(namespace)
+            return self.client.mget([prefix + key for key in keys])
+
+        def set_many(
+            self,
+            namespace: bytes,
+            items: collections.abc.Mapping[bytes, bytes],
+            ttl_seconds: float = 60,
+        ) -> None:
+            if len(items) == 0:
                 return
-
-            self.client.set(namespace + key, value, px=int(ttl_seconds * 1_000))
+            prefix = self._prefix(namespace)
+            pipeline = self.client.pipeline()
+            for key, value in items.items():
+                if int(ttl_seconds * 1_000) == 0:
+                    _queue_delete(pipeline, prefix, key)
+                else:
+                    _queue_set(pipeline, prefix, key, value, int(ttl_seconds * 1_000))
+            pipeline.execute()
 
         def clear(self, namespace: bytes) -> None:
-            keys: list[bytes] = []
-            cursor: int = 0
-            while True:
-                response: tuple[int, list[bytes]] = self.client.scan(
-                    cursor=cursor, match=namespace + b"*"
-                )
-                cursor, batch_keys = response
+            generation = self.client.incr(_generation_key(namespace))
+            self._generations.store(namespace, generation)
 
-                keys.extend(batch_keys)
+        def get_size(self, namespace: bytes) -> int:
+            pipeline = self.client.pipeline()
+            _queue_size(pipeline, self._prefix(namespace))
+            _, size = pipeline.execute()
+            return size
 
-                if cursor == 0:
-                    break
+        def acquire_lock(
+            self, namespace: bytes, key: bytes, ttl_seconds: float
+        ) -> int | None:
+            """Atomically takes the lock of a key unless another caller holds
+            it, used to let a single caller compute a missing value.
 
-            if len(batch_keys) > 0:
-                self.client.delete(*batch_keys)
+            The lock expires after `ttl_seconds` so a crashed holder cannot
+            block the key. Every lock of a namespace receives a larger fencing
+            token than the last.
 
-        def get_size(self, namespace: bytes) -> int:
-            count_: int = 0
-            cursor: int = 0
-            while True:
-                response: tuple[int, list[bytes]] = self.client.scan(
-                    cursor=cursor, match=namespace + b"*"
-                )
-                cursor, batch_keys = response
+            Args:
+                namespace (bytes): Namespace of the key
+                key (bytes): Key to lock
+                ttl_seconds (float): Time until the lock expires
+
+            Returns:
+                int | None: Fencing token, None if the lock is held
+            """
+            return self._acquire_lock(
+                keys=[
+                    _lock_key(self._prefix(namespace), key),
+                    _FENCE_PREFIX + namespace,
+                ],
+                args=[
+                    max(1, int(ttl_seconds * 1_000)),
+                    int(FENCE_TTL_SECONDS * 1_000),
+                ],
+            )
+
+        def set_locked(
+            self,
+            namespace: bytes,
+            key: bytes,
+            value: bytes,
+            ttl_seconds: float,
+            token: int,
+        ) -> bool:
+            """Sets a value and releases its lock, only if the lock is still
+            held with the fencing token. A holder whose lock expired, or whose
+            namespace was cleared, cannot overwrite a newer value.
+
+            Args:
+                namespace (bytes): Key namespace
+                key (bytes): Value key
+                value (bytes): Value
+                ttl_seconds (float): Time to live in seconds
+                token (int): Fencing token returned by acquire_lock
+
+            Returns:
+                bool: Whether the value was set
+            """
+            prefix = self._prefix(namespace)
+            if int(ttl_seconds * 1_000) == 0:
+                self.release_lock(namespace, key, token)
+                return False
+
+            keys, args = _set_locked_args(
+                prefix, key, value, int(ttl_seconds * 1_000), token
+            )
+            return self._set_locked(keys=keys, args=args) == 1
+
+        def release_lock(self, namespace: bytes, key: bytes, token: int) -> None:
+            """Releases the lock of a key if it is still held with the
+            fencing token.
+
+            Args:
+                namespace (bytes): Namespace of the key
+                key (bytes): Key to unlock
+                token (int): Fencing token returned by acquire_lock
+            """
+            self._release_lock(
+                keys=[_lock_key(self._prefix(namespace), key)], args=[token]
+            )
 
-                count_ += len(batch_keys)
+        def expire_generation(self, namespace: bytes) -> None:
+            """Drops the locally cached generation of a namespace, so a clear
+            by another process is seen by the next operation.
 
-                if cursor == 0:
-                    break
+            Args:
+                namespace (bytes): Namespace cleared elsewhere
+            """
+            self._generations.forget(namespace)
 
-            return count_
+        def _prefix(self, namespace: bytes) -> bytes:
+            generation = self._generations.get(namespace)
+            if generation is None:
+                generation = int(self.client.get(_generation_key(namespace)) or 0)
+                self._generations.store(namespace, generation)
+            return _key_prefix(namespace, generation)
 
     class AsyncRedisTTLCache(jwm._cache.ttl.cache.AsyncTTLCache):
         "Async redis TTL Cache implementation."
 
-        def __init__(self, client: redis.asyncio.Redis) -> None:
+        def __init__(
+            self,
+            client: redis.asyncio.Redis,
+            generation_ttl_seconds: float = GENERATION_TTL_SECONDS,
+        ) -> None:
             """Redis Cache implementation.
 
+            Namespaces are cleared by incrementing a generation counter and
+            sizes are read from a sorted set of keys, see RedisTTLCache.
+
             Args:
                 redis (Redis): Async Redis client.
+                generation_ttl_seconds (float, optional): Time a namespace
+                    generation is cached locally. Defaults to 1.
             """
             self.client = client
+            self._generations = _Generations(generation_ttl_seconds)
+            self._acquire_lock = client.register_script(_ACQUIRE_LOCK)
+            self._set_locked = client.register_script(_SET_LOCKED)
+            self._release_lock = client.register_script(_RELEASE_LOCK)
 
         @staticmethod
-        def from_url(url: str) -> AsyncRedisTTLCache:
+        def from_url(
+            url: str, generation_ttl_seconds: float = GENERATION_TTL_SECONDS
+        ) -> AsyncRedisTTLCache:
             """Create an AsyncRedisTTLCache from a redis server url.
 
             Args:
                 url (str): Redis URL.
+                generation_ttl_seconds (float, optional): Time a namespace
+                    generation is cached locally. Defaults to 1.
 
             Returns:
                 AsyncRedisTTLCache: Created AsyncRedisTTLCache instance.
             """
             client = redis.asyncio.from_url(url)
-            return AsyncRedisTTLCache(client)
+            return AsyncRedisTTLCache(client, generation_ttl_seconds)
 
         async def get(self, namespace: bytes, key: bytes) -> bytes | None:
-            return await self.client.get(namespace + key)
+            return await self.client.get(await self._prefix(namespace) + key)
 
         async def set(
             self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
         ) -> None:
+            prefix = await self._prefix(namespace)
+            pipeline = self.client.pipeline()
             # Redis does not support ttl of zero
             if int(ttl_seconds * 1_000) == 0:
-                await self.client.delete(namespace + key)
+                _queue_delete(pipeline, prefix, key)
+            else:
+                _queue_set(pipeline, prefix, key, value, int(ttl_seconds * 1_000))
+            await pipeline.execute()
+
+        async def get_many(
+            self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+        ) -> list[bytes | None]:
+            if len(keys) == 0:
+                return []
+            prefix = await self._prefix(namespace)
+            return await self.client.mget([prefix + key for key in keys])
+
+        async def set_many(
+            self,
+            namespace: bytes,
+            items: collections.abc.Mapping[bytes, bytes],
+            ttl_seconds: float = 60,
+        ) -> None:
+            if len(items) == 0:
                 return
-
-            await self.client.set(namespace + key, value, px=int(ttl_seconds * 1_000))
+            prefix = await self._prefix(namespace)
+            pipeline = self.client.pipeline()
+            for key, value in items.items():
+                if int(ttl_seconds * 1_000) == 0:
+                    _queue_delete(pipeline, prefix, key)
+                else:
+                    _queue_set(pipeline, prefix, key, value, int(ttl_seconds * 1_000))
+            await pipeline.execute()
 
         async def clear(self, namespace: bytes) -> None:
-            keys: list[bytes] = []
-            cursor: int = 0
-            while True:
-                response: tuple[int, list[bytes]] = await self.client.scan(
-                    cursor=cursor, match=namespace + b"*"
-                )
-                cursor, batch_keys = response
+            generation = await self.client.incr(_generation_key(namespace))
+            self._generations.store(namespace, generation)
 
-                keys.extend(batch_keys)
+        async def get_size(self, namespace: bytes) -> int:
+            pipeline = self.client.pipeline()
+            _queue_size(pipeline, await self._prefix(namespace))
+            _, size = await pipeline.execute()
+            return size
 
-                if cursor == 0:
-                    break
+        async def acquire_lock(
+            self, namespace: bytes, key: bytes, ttl_seconds: float
+        ) -> int | None:
+            """Atomically takes the lock of a key unless another caller holds
+            it, see RedisTTLCache.acquire_lock.
 
-            if len(batch_keys) > 0:
-                await self.client.delete(*batch_keys)
+            Args:
+                namespace (bytes): Namespace of the key
+                key (bytes): Key to lock
+                ttl_seconds (float): Time until the lock expires
 
-        async def get_size(self, namespace: bytes) -> int:
-            count_: int = 0
-            cursor: int = 0
-            while True:
-                response: tuple[int, list[bytes]] = await self.client.scan(
-                    cursor=cursor, match=namespace + b"*"
-                )
-                cursor, batch_keys = response
+            Returns:
+                int | None: Fencing token, None if the lock is held
+            """
+            return await self._acquire_lock(
+                keys=[
+                    _lock_key(await self._prefix(namespace), key),
+                    _FENCE_PREFIX + namespace,
+                ],
+                args=[
+                    max(1, int(ttl_seconds * 1_000)),
+                    int(FENCE_TTL_SECONDS * 1_000),
+                ],
+            )
+
+        async def set_locked(
+            self,
+            namespace: bytes,
+            key: bytes,
+            value: bytes,
+            ttl_seconds: float,
+            token: int,
+        ) -> bool:
+            """Sets a value and releases its lock, only if the lock is still
+            held with the fencing token, see RedisTTLCache.set_locked.
+
+            Args:
+                namespace (bytes): Key namespace
+                key (bytes): Value key
+                value (bytes): Value
+                ttl_seconds (float): Time to live in seconds
+                token (int): Fencing token returned by acquire_lock
+
+            Returns:
+                bool: Whether the value was set
+            """
+            prefix = await self._prefix(namespace)
+            if int(ttl_seconds * 1_000) == 0:
+                await self.release_lock(namespace, key, token)
+                return False
+
+            keys, args = _set_locked_args(
+                prefix, key, value, int(ttl_seconds * 1_000), token
+            )
+            return await self._set_locked(keys=keys, args=args) == 1
 
-                count_ += len(batch_keys)
+        async def release_lock(self, namespace: bytes, key: bytes, token: int) -> None:
+            """Releases the lock of a key if it is still held with the
+            fencing token.
 
-                if cursor == 0:
-                    break
+            Args:
+                namespace (bytes): Namespace of the key
+                key (bytes): Key to unlock
+                token (int): Fencing token returned by acquire_lock
+            """
+            await self._release_lock(
+                keys=[_lock_key(await self._prefix(namespace), key)], args=[token]
+            )
+
+        def expire_generation(self, namespace: bytes) -> None:
+            """Drops the locally cached generation of a namespace, so a clear
+            by another process is seen by the next operation.
 
-            return count_
+            Not a coroutine as it only changes local state.
+
+            Args:
+                namespace (bytes): Namespace cleared elsewhere
+            """
+            self._generations.forget(namespace)
+
+        async def _prefix(self, namespace: bytes) -> bytes:
+            generation = self._generations.get(namespace)
+            if generation is None:
+                generation = int(await self.client.get(_generation_key(namespace)) or 0)
+                self._generations.store(namespace, generation)
+            return _key_prefix(namespace, generation)
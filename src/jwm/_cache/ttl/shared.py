@@ -0,0 +1,559 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import typing
+
+try:
+    import fcntl
+
+    HAS_TTL_SHARED_CACHE = True
+except ModuleNotFoundError:
+    HAS_TTL_SHARED_CACHE = False
+
+import jwm._cache.ttl.cache
+
+MAGIC: bytes = b"JWMTTL01"
+"Identifies a file created by SharedTTLCache"
+
+SLAB_CHUNK_SIZES: tuple[int, ...] = tuple(64 * pow(4, i) for i in range(8))
+"Chunk size of each slab class, from 64 bytes to 1 MiB"
+
+_HEADER = struct.Struct("<8sIII")  # magic, ways, buckets, classes
+# chunk size, chunk count, bump, free head, clock hand, slab offset
+_CLASS = struct.Struct("<IIIIIQ")
+_SLOT = struct.Struct("<BBHHxxIIQQd")  # see _read_slot
+_CHUNK = struct.Struct("<BxxxII")  # state, slot, next free
+
+_EMPTY = 0
+_USED = 1
+_FREE = 0
+_ALLOCATED = 1
+_NONE = 0xFFFFFFFF
+
+_THREAD_LOCK_STRIPES = 64
+_EVICTION_ATTEMPTS = 16
+
+
+def _hash(data: bytes) -> int:
+    "Hash that is stable across processes, unlike the builtin hash."
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class _RecordLock:
+    """Exclusive lock on one byte of a file, held by a single thread.
+
+    POSIX record locks belong to the process, the thread lock keeps threads
+    of the same process out.
+    """
+
+    __slots__ = ("_fd", "_offset", "_thread_lock")
+
+    def __init__(self, fd: int, offset: int, thread_lock: threading.Lock) -> None:
+        self._fd = fd
+        self._offset = offset
+        self._thread_lock = thread_lock
+
+    def __enter__(self) -> None:
+        self._thread_lock.acquire()
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._offset)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def __exit__(self, *_: typing.Any) -> None:
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._offset)
+        finally:
+            self._thread_lock.release()
+
+
+class _SharedFile:
+    """Descriptor, mapping and thread locks of a file, shared by every
+    SharedTTLCache of the process opened on it.
+
+    POSIX record locks belong to the process, and closing any descriptor of
+    the file, including the duplicate kept by a mapping, releases all of
+    them. Each file is therefore opened and mapped once per process.
+    """
+
+    __slots__ = ("fd", "map", "references", "init_lock", "bucket_locks", "class_locks")
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.map: mmap.mmap | None = None
+        self.references = 1
+        self.init_lock = threading.Lock()
+        self.bucket_locks = tuple(threading.Lock() for _ in range(_THREAD_LOCK_STRIPES))
+        self.class_locks = tuple(threading.Lock() for _ in range(_THREAD_LOCK_STRIPES))
+
+
+_shared_files: dict[str, _SharedFile] = {}
+_shared_files_lock = threading.Lock()
+
+
+def _create(fd: int, capacity: int, slab_bytes: int, ways: int) -> None:
+    buckets = capacity // ways
+    classes = len(SLAB_CHUNK_SIZES)
+    class_bytes = slab_bytes // classes
+
+    offset = _HEADER.size + _CLASS.size * classes + _SLOT.size * ways * buckets
+    layout: list[tuple[int, int, int]] = []
+    for chunk_size in SLAB_CHUNK_SIZES:
+        chunk_count = max(1, class_bytes // chunk_size)
+        layout.append((chunk_size, chunk_count, offset))
+        offset += chunk_size * chunk_count
+
+    # Zero filled, which marks every slot empty. Written without a temporary
+    # mapping, unmapping it would release the record lock held on the file
+    os.ftruncate(fd, offset)
+    os.pwrite(fd, _HEADER.pack(MAGIC, ways, buckets, classes), 0)
+    for c, (chunk_size, chunk_count, class_offset) in enumerate(layout):
+        os.pwrite(
+            fd,
+            _CLASS.pack(chunk_size, chunk_count, 0, _NONE, 0, class_offset),
+            _HEADER.size + _CLASS.size * c,
+        )
+
+
+def _open_shared_file(
+    path: str, capacity: int, slab_bytes: int, ways: int
+) -> _SharedFile:
+    "Open and map a file, or reuse it if this process already has."
+    with _shared_files_lock:
+        shared_file = _shared_files.get(path, None)
+        if shared_file is not None:
+            shared_file.references += 1
+            return shared_file
+
+        shared_file = _SharedFile(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        try:
+            with _RecordLock(shared_file.fd, 0, shared_file.init_lock):
+                if os.fstat(shared_file.fd).st_size == 0:
+                    _create(shared_file.fd, capacity, slab_bytes, ways)
+                shared_file.map = mmap.mmap(shared_file.fd, 0)
+        except BaseException:
+            os.close(shared_file.fd)
+            raise
+        _shared_files[path] = shared_file
+        return shared_file
+
+
+def _close_shared_file(path: str) -> None:
+    with _shared_files_lock:
+        shared_file = _shared_files[path]
+        shared_file.references -= 1
+        if shared_file.references == 0:
+            del _shared_files[path]
+            shared_file.map.close()
+            os.close(shared_file.fd)
+
+
+class _Slot(typing.NamedTuple):
+    state: int
+    slab_class: int
+    namespace_length: int
+    key_length: int
+    value_length: int
+    chunk: int
+    hash_: int
+    namespace_hash: int
+    deadline: float
+
+
+if HAS_TTL_SHARED_CACHE:
+
+    class SharedTTLCache(jwm._cache.ttl.cache.TTLCache):
+        "Cross process shared memory TTL Cache implementation."
+
+        def __init__(
+            self,
+            path: str | os.PathLike,
+            capacity: int = 65_536,
+            slab_bytes: int = 64 * 1024 * 1024,
+            ways: int = 8,
+        ) -> None:
+            """Cross process shared memory TTL Cache implementation.
+
+            Every process that opens the same path shares one cache. Place the
+            file on a memory backed file system such as `/dev/shm` to avoid
+            disk writes. The geometry is fixed by the first process to create
+            the file, later processes use the geometry stored in the file.
+
+            The index is a fixed size open addressing hash table split into
+            buckets of `ways` slots. A key may only live in its bucket, which
+            is protected by its own lock, so operations on different buckets
+            never contend. When a bucket is full the slot closest to expiring
+            is replaced.
+
+            Values are stored in slab classes of fixed size chunks, each class
+            receiving an equal share of `slab_bytes`. When a class runs out of
+            chunks one is reclaimed in clock order.
+
+            Locks are POSIX record locks on the file, combined with thread
+            locks as record locks are held per process. Instances opened on
+            the same file within a process share its descriptor, mapping and
+            locks.
+
+            `clear` and `get_size` scan the whole index.
+
+            Args:
+                path (str | PathLike): File shared between processes.
+                capacity (int, optional): Number of index slots. Defaults to
+                    65,536.
+                slab_bytes (int, optional): Bytes reserved for namespaces,
+                    keys and values. Defaults to 64 MiB.
+                ways (int, optional): Slots per bucket. Defaults to 8.
+            """
+            if capacity < ways or ways < 1:
+                raise ValueError("capacity must be greater than or equal to ways.")
+
+            self.path = os.fspath(path)
+
+            self._real_path = os.path.realpath(self.path)
+            self._file: _SharedFile | None = _open_shared_file(
+                self._real_path, capacity, slab_bytes, ways
+            )
+            self._fd = self._file.fd
+            self._map = self._file.map
+
+            magic, self._ways, self._buckets, classes = _HEADER.unpack_from(
+                self._map, 0
+            )
+            if magic != MAGIC:
+                self.close()
+                raise ValueError(f"{self.path} is not a SharedTTLCache file.")
+
+            class_headers = tuple(
+                _CLASS.unpack_from(self._map, _HEADER.size + _CLASS.size * c)
+                for c in range(classes)
+            )
+            self._chunk_sizes = tuple(header[0] for header in class_headers)
+            self._slab_offsets = tuple(header[5] for header in class_headers)
+            self._index_offset = _HEADER.size + _CLASS.size * classes
+
+            self._bucket_locks = self._file.bucket_locks
+            self._class_locks = self._file.class_locks
+
+        def close(self) -> None:
+            """Release the shared file, unmapping it once no other instance
+            of the process uses it. The cache cannot be used afterwards."""
+            if self._file is not None:
+                self._file = None
+                _close_shared_file(self._real_path)
+
+        def get(self, namespace: bytes, key: bytes) -> bytes | None:
+            hash_ = _hash(namespace + key)
+            bucket = hash_ % self._buckets
+            with self._bucket_lock(bucket):
+                slot_index, slot = self._find(bucket, hash_, namespace, key)
+                if slot is None:
+                    return None
+
+                if slot.deadline <= time.time():
+                    self._release_slot(slot_index, slot)
+                    return None
+
+                start = self._chunk_offset(slot.slab_class, slot.chunk) + _CHUNK.size
+                start += slot.namespace_length + slot.key_length
+                return self._map[start : start + slot.value_length]
+
+        def set(
+            self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+        ) -> None:
+            hash_ = _hash(namespace + key)
+            bucket = hash_ % self._buckets
+
+            size = _CHUNK.size + len(namespace) + len(key) + len(value)
+            slab_class = self._slab_class(size)
+            chunk = None
+            if slab_class is not None:
+                chunk = self._allocate(slab_class)
+
+            if chunk is not None:
+                offset = self._chunk_offset(slab_class, chunk) + _CHUNK.size
+                payload = namespace + key + value
+                self._map[offset : offset + len(payload)] = payload
+
+            deadline = time.time() + ttl_seconds
+            with self._bucket_lock(bucket):
+                slot_index, slot = self._find(bucket, hash_, namespace, key)
+                if slot is not None:
+                    self._release_slot(slot_index, slot)
+                # Values too large for any slab or with no space are dropped
+                if chunk is None:
+                    return
+
+                if slot_index is None:
+                    slot_index = self._choose_slot(bucket)
+
+                _SLOT.pack_into(
+                    self._map,
+                    self._slot_offset(slot_index),
+                    _USED,
+                    slab_class,
+                    len(namespace),
+                    len(key),
+                    len(value),
+                    chunk,
+                    hash_,
+                    _hash(namespace),
+                    deadline,
+                )
+                _CHUNK.pack_into(
+                    self._map,
+                    self._chunk_offset(slab_class, chunk),
+                    _ALLOCATED,
+                    slot_index,
+                    _NONE,
+                )
+
+        def clear(self, namespace: bytes) -> None:
+            namespace_hash = _hash(namespace)
+            for bucket in range(self._buckets):
+                with self._bucket_lock(bucket):
+                    for slot_index, slot in self._bucket_slots(bucket):
+                        if self._in_namespace(slot, namespace_hash, namespace):
+                            self._release_slot(slot_index, slot)
+
+        def get_size(self, namespace: bytes) -> int:
+            namespace_hash = _hash(namespace)
+            now = time.time()
+
+            size = 0
+            for bucket in range(self._buckets):
+                with self._bucket_lock(bucket):
+                    for _, slot in self._bucket_slots(bucket):
+                        if slot.deadline > now and self._in_namespace(
+                            slot, namespace_hash, namespace
+                        ):
+                            size += 1
+            return size
+
+        # Index
+
+        def _slot_offset(self, slot_index: int) -> int:
+            return self._index_offset + _SLOT.size * slot_index
+
+        def _read_slot(self, slot_index: int) -> _Slot:
+            return _Slot(*_SLOT.unpack_from(self._map, self._slot_offset(slot_index)))
+
+        def _bucket_slots(self, bucket: int) -> list[tuple[int, _Slot]]:
+            "Used slots in a bucket, the bucket lock must be held."
+            first = bucket * self._ways
+            start = self._slot_offset(first)
+            fields = _SLOT.iter_unpack(
+                self._map[start : start + _SLOT.size * self._ways]
+            )
+            return [
+                (slot_index, _Slot._make(slot))
+                for slot_index, slot in enumerate(fields, first)
+                if slot[0] == _USED
+            ]
+
+        def _bucket_hashes(self, bucket: int) -> list[tuple[int, int]]:
+            "Hashes of the used slots in a bucket, the bucket lock must be held."
+            first = bucket * self._ways
+            start = self._slot_offset(first)
+            fields = _SLOT.iter_unpack(
+                self._map[start : start + _SLOT.size * self._ways]
+            )
+            return [
+                (slot_index, slot[6])
+                for slot_index, slot in enumerate(fields, first)
+                if slot[0] == _USED
+            ]
+
+        def _find(
+            self, bucket: int, hash_: int, namespace: bytes, key: bytes
+        ) -> tuple[int | None, _Slot | None]:
+            """Find the slot holding a key, the bucket lock must be held.
+
+            Returns:
+                tuple[int | None, _Slot | None]: Slot index and slot, or None
+                    and None on miss.
+            """
+            for slot_index, slot_hash in self._bucket_hashes(bucket):
+                if slot_hash != hash_:
+                    continue
+
+                slot = self._read_slot(slot_index)
+                if slot.namespace_length != len(namespace) or slot.key_length != len(
+                    key
+                ):
+                    continue
+
+                start = self._chunk_offset(slot.slab_class, slot.chunk) + _CHUNK.size
+                end = start + len(namespace) + len(key)
+                if self._map[start:end] == namespace + key:
+                    return slot_index, slot
+
+            return None, None
+
+        def _in_namespace(
+            self, slot: _Slot, namespace_hash: int, namespace: bytes
+        ) -> bool:
+            if slot.namespace_hash != namespace_hash:
+                return False
+
+            start = self._chunk_offset(slot.slab_class, slot.chunk) + _CHUNK.size
+            return self._map[start : start + slot.namespace_length] == namespace
+
+        def _choose_slot(self, bucket: int) -> int:
+            """Choose a slot for a new key, the bucket lock must be held.
+
+            Prefers empty slots, then the slot closest to expiring which is
+            released.
+            """
+            used = self._bucket_slots(bucket)
+            if len(used) < self._ways:
+                used_indexes = {slot_index for slot_index, _ in used}
+                for slot_index in range(bucket * self._ways, (bucket + 1) * self._ways):
+                    if slot_index not in used_indexes:
+                        return slot_index
+
+            slot_index, slot = min(used, key=lambda item: item[1].deadline)
+            self._release_slot(slot_index, slot)
+            return slot_index
+
+        def _release_slot(self, slot_index: int, slot: _Slot) -> None:
+            "Empty a slot and free its chunk, the bucket lock must be held."
+            self._map[self._slot_offset(slot_index)] = _EMPTY
+            self._free(slot.slab_class, slot.chunk)
+
+        # Slabs
+
+        def _class_offset(self, slab_class: int) -> int:
+            return _HEADER.size + _CLASS.size * slab_class
+
+        def _chunk_offset(self, slab_class: int, chunk: int) -> int:
+            return (
+                self._slab_offsets[slab_class] + self._chunk_sizes[slab_class] * chunk
+            )
+
+        def _slab_class(self, size: int) -> int | None:
+            for slab_class, chunk_size in enumerate(self._chunk_sizes):
+                if size <= chunk_size:
+                    return slab_class
+            return None
+
+        def _allocate(self, slab_class: int) -> int | None:
+            """Take a chunk from a slab class, reclaiming one in clock order
+            if the class is full.
+
+            Returns:
+                int | None: Chunk index, None if no chunk could be reclaimed.
+            """
+            for _ in range(_EVICTION_ATTEMPTS):
+                with self._class_lock(slab_class):
+                    offset = self._class_offset(slab_class)
+                    chunk_size, chunk_count, bump, free_head, hand, slab_offset = (
+                        _CLASS.unpack_from(self._map, offset)
+                    )
+
+                    chunk = None
+                    if free_head != _NONE:
+                        chunk = free_head
+                        free_head = _CHUNK.unpack_from(
+                            self._map, slab_offset + chunk_size * chunk
+                        )[2]
+                    elif bump < chunk_count:
+                        chunk = bump
+                        bump += 1
+
+                    if chunk is not None:
+                        _CHUNK.pack_into(
+                            self._map,
+                            slab_offset + chunk_size * chunk,
+                            _ALLOCATED,
+                            _NONE,
+                            _NONE,
+                        )
+                        _CLASS.pack_into(
+                            self._map,
+                            offset,
+                            chunk_size,
+                            chunk_count,
+                            bump,
+                            free_head,
+                            hand,
+                            slab_offset,
+                        )
+                        return chunk
+
+                    # Class is full, pick the chunk under the clock hand
+                    victim = hand
+                    _CLASS.pack_into(
+                        self._map,
+                        offset,
+                        chunk_size,
+                        chunk_count,
+                        bump,
+                        free_head,
+                        (hand + 1) % chunk_count,
+                        slab_offset,
+                    )
+                    _, victim_slot, _ = _CHUNK.unpack_from(
+                        self._map, slab_offset + chunk_size * victim
+                    )
+
+                # Bucket locks are always taken before class locks, release
+                # the victim through its bucket
+                if victim_slot == _NONE:
+                    continue
+                with self._bucket_lock(victim_slot // self._ways):
+                    slot = self._read_slot(victim_slot)
+                    if (
+                        slot.state == _USED
+                        and slot.slab_class == slab_class
+                        and slot.chunk == victim
+                    ):
+                        self._release_slot(victim_slot, slot)
+
+            return None
+
+        def _free(self, slab_class: int, chunk: int) -> None:
+            with self._class_lock(slab_class):
+                offset = self._class_offset(slab_class)
+                chunk_size, chunk_count, bump, free_head, hand, slab_offset = (
+                    _CLASS.unpack_from(self._map, offset)
+                )
+                _CHUNK.pack_into(
+                    self._map,
+                    slab_offset + chunk_size * chunk,
+                    _FREE,
+                    _NONE,
+                    free_head,
+                )
+                _CLASS.pack_into(
+                    self._map,
+                    offset,
+                    chunk_size,
+                    chunk_count,
+                    bump,
+                    chunk,
+                    hand,
+                    slab_offset,
+                )
+
+        # Locking
+
+        def _bucket_lock(self, bucket: int) -> _RecordLock:
+            # Byte zero guards creation, buckets lock the bytes after it
+            return _RecordLock(
+                self._fd,
+                1 + bucket,
+                self._bucket_locks[bucket % _THREAD_LOCK_STRIPES],
+            )
+
+        def _class_lock(self, slab_class: int) -> _RecordLock:
+            return _RecordLock(
+                self._fd,
+                1 + self._buckets + slab_class,
+                self._class_locks[slab_class % _THREAD_LOCK_STRIPES],
+            )
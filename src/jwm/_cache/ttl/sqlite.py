@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+import weakref
+
+try:
+    import sqlite3
+
+    HAS_TTL_SQLITE_CACHE = True
+except ModuleNotFoundError:
+    HAS_TTL_SQLITE_CACHE = False
+
+import jwm._cache.ttl.cache
+
+FLUSH_BATCH_SIZE: int = 256
+"Default number of buffered writes that are flushed immediately"
+
+FLUSH_INTERVAL_SECONDS: float = 0.05
+"Default longest time a write stays buffered"
+
+PURGE_INTERVAL_SECONDS: float = 60
+"Default time between purges of expired rows"
+
+PURGE_BATCH_SIZE: int = 1_000
+"Default number of expired rows deleted per purge transaction"
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS ttl_cache (
+        namespace BLOB NOT NULL,
+        key BLOB NOT NULL,
+        value BLOB NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ttl_cache_expires_at
+    ON ttl_cache (namespace, expires_at)
+    """,
+)
+
+
+class _SQLiteStore:
+    """Connection and write buffer shared by the SQLite caches.
+
+    Thread safe, every operation holds the store lock. Writes are buffered
+    and flushed together in one transaction, reads check the buffer before
+    the database. Deadlines are `time.time` timestamps so they remain valid
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int,
+        flush_interval_seconds: float,
+        purge_interval_seconds: float,
+        purge_batch_size: int,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self.purge_batch_size = purge_batch_size
+
+        self.lock = threading.Lock()
+        self.pending: dict[tuple[bytes, bytes], tuple[bytes, float]] = {}
+        self.closed = False
+
+        # Transactions are managed explicitly
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # WAL only needs to sync on checkpoints to survive crashes
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self.connection.execute(statement)
+
+    def get(self, namespace: bytes, key: bytes) -> bytes | None:
+        with self.lock:
+            entry = self.pending.get((namespace, key), None)
+            if entry is None:
+                entry = self.connection.execute(
+                    "SELECT value, expires_at FROM ttl_cache"
+                    " WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                ).fetchone()
+
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def set(
+        self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float
+    ) -> bool:
+        """Buffer a write, flushing when the buffer is full.
+
+        Returns:
+            bool: Whether the buffer was empty before the write.
+        """
+        with self.lock:
+            was_empty = len(self.pending) == 0
+            self.pending[(namespace, key)] = (value, time.time() + ttl_seconds)
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+        return was_empty
+
+    def clear(self, namespace: bytes) -> None:
+        with self.lock:
+            for pending_key in [k for k in self.pending if k[0] == namespace]:
+                del self.pending[pending_key]
+            self.connection.execute(
+                "DELETE FROM ttl_cache WHERE namespace = ?", (namespace,)
+            )
+
+    def size(self, namespace: bytes) -> int:
+        with self.lock:
+            self._flush()
+            (count_,) = self.connection.execute(
+                "SELECT COUNT(*) FROM ttl_cache WHERE namespace = ? AND expires_at > ?",
+                (namespace, time.time()),
+            ).fetchone()
+        return count_
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+    def purge(self) -> None:
+        "Delete expired rows, releasing the lock between batches."
+        with self.lock:
+            if self.closed:
+                return
+            namespaces = [
+                row[0]
+                for row in self.connection.execute(
+                    "SELECT DISTINCT namespace FROM ttl_cache"
+                )
+            ]
+
+        now = time.time()
+        for namespace in namespaces:
+            deleted = self.purge_batch_size
+            while deleted >= self.purge_batch_size:
+                with self.lock:
+                    if self.closed:
+                        return
+                    deleted = self.connection.execute(
+                        "DELETE FROM ttl_cache WHERE rowid IN ("
+                        " SELECT rowid FROM ttl_cache"
+                        " WHERE namespace = ? AND expires_at <= ? LIMIT ?"
+                        ")",
+                        (namespace, now, self.purge_batch_size),
+                    ).rowcount
+
+    def close(self) -> None:
+        with self.lock:
+            if self.closed:
+                return
+            self._flush()
+            self.connection.close()
+            self.closed = True
+
+    def _flush(self) -> None:
+        if len(self.pending) == 0 or self.closed:
+            return
+
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO ttl_cache (namespace, key, value, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (namespace, key, value, expires_at)
+                    for (namespace, key), (value, expires_at) in self.pending.items()
+                ],
+            )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            # The writes stay pending for the next flush
+            with contextlib.suppress(sqlite3.Error):
+                self.connection.execute("ROLLBACK")
+            raise
+        self.pending.clear()
+
+
+def _maintain(cache_ref: weakref.ref, wakeup: threading.Event) -> None:
+    """Maintenance thread target, flushes buffered writes and purges expired
+    rows.
+
+    Sleeps until the next purge or a buffered write, then waits
+    `flush_interval_seconds` for more writes to join the flush. Exits once the
+    cache is closed or collected.
+
+    Args:
+        cache_ref (ref): Weak reference to the SQLite cache being maintained.
+        wakeup (Event): Set when a write is buffered, or the cache is closed
+            or collected.
+    """
+    next_purge = time.monotonic()
+    while True:
+        cache: SQLiteTTLCache | AsyncSQLiteTTLCache | None = cache_ref()
+        if cache is None or cache._store.closed:
+            return
+
+        # Another process may hold the write lock, retry after a short wait
+        flush_interval_seconds = cache._store.flush_interval_seconds
+        timeout = None
+        try:
+            cache._store.flush()
+        except sqlite3.Error:
+            _LOGGER.exception("Flushing buffered writes failed, retrying.")
+            timeout = flush_interval_seconds
+        if time.monotonic() >= next_purge:
+            try:
+                cache._store.purge()
+                next_purge = time.monotonic() + cache._store.purge_interval_seconds
+            except sqlite3.Error:
+                _LOGGER.exception("Purging expired rows failed, retrying.")
+                next_purge = time.monotonic() + flush_interval_seconds
+        del cache
+
+        if timeout is None:
+            timeout = max(0, next_purge - time.monotonic())
+        if wakeup.wait(timeout):
+            wakeup.clear()
+            # Let more writes join the buffer before flushing it
+            time.sleep(flush_interval_seconds)
+
+
+def _start_maintenance(
+    cache: SQLiteTTLCache | AsyncSQLiteTTLCache, wakeup: threading.Event
+) -> None:
+    cache_ref = weakref.ref(cache, lambda _: wakeup.set())
+    threading.Thread(
+        target=_maintain,
+        args=(cache_ref, wakeup),
+        name="jwm.cache-sqlite",
+        daemon=True,
+    ).start()
+
+
+if HAS_TTL_SQLITE_CACHE:
+
+    class SQLiteTTLCache(jwm._cache.ttl.cache.TTLCache):
+        "Sync SQLite TTL Cache implementation."
+
+        def __init__(
+            self,
+            path: str | os.PathLike,
+            batch_size: int = FLUSH_BATCH_SIZE,
+            flush_interval_seconds: float = FLUSH_INTERVAL_SECONDS,
+            purge_interval_seconds: float = PURGE_INTERVAL_SECONDS,
+            purge_batch_size: int = PURGE_BATCH_SIZE,
+        ) -> None:
+            """Persistent SQLite TTL Cache implementation.
+
+            Entries survive restarts and may be shared by processes on the
+            same host. The database runs in WAL mode so readers do not block
+            the writer.
+
+            Writes are buffered and flushed in a single transaction once
+            `batch_size` writes are waiting or after `flush_interval_seconds`,
+            so set throughput is not limited by disk syncs. Buffered writes
+            are visible to this instance immediately and to other processes
+            once flushed, and are lost if the process crashes before then.
+
+            A background thread flushes writes and deletes expired rows every
+            `purge_interval_seconds`, `purge_batch_size` rows per transaction.
+            Expired rows are ignored by reads until they are purged.
+
+            `get_size` counts the live rows of a namespace over the
+            `(namespace, expires_at)` index, which avoids reading the table
+            but still takes time linear in the namespace size.
+
+            Args:
+                path (str | PathLike): Database file, created if missing.
+                batch_size (int, optional): Number of buffered writes that
+                    are flushed immediately. Defaults to 256.
+                flush_interval_seconds (float, optional): Longest time a
+                    write stays buffered. Defaults to 0.05.
+                purge_interval_seconds (float, optional): Time between
+                    purges of expired rows. Defaults to 60.
+                purge_batch_size (int, optional): Expired rows deleted per
+                    transaction. Defaults to 1,000.
+            """
+            if batch_size < 1:
+                raise ValueError("batch_size must be greater than zero.")
+            if purge_batch_size < 1:
+                raise ValueError("purge_batch_size must be greater than zero.")
+
+            self.path = os.fspath(path)
+
+            self._store = _SQLiteStore(
+                self.path,
+                batch_size,
+                flush_interval_seconds,
+                purge_interval_seconds,
+                purge_batch_size,
+            )
+            self._wakeup = threading.Event()
+            weakref.finalize(self, self._store.close)
+            _start_maintenance(self, self._wakeup)
+
+        def get(self, namespace: bytes, key: bytes) -> bytes | None:
+            return self._store.get(namespace, key)
+
+        def set(
+            self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+        ) -> None:
+            if self._store.set(namespace, key, value, ttl_seconds):
+                self._wakeup.set()
+
+        def clear(self, namespace: bytes) -> None:
+            self._store.clear(namespace)
+
+        def get_size(self, namespace: bytes) -> int:
+            return self._store.size(namespace)
+
+        def close(self) -> None:
+            "Flush buffered writes and close the database."
+            self._store.close()
+            self._wakeup.set()
+
+    class AsyncSQLiteTTLCache(jwm._cache.ttl.cache.AsyncTTLCache):
+        "Async SQLite TTL Cache implementation."
+
+        def __init__(
+            self,
+            path: str | os.PathLike,
+            batch_size: int = FLUSH_BATCH_SIZE,
+            flush_interval_seconds: float = FLUSH_INTERVAL_SECONDS,
+            purge_interval_seconds: float = PURGE_INTERVAL_SECONDS,
+            purge_batch_size: int = PURGE_BATCH_SIZE,
+        ) -> None:
+            """Async persistent SQLite TTL Cache implementation.
+
+            Behaves like SQLiteTTLCache, database calls run in the default
+            executor so the event loop is never blocked on disk access.
+
+            Args:
+                path (str | PathLike): Database file, created if missing.
+                batch_size (int, optional): Number of buffered writes that
+                    are flushed immediately. Defaults to 256.
+                flush_interval_seconds (float, optional): Longest time a
+                    write stays buffered. Defaults to 0.05.
+                purge_interval_seconds (float, optional): Time between
+                    purges of expired rows. Defaults to 60.
+                purge_batch_size (int, optional): Expired rows deleted per
+                    transaction. Defaults to 1,000.
+            """
+            if batch_size < 1:
+                raise ValueError("batch_size must be greater than zero.")
+            if purge_batch_size < 1:
+                raise ValueError("purge_batch_size must be greater than zero.")
+
+            self.path = os.fspath(path)
+
+            self._store = _SQLiteStore(
+                self.path,
+                batch_size,
+                flush_interval_seconds,
+                purge_interval_seconds,
+                purge_batch_size,
+            )
+            self._wakeup = threading.Event()
+            weakref.finalize(self, self._store.close)
+            _start_maintenance(self, self._wakeup)
+
+        async def get(self, namespace: bytes, key: bytes) -> bytes | None:
+            return await asyncio.to_thread(self._store.get, namespace, key)
+
+        async def set(
+            self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+        ) -> None:
+            if await asyncio.to_thread(
+                self._store.set, namespace, key, value, ttl_seconds
+            ):
+                self._wakeup.set()
+
+        async def clear(self, namespace: bytes) -> None:
+            await asyncio.to_thread(self._store.clear, namespace)
+
+        async def get_size(self, namespace: bytes) -> int:
+            return await asyncio.to_thread(self._store.size, namespace)
+
+        async def close(self) -> None:
+            "Flush buffered writes and close the database."
+            await asyncio.to_thread(self._store.close)
+            self._wakeup.set()
@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+import asyncio
+import collections.abc
+import inspect
+import weakref
+
+import jwm._cache.ttl.cache
+import jwm._cache.ttl.invalidation
+import jwm._cache.ttl.wrapper
+
+PROMOTE_TTL_SECONDS: float = 5
+"Default longest time a value is kept by any tier but the last"
+
+
+def _record_hit(
+    tier_hits: dict[bytes, list[int]],
+    namespace: bytes,
+    index: int,
+    tiers: int,
+    hits: int = 1,
+) -> None:
+    counts = tier_hits.get(namespace, None)
+    if counts is None:
+        counts = tier_hits[namespace] = [0] * tiers
+    counts[index] += hits
+
+
+def _collect_hits(
+    keys: collections.abc.Sequence[bytes],
+    values: list[bytes | None],
+    missing: list[int],
+    found: collections.abc.Sequence[bytes | None],
+) -> tuple[dict[bytes, bytes], list[int]]:
+    """Store the values a tier found for the missing keys.
+
+    Returns:
+        tuple[dict[bytes, bytes], list[int]]: Values found by key, to promote,
+            and the indices of the keys still missing.
+    """
+    hits: dict[bytes, bytes] = {}
+    still_missing: list[int] = []
+    for index, value in zip(missing, found):
+        if value is None:
+            still_missing.append(index)
+        else:
+            values[index] = hits[keys[index]] = value
+    return hits, still_missing
+
+
+def _tier_get_many(
+    tier: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache,
+    namespace: bytes,
+    keys: collections.abc.Sequence[bytes],
+) -> list[bytes | None]:
+    "get_many of a sync or async tier, falling back to get for each key."
+    if inspect.iscoroutinefunction(tier.get):
+        return jwm._cache.ttl.wrapper._run_sync(
+            jwm._cache.ttl.cache.async_get_many(tier, namespace, keys)
+        )
+    return jwm._cache.ttl.cache.get_many(tier, namespace, keys)
+
+
+def _tier_set_many(
+    tier: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache,
+    namespace: bytes,
+    items: collections.abc.Mapping[bytes, bytes],
+    ttl_seconds: float,
+) -> None:
+    "set_many of a sync or async tier, falling back to set for each item."
+    set_many = getattr(tier, "set_many", None)
+    if set_many is None:
+        for key, value in items.items():
+            jwm._cache.ttl.wrapper._run_sync(
+                tier.set(namespace, key, value, ttl_seconds)
+            )
+        return
+    jwm._cache.ttl.wrapper._run_sync(set_many(namespace, items, ttl_seconds))
+
+
+async def _async_tier_set_many(
+    tier: jwm._cache.ttl.cache.AsyncTTLCache | jwm._cache.ttl.cache.TTLCache,
+    namespace: bytes,
+    items: collections.abc.Mapping[bytes, bytes],
+    ttl_seconds: float,
+) -> None:
+    "set_many of an async or sync tier, falling back to set for each item."
+    set_many = getattr(tier, "set_many", None)
+    if set_many is not None:
+        result = set_many(namespace, items, ttl_seconds)
+        if asyncio.iscoroutine(result):
+            await result
+        return
+
+    for key, value in items.items():
+        result = tier.set(namespace, key, value, ttl_seconds)
+        if asyncio.iscoroutine(result):
+            await result
+
+
+def _write_order(
+    tiers: tuple[
+        jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache, ...
+    ],
+    ttl_seconds: float,
+    promote_ttl_seconds: float,
+) -> list[
+    tuple[jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache, float]
+]:
+    "Tiers to write, last first, with the TTL each should use."
+    earlier_ttl_seconds = min(ttl_seconds, promote_ttl_seconds)
+    return [(tiers[-1], ttl_seconds)] + [
+        (tier, earlier_ttl_seconds) for tier in reversed(tiers[:-1])
+    ]
+
+
+def _expire_generation(
+    tier: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache,
+    namespace: bytes,
+) -> None:
+    "Make the shared tier see a clear made elsewhere before promoting again."
+    expire_generation = getattr(tier, "expire_generation", None)
+    if expire_generation is not None:
+        expire_generation(namespace)
+
+
+def _invalidator(
+    cache_ref: weakref.ref,
+) -> collections.abc.Callable[[bytes, bytes | None], None]:
+    """Invalidation callback for a TieredTTLCache. Only holds a weak
+    reference so subscribing does not keep the cache alive."""
+
+    def invalidate(namespace: bytes, key: bytes | None) -> None:
+        cache: TieredTTLCache | None = cache_ref()
+        if cache is None:
+            return
+
+        if key is None:
+            _expire_generation(cache.tiers[-1], namespace)
+        for tier in cache.tiers[:-1]:
+            delete = getattr(tier, "delete", None)
+            if key is None or delete is None:
+                jwm._cache.ttl.wrapper._run_sync(tier.clear(namespace))
+            else:
+                jwm._cache.ttl.wrapper._run_sync(delete(namespace, key))
+
+    return invalidate
+
+
+def _async_invalidator(
+    cache_ref: weakref.ref,
+) -> collections.abc.Callable[
+    [bytes, bytes | None], collections.abc.Coroutine[None, None, None]
+]:
+    """Invalidation callback for an AsyncTieredTTLCache. Only holds a weak
+    reference so subscribing does not keep the cache alive."""
+
+    async def invalidate(namespace: bytes, key: bytes | None) -> None:
+        cache: AsyncTieredTTLCache | None = cache_ref()
+        if cache is None:
+            return
+
+        if key is None:
+            _expire_generation(cache.tiers[-1], namespace)
+        for tier in cache.tiers[:-1]:
+            delete = getattr(tier, "delete", None)
+            if key is None or delete is None:
+                result = tier.clear(namespace)
+            else:
+                result = delete(namespace, key)
+            if asyncio.iscoroutine(result):
+                await result
+
+    return invalidate
+
+
+class TieredTTLCache(jwm._cache.ttl.cache.TTLCache):
+    "Sync TTL Cache composed of faster caches in front of slower ones."
+
+    def __init__(
+        self,
+        tiers: collections.abc.Sequence[
+            jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache
+        ],
+        promote_ttl_seconds: float = PROMOTE_TTL_SECONDS,
+        invalidation_bus: jwm._cache.ttl.invalidation.InvalidationBus | None = None,
+    ) -> None:
+        """Sync TTL Cache composed of faster caches in front of slower ones,
+        such as a LocalTTLCache in front of a RedisTTLCache.
+
+        Gets read through the tiers fastest first. A hit in a later tier is
+        promoted into every earlier tier. Sets write through every tier,
+        last first so earlier tiers never hold a value the last tier missed.
+
+        Earlier tiers keep values for at most `promote_ttl_seconds`, which
+        bounds how long they serve a value after it changes in a shared last
+        tier. The size reported is the size of the last tier.
+
+        With an invalidation bus, sets and clears are published to other
+        processes, which remove the key or namespace from every tier but the
+        last. Earlier tiers can then safely use a long `promote_ttl_seconds`.
+        A tier without a `delete` method is cleared instead. Namespace
+        invalidations also expire the generation the last tier caches, when
+        it has an `expire_generation` method like RedisTTLCache.
+
+        Async tiers are run to completion in their own thread, prefer
+        AsyncTieredTTLCache when any tier is async.
+
+        Args:
+            tiers (Sequence[TTLCache | AsyncTTLCache]): Caches, fastest first.
+            promote_ttl_seconds (float, optional): Longest time a value is
+                kept by any tier but the last. Defaults to 5.
+            invalidation_bus (InvalidationBus | None, optional): Shares
+                invalidations between processes. Defaults to None.
+        """
+        if len(tiers) == 0:
+            raise ValueError("tiers must contain at least one cache.")
+
+        self.tiers = tuple(tiers)
+        self.promote_ttl_seconds = promote_ttl_seconds
+        self.invalidation_bus = invalidation_bus
+
+        self._tier_hits: dict[bytes, list[int]] = {}
+
+        if invalidation_bus is not None:
+            invalidation_bus.subscribe(_invalidator(weakref.ref(self)))
+
+    def get(self, namespace: bytes, key: bytes) -> bytes | None:
+        for index, tier in enumerate(self.tiers):
+            value = jwm._cache.ttl.wrapper._run_sync(tier.get(namespace, key))
+            if value is None:
+                continue
+
+            _record_hit(self._tier_hits, namespace, index, len(self.tiers))
+            for earlier in self.tiers[:index]:
+                jwm._cache.ttl.wrapper._run_sync(
+                    earlier.set(namespace, key, value, self.promote_ttl_seconds)
+                )
+            return value
+
+        return None
+
+    def set(
+        self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+    ) -> None:
+        for tier, tier_ttl_seconds in _write_order(
+            self.tiers, ttl_seconds, self.promote_ttl_seconds
+        ):
+            jwm._cache.ttl.wrapper._run_sync(
+                tier.set(namespace, key, value, tier_ttl_seconds)
+            )
+
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.publish(namespace, key)
+
+    def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        values: list[bytes | None] = [None] * len(keys)
+        missing = list(range(len(keys)))
+        for index, tier in enumerate(self.tiers):
+            if len(missing) == 0:
+                break
+
+            found = _tier_get_many(tier, namespace, [keys[i] for i in missing])
+            hits, missing = _collect_hits(keys, values, missing, found)
+            if len(hits) == 0:
+                continue
+
+            _record_hit(self._tier_hits, namespace, index, len(self.tiers), len(hits))
+            for earlier in self.tiers[:index]:
+                _tier_set_many(earlier, namespace, hits, self.promote_ttl_seconds)
+
+        return values
+
+    def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        for tier, tier_ttl_seconds in _write_order(
+            self.tiers, ttl_seconds, self.promote_ttl_seconds
+        ):
+            _tier_set_many(tier, namespace, items, tier_ttl_seconds)
+
+        if self.invalidation_bus is not None:
+            for key in items:
+                self.invalidation_bus.publish(namespace, key)
+
+    def clear(self, namespace: bytes) -> None:
+        for tier in reversed(self.tiers):
+            jwm._cache.ttl.wrapper._run_sync(tier.clear(namespace))
+        self._tier_hits.pop(namespace, None)
+
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.publish(namespace)
+
+    def get_size(self, namespace: bytes) -> int:
+        return jwm._cache.ttl.wrapper._run_sync(self.tiers[-1].get_size(namespace))
+
+    def get_tier_hits(self, namespace: bytes) -> tuple[int, ...]:
+        """Gets the number of hits served by each tier since the namespace
+        was last cleared.
+
+        Args:
+            namespace (bytes): Namespace to query
+
+        Returns:
+            tuple[int, ...]: Number of hits of each tier, fastest first
+        """
+        return tuple(self._tier_hits.get(namespace, (0,) * len(self.tiers)))
+
+
+class AsyncTieredTTLCache(jwm._cache.ttl.cache.AsyncTTLCache):
+    "Async TTL Cache composed of faster caches in front of slower ones."
+
+    def __init__(
+        self,
+        tiers: collections.abc.Sequence[
+            jwm._cache.ttl.cache.AsyncTTLCache | jwm._cache.ttl.cache.TTLCache
+        ],
+        promote_ttl_seconds: float = PROMOTE_TTL_SECONDS,
+        invalidation_bus: (
+            jwm._cache.ttl.invalidation.AsyncInvalidationBus | None
+        ) = None,
+    ) -> None:
+        """Async TTL Cache composed of faster caches in front of slower ones,
+        such as an AsyncLocalTTLCache in front of an AsyncRedisTTLCache.
+
+        Behaves like TieredTTLCache, tiers may be sync or async. The cache
+        subscribes to the invalidation bus on its first use inside an event
+        loop.
+
+        Args:
+            tiers (Sequence[AsyncTTLCache | TTLCache]): Caches, fastest first.
+            promote_ttl_seconds (float, optional): Longest time a value is
+                kept by any tier but the last. Defaults to 5.
+            invalidation_bus (AsyncInvalidationBus | None, optional): Shares
+                invalidations between processes. Defaults to None.
+        """
+        if len(tiers) == 0:
+            raise ValueError("tiers must contain at least one cache.")
+
+        self.tiers = tuple(tiers)
+        self.promote_ttl_seconds = promote_ttl_seconds
+        self.invalidation_bus = invalidation_bus
+
+        self._tier_hits: dict[bytes, list[int]] = {}
+        self._subscribed = invalidation_bus is None
+
+    async def get(self, namespace: bytes, key: bytes) -> bytes | None:
+        if not self._subscribed:
+            await self._subscribe()
+
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(namespace, key)
+            if asyncio.iscoroutine(value):
+                value = await value
+            if value is None:
+                continue
+
+            _record_hit(self._tier_hits, namespace, index, len(self.tiers))
+            for earlier in self.tiers[:index]:
+                set_ = earlier.set(namespace, key, value, self.promote_ttl_seconds)
+                if asyncio.iscoroutine(set_):
+                    await set_
+            return value
+
+        return None
+
+    async def set(
+        self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+    ) -> None:
+        if not self._subscribed:
+            await self._subscribe()
+
+        for tier, tier_ttl_seconds in _write_order(
+            self.tiers, ttl_seconds, self.promote_ttl_seconds
+        ):
+            set_ = tier.set(namespace, key, value, tier_ttl_seconds)
+            if asyncio.iscoroutine(set_):
+                await set_
+
+        if self.invalidation_bus is not None:
+            await self.invalidation_bus.publish(namespace, key)
+
+    async def get_many(
+        self, namespace: bytes, keys: collections.abc.Sequence[bytes]
+    ) -> list[bytes | None]:
+        if not self._subscribed:
+            await self._subscribe()
+
+        values: list[bytes | None] = [None] * len(keys)
+        missing = list(range(len(keys)))
+        for index, tier in enumerate(self.tiers):
+            if len(missing) == 0:
+                break
+
+            found = await jwm._cache.ttl.cache.async_get_many(
+                tier, namespace, [keys[i] for i in missing]
+            )
+            hits, missing = _collect_hits(keys, values, missing, found)
+            if len(hits) == 0:
+                continue
+
+            _record_hit(self._tier_hits, namespace, index, len(self.tiers), len(hits))
+            for earlier in self.tiers[:index]:
+                await _async_tier_set_many(
+                    earlier, namespace, hits, self.promote_ttl_seconds
+                )
+
+        return values
+
+    async def set_many(
+        self,
+        namespace: bytes,
+        items: collections.abc.Mapping[bytes, bytes],
+        ttl_seconds: float = 60,
+    ) -> None:
+        if not self._subscribed:
+            await self._subscribe()
+
+        for tier, tier_ttl_seconds in _write_order(
+            self.tiers, ttl_seconds, self.promote_ttl_seconds
+        ):
+            await _async_tier_set_many(tier, namespace, items, tier_ttl_seconds)
+
+        if self.invalidation_bus is not None:
+            for key in items:
+                await self.invalidation_bus.publish(namespace, key)
+
+    async def clear(self, namespace: bytes) -> None:
+        for tier in reversed(self.tiers):
+            clear = tier.clear(namespace)
+            if asyncio.iscoroutine(clear):
+                await clear
+        self._tier_hits.pop(namespace, None)
+
+        if self.invalidation_bus is not None:
+            await self.invalidation_bus.publish(namespace)
+
+    async def get_size(self, namespace: bytes) -> int:
+        size = self.tiers[-1].get_size(namespace)
+        if asyncio.iscoroutine(size):
+            size = await size
+        return size
+
+    async def get_tier_hits(self, namespace: bytes) -> tuple[int, ...]:
+        """Gets the number of hits served by each tier since the namespace
+        was last cleared.
+
+        Args:
+            namespace (bytes): Namespace to query
+
+        Returns:
+            tuple[int, ...]: Number of hits of each tier, fastest first
+        """
+        return tuple(self._tier_hits.get(namespace, (0,) * len(self.tiers)))
+
+    async def _subscribe(self) -> None:
+        self._subscribed = True
+        await self.invalidation_bus.subscribe(_async_invalidator(weakref.ref(self)))
@@ -2,15 +2,27 @@ from __future__ import annotations
 
 import asyncio
 import collections.abc
+import concurrent.futures
 import functools
 import inspect
+import pickle
 import sys
+import threading
+import time
 import typing
+import weakref
 
 import jwm._cache.hash_
 import jwm._cache.serializers
 import jwm._cache.sync
 import jwm._cache.ttl.cache
+import jwm._cache.ttl.envelope
+
+LOCK_POLL_SECONDS: float = 0.05
+"Time between checks for a value being computed by the holder of its lock"
+
+REFRESH_WORKERS: int = 4
+"Number of threads refreshing stale values for sync wrappers"
 
 
 class TTLInfo(typing.NamedTuple):
@@ -18,6 +30,9 @@ class TTLInfo(typing.NamedTuple):
     hits: int
     misses: int
     current_size: int
+    evictions: int = 0
+    current_bytes: int = 0
+    tier_hits: tuple[int, ...] = ()
 
 
 class TTLParameters(typing.NamedTuple):
@@ -27,13 +42,278 @@ class TTLParameters(typing.NamedTuple):
     identifier: bytes
     cache: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache
     serializer: jwm._cache.serializers.Serializer
+    maxsize: int | None = None
+    lock_timeout_seconds: float | None = None
+    stale_ttl_seconds: float | None = None
+    early_refresh_beta: float | None = None
+    cache_exceptions: tuple[type[BaseException], ...] = ()
+    exception_ttl_seconds: float | None = None
+    none_ttl_seconds: float | None = None
+
+
+class _Flight:
+    "Result of a function call shared by concurrent misses of the same key."
+
+    __slots__ = ("owner", "done", "value", "error")
+
+    def __init__(self) -> None:
+        self.owner: int | None = threading.get_ident()
+        self.done = threading.Event()
+        self.value: bytes | None = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> bytes:
+        """Wait for the leading caller to finish.
+
+        Returns:
+            bytes: Serialized result, the leading caller's exception is
+                raised instead if it failed.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+_flights: dict[tuple[bytes, bytes], _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _join_flight(key: tuple[bytes, bytes]) -> tuple[_Flight | None, bool]:
+    """Join the in flight call of an identifier and hash, or start one.
+
+    Returns:
+        tuple[_Flight | None, bool]: The flight and whether the caller leads
+            it. The flight is None for a recursive call with the same
+            arguments by the leading thread, which must not wait on itself.
+    """
+    with _flights_lock:
+        flight = _flights.get(key, None)
+        if flight is None:
+            flight = _flights[key] = _Flight()
+            return flight, True
+    if flight.owner == threading.get_ident():
+        return None, True
+    return flight, False
+
+
+def _end_flight(key: tuple[bytes, bytes], flight: _Flight) -> None:
+    "Remove a finished flight and wake its waiters."
+    with _flights_lock:
+        del _flights[key]
+    flight.done.set()
+
+
+_refresh_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> concurrent.futures.ThreadPoolExecutor:
+    "Thread pool shared by sync wrappers to refresh stale values."
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = concurrent.futures.ThreadPoolExecutor(
+                REFRESH_WORKERS, thread_name_prefix="jwm.cache-refresh"
+            )
+        return _refresh_executor
+
+
+class _AsyncFlight:
+    "Task shared by concurrent coroutines missing the same key."
+
+    __slots__ = ("flights", "key", "task", "waiters")
+
+    def __init__(
+        self,
+        flights: dict[tuple[bytes, bytes], _AsyncFlight],
+        key: tuple[bytes, bytes],
+        task: asyncio.Task,
+    ) -> None:
+        self.flights = flights
+        self.key = key
+        self.task = task
+        self.waiters = 0
+
+        flights[key] = self
+        task.add_done_callback(self._end)
+
+    async def wait(self) -> typing.Any:
+        """Wait for the shared task without letting a cancelled waiter
+        cancel it, unless no other coroutine is still waiting.
+
+        Returns:
+            Any: Result of the task.
+        """
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.waiters == 1 and not self.task.done():
+                # Later misses must start a new flight, not join this one
+                self._remove()
+                self.task.cancel()
+            raise
+        finally:
+            self.waiters -= 1
+
+    def _remove(self) -> None:
+        if self.flights.get(self.key, None) is self:
+            del self.flights[self.key]
+
+    def _end(self, task: asyncio.Task) -> None:
+        self._remove()
+        # Nobody may be left to await an exception
+        if not task.cancelled():
+            task.exception()
+
+
+_async_flights: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[bytes, bytes], _AsyncFlight]
+] = weakref.WeakKeyDictionary()
+
+
+def _loop_flights(
+    loop: asyncio.AbstractEventLoop,
+) -> dict[tuple[bytes, bytes], _AsyncFlight]:
+    flights = _async_flights.get(loop, None)
+    if flights is None:
+        flights = _async_flights[loop] = {}
+    return flights
+
+
+def _run_sync(value: typing.Any) -> typing.Any:
+    """Run a cache result to completion if it is a coroutine.
+
+    Args:
+        value (Any): Result of calling a TTLCache or AsyncTTLCache method.
+
+    Returns:
+        Any: The result, awaited in its own thread if it was a coroutine.
+    """
+    if not asyncio.iscoroutine(value):
+        return value
+
+    try:
+        return jwm._cache.sync.run_coroutine_in_thread(value)
+    except RuntimeError as error:
+        raise RuntimeError(
+            "Cannot use AsyncTTLCache outside a running event loop."
+        ) from error
+
+
+class _TTLWrapperBase:
+    "Storage format and time to live logic shared by both wrappers."
+
+    _ttl_seconds: float
+    _identifier: bytes
+    _cache: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache
+    _serializer: jwm._cache.serializers.Serializer
+    _stale_ttl_seconds: float | None
+    _early_refresh_beta: float | None
+    _cache_exceptions: tuple[type[BaseException], ...]
+    _exception_ttl_seconds: float | None
+    _none_ttl_seconds: float | None
+
+    def _store_call(
+        self,
+        hash_: bytes,
+        serialized: bytes,
+        delta_seconds: float,
+        ttl_seconds: float,
+        token: int | None = None,
+    ) -> typing.Any:
+        """Store a value, through the lock when holding it. Values with no time
+        to live are not stored, the stale window must not keep them, and only
+        the lock is released.
+
+        Returns:
+            Any: Result of the cache call, to be run or awaited by the caller.
+        """
+        if ttl_seconds <= 0:
+            if token is None:
+                return None
+            return self._cache.release_lock(self._identifier, hash_, token)
+
+        stored, ttl_seconds = self._pack(serialized, delta_seconds, ttl_seconds)
+        if token is None:
+            return self._cache.set(self._identifier, hash_, stored, ttl_seconds)
+        return self._cache.set_locked(
+            self._identifier, hash_, stored, ttl_seconds, token
+        )
+
+    def _store_exception_call(
+        self,
+        hash_: bytes,
+        error: BaseException,
+        delta_seconds: float,
+        token: int | None = None,
+    ) -> tuple[bool, typing.Any]:
+        """Store an exception to be raised by hits, unless it cannot be pickled.
+
+        Returns:
+            tuple[bool, Any]: Whether it is stored and the result of the cache
+                call, to be run or awaited by the caller.
+        """
+        serialized = jwm._cache.ttl.envelope.pack_exception(error)
+        if serialized is None:
+            return False, None
+        return True, self._store_call(
+            hash_, serialized, delta_seconds, self._exception_ttl(), token
+        )
+
+    def _pack(
+        self, serialized: bytes, delta_seconds: float, ttl_seconds: float
+    ) -> tuple[bytes, float]:
+        """Value and time to live to store, values are wrapped in an envelope
+        recording when they go stale and their compute time if stale values
+        or early refreshes are enabled."""
+        if self._stale_ttl_seconds is None and self._early_refresh_beta is None:
+            return serialized, ttl_seconds
+        return (
+            jwm._cache.ttl.envelope.pack(serialized, ttl_seconds, delta_seconds),
+            ttl_seconds + (self._stale_ttl_seconds or 0),
+        )
+
+    def _unpack(self, stored: bytes, beta: float | None = None) -> tuple[bytes, bool]:
+        "Serialized value of a stored value and whether it should be refreshed."
+        if self._stale_ttl_seconds is None and self._early_refresh_beta is None:
+            return stored, False
+        return jwm._cache.ttl.envelope.unpack(stored, beta or 0)
+
+    def _dump(self, value: typing.Any) -> bytes:
+        "Serialize a value, tagged as a value when exceptions are cached."
+        serialized = self._serializer.serialize(value)
+        if self._cache_exceptions:
+            return jwm._cache.ttl.envelope.pack_value(serialized)
+        return serialized
+
+    def _load(self, serialized: bytes) -> typing.Any:
+        "Deserialize a value, raising it if it is a cached exception."
+        if self._cache_exceptions:
+            serialized, is_exception = jwm._cache.ttl.envelope.unpack_outcome(
+                serialized
+            )
+            if is_exception:
+                raise pickle.loads(serialized)
+        return self._serializer.deserialize(serialized)
+
+    def _value_ttl(self, value: typing.Any) -> float:
+        if value is None and self._none_ttl_seconds is not None:
+            return self._none_ttl_seconds
+        return self._ttl_seconds
+
+    def _exception_ttl(self) -> float:
+        if self._exception_ttl_seconds is None:
+            return self._ttl_seconds
+        return self._exception_ttl_seconds
 
 
 P0 = typing.ParamSpec("P0")
 T0 = typing.TypeVar("T0")
 
 
-class TTLWrapper(typing.Generic[P0, T0]):
+class TTLWrapper(_TTLWrapperBase, typing.Generic[P0, T0]):
     "Time To Live (TTL) wrapper returned by ttl_cache or TTLDecorator"
 
     def __init__(
@@ -44,6 +324,13 @@ class TTLWrapper(typing.Generic[P0, T0]):
         identifier: bytes,
         cache: jwm._cache.ttl.cache.TTLCache | jwm._cache.ttl.cache.AsyncTTLCache,
         serializer: jwm._cache.serializers.Serializer,
+        maxsize: int | None = None,
+        lock_timeout_seconds: float | None = None,
+        stale_ttl_seconds: float | None = None,
+        early_refresh_beta: float | None = None,
+        cache_exceptions: tuple[type[BaseException], ...] = (),
+        exception_ttl_seconds: float | None = None,
+        none_ttl_seconds: float | None = None,
     ) -> None:
         self: TTLWrapper[P0, T0] = functools.update_wrapper(self, func)
 
@@ -53,8 +340,20 @@ class TTLWrapper(typing.Generic[P0, T0]):
         self._identifier = identifier
         self._cache = cache
         self._serializer = serializer
+        self._maxsize = maxsize
+        self._lock_timeout_seconds = lock_timeout_seconds
+        self._stale_ttl_seconds = stale_ttl_seconds
+        self._early_refresh_beta = early_refresh_beta
+        self._cache_exceptions = cache_exceptions
+        self._exception_ttl_seconds = exception_ttl_seconds
+        self._none_ttl_seconds = none_ttl_seconds
 
         self._signature = inspect.signature(self.__wrapped__)
+        self._build_key = jwm._cache.hash_.make_key_builder(
+            self._signature, typed=typed
+        )
+        # Decided once so hits do not check for a coroutine
+        self._get_is_async = inspect.iscoroutinefunction(cache.get)
         self._hits = 0
         self._misses = 0
         self._wrapped_self: typing.Any | None = None
@@ -64,80 +363,199 @@ class TTLWrapper(typing.Generic[P0, T0]):
         return self
 
     def __call__(self, *args: P0.args, **kwargs: P0.kwargs) -> T0:
-        # Bind arguments with defaults
         if self._wrapped_self is not None:
-            bound = self._signature.bind(self._wrapped_self, *args, **kwargs)
-        else:
-            bound = self._signature.bind(*args, **kwargs)
-        bound.apply_defaults()
+            args = (self._wrapped_self, *args)
 
-        # Get hash of bound arguments
-        hash_ = jwm._cache.hash_.hash_bound(
-            bound,
-            typed=self._typed,
-        ).to_bytes(sys.hash_info.width, "little")
+        # Get hash of arguments with defaults
+        hash_ = self._build_key(args, kwargs).to_bytes(sys.hash_info.width, "little")
 
         # Check for Cache hit
-        value = self._cache.get(self._identifier, hash_)
-        if asyncio.iscoroutine(value):
-            try:
-                value = jwm._cache.sync.run_coroutine_in_thread(value)
-            except RuntimeError as error:
-                raise RuntimeError(
-                    "Cannot use AsyncTTLCache outside a running event loop."
-                ) from error
-        if value is not None:
-            self._hits += 1
-            return self._serializer.deserialize(value)
+        stored = self._cache.get(self._identifier, hash_)
+        if self._get_is_async:
+            stored = _run_sync(stored)
+        if stored is not None:
+            serialized, stale = self._unpack(stored, self._early_refresh_beta)
+            # Without stale values an early refresh runs like a miss
+            if not stale or self._stale_ttl_seconds is not None:
+                self._hits += 1
+                if stale:
+                    self._refresh(args, kwargs, hash_)
+                return self._load(serialized)
         self._misses += 1
 
-        # Run original function and store result in cache
-        value = self.__wrapped__(*bound.args, **bound.kwargs)
-        set_ = self._cache.set(
-            self._identifier,
-            hash_,
-            self._serializer.serialize(value),
-            self._ttl_seconds,
-        )
-        if asyncio.iscoroutine(set_):
-            try:
-                jwm._cache.sync.run_coroutine_in_thread(set_)
-            except RuntimeError as error:
-                raise RuntimeError(
-                    "Cannot use AsyncTTLCache outside a running event loop."
-                ) from error
+        # Concurrent misses of the same key in this process wait for the
+        # first caller instead of running the function again
+        flight_key = (self._identifier, hash_)
+        flight, leader = _join_flight(flight_key)
+        if not leader:
+            return self._load(flight.wait())
+        if flight is None:
+            return self._call(args, kwargs, hash_)[0]
+
+        try:
+            value, flight.value = self._call(args, kwargs, hash_)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            _end_flight(flight_key, flight)
 
         return value
 
+    def _call(
+        self, args: tuple, kwargs: dict, hash_: bytes, refresh: bool = False
+    ) -> tuple[T0, bytes]:
+        """Run the original function and store the result in the cache,
+        exceptions are only stored when not refreshing a stale value."""
+        if self._lock_timeout_seconds is not None:
+            return self._call_locked(args, kwargs, hash_, refresh)
+
+        start = time.monotonic()
+        try:
+            value = self.__wrapped__(*args, **kwargs)
+        except self._cache_exceptions as error:
+            if not refresh:
+                self._store_exception(hash_, error, time.monotonic() - start)
+            raise
+        serialized = self._dump(value)
+        self._store(hash_, serialized, time.monotonic() - start, self._value_ttl(value))
+
+        return value, serialized
+
+    def _refresh(self, args: tuple, kwargs: dict, hash_: bytes) -> None:
+        "Recompute a stale value in the background unless already in flight."
+        flight_key = (self._identifier, hash_)
+        flight, leader = _join_flight(flight_key)
+        if not leader or flight is None:
+            return
+
+        # Owned by the pool thread once it starts
+        flight.owner = None
+        _get_refresh_executor().submit(
+            self._run_refresh, args, kwargs, flight_key, flight
+        )
+
+    def _run_refresh(
+        self,
+        args: tuple,
+        kwargs: dict,
+        flight_key: tuple[bytes, bytes],
+        flight: _Flight,
+    ) -> None:
+        flight.owner = threading.get_ident()
+        try:
+            flight.value = self._call(args, kwargs, flight_key[1], refresh=True)[1]
+        except BaseException as error:
+            # The stale value is served until it expires
+            flight.error = error
+        finally:
+            _end_flight(flight_key, flight)
+
+    def _call_locked(
+        self, args: tuple, kwargs: dict, hash_: bytes, refresh: bool = False
+    ) -> tuple[T0, bytes]:
+        """Run the original function for a missed key while holding its lock,
+        or wait for the holder to store the value. Waits at most the lock
+        timeout, then runs the function without the lock."""
+        token = _run_sync(
+            self._cache.acquire_lock(
+                self._identifier, hash_, self._lock_timeout_seconds
+            )
+        )
+        deadline = time.monotonic() + self._lock_timeout_seconds
+        while token is None and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            stored = _run_sync(self._cache.get(self._identifier, hash_))
+            if stored is not None:
+                serialized, stale = self._unpack(stored)
+                if not stale:
+                    return self._load(serialized), serialized
+
+            # Free again when the holder failed or its lock expired
+            token = _run_sync(
+                self._cache.acquire_lock(
+                    self._identifier, hash_, self._lock_timeout_seconds
+                )
+            )
+
+        start = time.monotonic()
+        try:
+            value = self.__wrapped__(*args, **kwargs)
+            serialized = self._dump(value)
+        except BaseException as error:
+            # Storing the exception also releases the lock
+            stored = False
+            if isinstance(error, self._cache_exceptions) and not refresh:
+                stored = self._store_exception(
+                    hash_, error, time.monotonic() - start, token
+                )
+            if not stored and token is not None:
+                _run_sync(self._cache.release_lock(self._identifier, hash_, token))
+            raise
+
+        self._store(
+            hash_, serialized, time.monotonic() - start, self._value_ttl(value), token
+        )
+
+        return value, serialized
+
+    def _store(
+        self,
+        hash_: bytes,
+        serialized: bytes,
+        delta_seconds: float,
+        ttl_seconds: float,
+        token: int | None = None,
+    ) -> None:
+        _run_sync(
+            self._store_call(hash_, serialized, delta_seconds, ttl_seconds, token)
+        )
+
+    def _store_exception(
+        self,
+        hash_: bytes,
+        error: BaseException,
+        delta_seconds: float,
+        token: int | None = None,
+    ) -> bool:
+        stored, result = self._store_exception_call(hash_, error, delta_seconds, token)
+        _run_sync(result)
+        return stored
+
     def cache_info(self) -> TTLInfo:
         """Report cache statistics"""
-        size = self._cache.get_size(self._identifier)
-        if asyncio.iscoroutine(size):
-            try:
-                size = jwm._cache.sync.run_coroutine_in_thread(size)
-            except RuntimeError as error:
-                raise RuntimeError(
-                    "Cannot use AsyncTTLCache outside a running event loop."
-                ) from error
+        size = _run_sync(self._cache.get_size(self._identifier))
+
+        # Optional statistics, not every cache reports them
+        evictions = 0
+        get_evictions = getattr(self._cache, "get_evictions", None)
+        if get_evictions is not None:
+            evictions = _run_sync(get_evictions(self._identifier))
+
+        current_bytes = 0
+        get_bytes = getattr(self._cache, "get_bytes", None)
+        if get_bytes is not None:
+            current_bytes = _run_sync(get_bytes(self._identifier))
+
+        tier_hits: tuple[int, ...] = ()
+        get_tier_hits = getattr(self._cache, "get_tier_hits", None)
+        if get_tier_hits is not None:
+            tier_hits = _run_sync(get_tier_hits(self._identifier))
 
         return TTLInfo(
             self._hits,
             self._misses,
             size,
+            evictions,
+            current_bytes,
+            tier_hits,
         )
 
     def cache_clear(self) -> None:
         """Clear the cache and cache statistics"""
         self._hits = 0
         self._misses = 0
-        clear = self._cache.clear(self._identifier)
-        if asyncio.iscoroutine(clear):
-            try:
-                jwm._cache.sync.run_coroutine_in_thread(clear)
-            except RuntimeError as error:
-                raise RuntimeError(
-                    "Cannot use AsyncTTLCache outside a running event loop."
-                ) from error
+        _run_sync(self._cache.clear(self._identifier))
 
     def cache_parameters(self) -> TTLParameters:
         """Report cache configuration"""
@@ -147,6 +565,13 @@ class TTLWrapper(typing.Generic[P0, T0]):
             self._identifier,
             self._cache,
             self._serializer,
+            self._maxsize,
+            self._lock_timeout_seconds,
+            self._stale_ttl_seconds,
+            self._early_refresh_beta,
+            self._cache_exceptions,
+            self._exception_ttl_seconds,
+            self._none_ttl_seconds,
         )
 
 
@@ -154,7 +579,7 @@ P1 = typing.ParamSpec("P1")
 T1 = typing.TypeVar("T1")
 
 
-class AsyncTTLWrapper(typing.Generic[P1, T1]):
+class AsyncTTLWrapper(_TTLWrapperBase, typing.Generic[P1, T1]):
     "Async Time To Live (TTL) wrapper returned by ttl_cache or TTLDecorator"
 
     def __init__(
@@ -167,6 +592,13 @@ class AsyncTTLWrapper(typing.Generic[P1, T1]):
         identifier: bytes,
         cache: jwm._cache.ttl.cache.AsyncTTLCache | jwm._cache.ttl.cache.TTLCache,
         serializer: jwm._cache.serializers.Serializer,
+        maxsize: int | None = None,
+        lock_timeout_seconds: float | None = None,
+        stale_ttl_seconds: float | None = None,
+        early_refresh_beta: float | None = None,
+        cache_exceptions: tuple[type[BaseException], ...] = (),
+        exception_ttl_seconds: float | None = None,
+        none_ttl_seconds: float | None = None,
     ) -> None:
         self: AsyncTTLWrapper[P1, T1] = functools.update_wrapper(self, func)
 
@@ -178,8 +610,20 @@ class AsyncTTLWrapper(typing.Generic[P1, T1]):
         self._identifier = identifier
         self._cache = cache
         self._serializer = serializer
+        self._maxsize = maxsize
+        self._lock_timeout_seconds = lock_timeout_seconds
+        self._stale_ttl_seconds = stale_ttl_seconds
+        self._early_refresh_beta = early_refresh_beta
+        self._cache_exceptions = cache_exceptions
+        self._exception_ttl_seconds = exception_ttl_seconds
+        self._none_ttl_seconds = none_ttl_seconds
 
         self._signature = inspect.signature(self.__wrapped__)
+        self._build_key = jwm._cache.hash_.make_key_builder(
+            self._signature, typed=typed
+        )
+        # Decided once so hits do not check for a coroutine
+        self._get_is_async = inspect.iscoroutinefunction(cache.get)
         self._hits = 0
         self._misses = 0
         self._wrapped_self: typing.Any | None = None
@@ -191,39 +635,149 @@ class AsyncTTLWrapper(typing.Generic[P1, T1]):
         return self
 
     async def __call__(self, *args: P1.args, **kwargs: P1.kwargs) -> T1:
-        # Bind arguments with defaults
         if self._wrapped_self is not None:
-            bound = self._signature.bind(self._wrapped_self, *args, **kwargs)
-        else:
-            bound = self._signature.bind(*args, **kwargs)
+            args = (self._wrapped_self, *args)
 
-        # Get hash of bound arguments
-        hash_ = jwm._cache.hash_.hash_bound(
-            bound,
-            typed=self._typed,
-        ).to_bytes(sys.hash_info.width, "little")
+        # Get hash of arguments with defaults
+        hash_ = self._build_key(args, kwargs).to_bytes(sys.hash_info.width, "little")
 
         # Check for Cache hit
-        value = self._cache.get(self._identifier, hash_)
-        if asyncio.iscoroutine(value):
-            value = await value
-        if value is not None:
-            self._hits += 1
-            return self._serializer.deserialize(value)
+        stored = self._cache.get(self._identifier, hash_)
+        if self._get_is_async:
+            stored = await stored
+        if stored is not None:
+            serialized, stale = self._unpack(stored, self._early_refresh_beta)
+            # Without stale values an early refresh runs like a miss
+            if not stale or self._stale_ttl_seconds is not None:
+                self._hits += 1
+                if stale:
+                    self._refresh(args, kwargs, hash_)
+                return self._load(serialized)
         self._misses += 1
 
-        # Run original function and store result in cache
-        value = await self.__wrapped__(*bound.args, **bound.kwargs)
-        set_ = self._cache.set(
-            self._identifier,
-            hash_,
-            self._serializer.serialize(value),
-            self._ttl_seconds,
+        # Concurrent misses of the same key on this event loop await one
+        # shared task instead of running the function again
+        loop = asyncio.get_running_loop()
+        flights = _loop_flights(loop)
+        flight_key = (self._identifier, hash_)
+        flight = flights.get(flight_key, None)
+        if flight is None:
+            task = loop.create_task(self._call(args, kwargs, hash_))
+            flight = _AsyncFlight(flights, flight_key, task)
+            return (await flight.wait())[0]
+        if flight.task is asyncio.current_task():
+            # Recursive call with the same arguments must not wait on itself
+            return (await self._call(args, kwargs, hash_))[0]
+
+        return self._load((await flight.wait())[1])
+
+    async def _call(
+        self, args: tuple, kwargs: dict, hash_: bytes, refresh: bool = False
+    ) -> tuple[T1, bytes]:
+        """Run the original function and store the result in the cache,
+        exceptions are only stored when not refreshing a stale value."""
+        if self._lock_timeout_seconds is not None:
+            return await self._call_locked(args, kwargs, hash_, refresh)
+
+        start = time.monotonic()
+        try:
+            value = await self.__wrapped__(*args, **kwargs)
+        except self._cache_exceptions as error:
+            if not refresh:
+                await self._store_exception(hash_, error, time.monotonic() - start)
+            raise
+        serialized = self._dump(value)
+        await self._store(
+            hash_, serialized, time.monotonic() - start, self._value_ttl(value)
         )
-        if asyncio.iscoroutine(set_):
-            await set_
 
-        return value
+        return value, serialized
+
+    def _refresh(self, args: tuple, kwargs: dict, hash_: bytes) -> None:
+        "Recompute a stale value in a task unless already in flight."
+        loop = asyncio.get_running_loop()
+        flights = _loop_flights(loop)
+        flight_key = (self._identifier, hash_)
+        if flight_key not in flights:
+            task = loop.create_task(self._call(args, kwargs, hash_, refresh=True))
+            _AsyncFlight(flights, flight_key, task)
+
+    async def _call_locked(
+        self, args: tuple, kwargs: dict, hash_: bytes, refresh: bool = False
+    ) -> tuple[T1, bytes]:
+        """Run the original function for a missed key while holding its lock,
+        or wait for the holder to store the value. Waits at most the lock
+        timeout, then runs the function without the lock."""
+
+        async def acquire_lock() -> int | None:
+            token = self._cache.acquire_lock(
+                self._identifier, hash_, self._lock_timeout_seconds
+            )
+            if asyncio.iscoroutine(token):
+                token = await token
+            return token
+
+        token = await acquire_lock()
+        deadline = time.monotonic() + self._lock_timeout_seconds
+        while token is None and time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            stored = self._cache.get(self._identifier, hash_)
+            if asyncio.iscoroutine(stored):
+                stored = await stored
+            if stored is not None:
+                serialized, stale = self._unpack(stored)
+                if not stale:
+                    return self._load(serialized), serialized
+
+            # Free again when the holder failed or its lock expired
+            token = await acquire_lock()
+
+        start = time.monotonic()
+        try:
+            value = await self.__wrapped__(*args, **kwargs)
+            serialized = self._dump(value)
+        except BaseException as error:
+            # Storing the exception also releases the lock
+            stored = False
+            if isinstance(error, self._cache_exceptions) and not refresh:
+                stored = await self._store_exception(
+                    hash_, error, time.monotonic() - start, token
+                )
+            if not stored and token is not None:
+                release = self._cache.release_lock(self._identifier, hash_, token)
+                if asyncio.iscoroutine(release):
+                    await release
+            raise
+
+        await self._store(
+            hash_, serialized, time.monotonic() - start, self._value_ttl(value), token
+        )
+
+        return value, serialized
+
+    async def _store(
+        self,
+        hash_: bytes,
+        serialized: bytes,
+        delta_seconds: float,
+        ttl_seconds: float,
+        token: int | None = None,
+    ) -> None:
+        result = self._store_call(hash_, serialized, delta_seconds, ttl_seconds, token)
+        if asyncio.iscoroutine(result):
+            await result
+
+    async def _store_exception(
+        self,
+        hash_: bytes,
+        error: BaseException,
+        delta_seconds: float,
+        token: int | None = None,
+    ) -> bool:
+        stored, result = self._store_exception_call(hash_, error, delta_seconds, token)
+        if asyncio.iscoroutine(result):
+            await result
+        return stored
 
     async def cache_info(self) -> TTLInfo:
         """Report cache statistics"""
@@ -231,10 +785,35 @@ class AsyncTTLWrapper(typing.Generic[P1, T1]):
         if asyncio.iscoroutine(size):
             size = await size
 
+        # Optional statistics, not every cache reports them
+        evictions = 0
+        get_evictions = getattr(self._cache, "get_evictions", None)
+        if get_evictions is not None:
+            evictions = get_evictions(self._identifier)
+            if asyncio.iscoroutine(evictions):
+                evictions = await evictions
+
+        current_bytes = 0
+        get_bytes = getattr(self._cache, "get_bytes", None)
+        if get_bytes is not None:
+            current_bytes = get_bytes(self._identifier)
+            if asyncio.iscoroutine(current_bytes):
+                current_bytes = await current_bytes
+
+        tier_hits: tuple[int, ...] = ()
+        get_tier_hits = getattr(self._cache, "get_tier_hits", None)
+        if get_tier_hits is not None:
+            tier_hits = get_tier_hits(self._identifier)
+            if asyncio.iscoroutine(tier_hits):
+                tier_hits = await tier_hits
+
         return TTLInfo(
             self._hits,
             self._misses,
             size,
+            evictions,
+            current_bytes,
+            tier_hits,
         )
 
     async def cache_clear(self) -> None:
@@ -253,4 +832,11 @@ class AsyncTTLWrapper(typing.Generic[P1, T1]):
             self._identifier,
             self._cache,
             self._serializer,
+            self._maxsize,
+            self._lock_timeout_seconds,
+            self._stale_ttl_seconds,
+            self._early_refresh_beta,
+            self._cache_exceptions,
+            self._exception_ttl_seconds,
+            self._none_ttl_seconds,
         )
@@ -4,15 +4,25 @@ from jwm._cache.forward import *
 from jwm._cache.hash_ import *
 from jwm._cache.serializers import *
 from jwm._cache.sync import *
+from jwm._cache.ttl.batching import *
 from jwm._cache.ttl.cache import *
 from jwm._cache.ttl.decorator import *
+from jwm._cache.ttl.disk import *
+from jwm._cache.ttl.invalidation import *
 from jwm._cache.ttl.local import *
+from jwm._cache.ttl.policy import *
 from jwm._cache.ttl.redis_ import *
+from jwm._cache.ttl.shared import *
+from jwm._cache.ttl.sqlite import *
+from jwm._cache.ttl.tiered import *
 
 __all__ = [
     "Serializer",
     "PickleSerializer",
     "JsonSerializer",
+    "IdentitySerializer",
+    "CompressingSerializer",
+    "CompressionStats",
     "persistent_hash",
 ]
 
@@ -29,6 +39,15 @@ __all__.extend(
         "AsyncTTLCache",
         "LocalTTLCache",
         "AsyncLocalTTLCache",
+        "DiskTTLCache",
+        "TieredTTLCache",
+        "AsyncTieredTTLCache",
+        "BatchingAsyncTTLCache",
+        "InvalidationBus",
+        "AsyncInvalidationBus",
+        "EvictionPolicy",
+        "LRUPolicy",
+        "WTinyLFUPolicy",
         "set_default_ttl_cache",
         "get_default_ttl_cache",
     )
@@ -40,3 +59,19 @@ if HAS_TTL_REDIS_CACHE:
             "AsyncRedisTTLCache",
         )
     )
+if HAS_TTL_INVALIDATION_BUS:
+    __all__.extend(
+        (
+            "RedisInvalidationBus",
+            "AsyncRedisInvalidationBus",
+        )
+    )
+if HAS_TTL_SHARED_CACHE:
+    __all__.extend(("SharedTTLCache",))
+if HAS_TTL_SQLITE_CACHE:
+    __all__.extend(
+        (
+            "SQLiteTTLCache",
+            "AsyncSQLiteTTLCache",
+        )
+    )
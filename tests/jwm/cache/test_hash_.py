@@ -1,9 +1,11 @@
+import inspect
 import subprocess
 import sys
 import textwrap
 
 import pytest
 
+import jwm._cache.hash_
 import jwm.cache
 
 
@@ -104,3 +106,46 @@ def test_no_dunder_persistent_hash() -> None:
 def test_overflow_persistent_hash() -> None:
     max_Py_size_t = pow(2, sys.hash_info.width - 3)
     assert jwm.cache.persistent_hash(max_Py_size_t - 1) == 0
+
+
+def _parameters(a, b=2, /, c=3, *args, d, e=5, **kwargs) -> None: ...
+
+
+def _positional(a, b, c=[1]) -> None: ...
+
+
+def _variadic(*args, **kwargs) -> None: ...
+
+
+@pytest.mark.parametrize("typed", (False, True))
+@pytest.mark.parametrize("func", (_parameters, _positional, _variadic))
+@pytest.mark.parametrize(
+    "args, kwargs",
+    (
+        ((), {}),
+        ((1,), {}),
+        ((1, 2), {}),
+        ((1, 2, 3), {}),
+        ((1, 2, 3, 4, 5), {}),
+        ((1,), {"d": 4}),
+        ((1, 2), {"c": 9, "d": 4, "z": 1}),
+        ((1, 2, 3, 4), {"d": 1, "e": 2}),
+        ((1,), {"b": 2}),
+        ((1,), {"a": 1}),
+        ((), {"a": 1, "b": 2}),
+        ((1, 2, 3), {"c": 3}),
+        ((1, [2]), {}),
+    ),
+)
+def test_make_key_builder(func, typed: bool, args: tuple, kwargs: dict) -> None:
+    signature = inspect.signature(func)
+    build_key = jwm._cache.hash_.make_key_builder(signature, typed=typed)
+
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        with pytest.raises(TypeError):
+            build_key(args, kwargs)
+        return
+
+    assert build_key(args, kwargs) == jwm._cache.hash_.hash_bound(bound, typed=typed)
@@ -1,3 +1,4 @@
+import os
 import pickle
 import typing
 
@@ -50,9 +51,93 @@ def test_json_serializer(value: typing.Any) -> None:
     assert deserialized == value
 
 
+@pytest.mark.parametrize("value", (None, 1, ["2", 3], lambda x: x))
+def test_identity_serializer(value: typing.Any) -> None:
+    serializer = jwm.cache.IdentitySerializer()
+
+    serialized = serializer.serialize(value)
+    assert serialized is not None
+    assert serializer.deserialize(serialized) is value
+
+
+def test_identity_serializer_copy_values() -> None:
+    serializer = jwm.cache.IdentitySerializer(copy_values=True)
+    value = {"a": [1, 2]}
+
+    serialized = serializer.serialize(value)
+    value["a"].append(3)
+    first = serializer.deserialize(serialized)
+    first["a"].append(4)
+
+    assert first == {"a": [1, 2, 4]}
+    assert serializer.deserialize(serialized) == {"a": [1, 2]}
+
+
 @pytest.mark.parametrize("value", (b"bytes", lambda x: x))
 def test_json_serializer_fail(value: typing.Any) -> None:
     serializer = jwm.cache.JsonSerializer()
 
     with pytest.raises(TypeError):
         serializer.serialize(value)
+
+
+@pytest.mark.parametrize(
+    "serializer", (jwm.cache.PickleSerializer(), jwm.cache.JsonSerializer())
+)
+def test_serializer_memoryview(serializer: jwm.cache.Serializer) -> None:
+    serialized = serializer.serialize({"1": [2, 3]})
+
+    assert serializer.deserialize(memoryview(serialized)) == {"1": [2, 3]}
+
+
+@pytest.mark.parametrize("algorithm", ("zlib", "lzma", "bz2"))
+def test_compressing_serializer(algorithm: str) -> None:
+    serializer = jwm.cache.CompressingSerializer(algorithm=algorithm, min_size=100)
+    large = ["value"] * 1_000
+    small = [1, 2]
+
+    large_serialized = serializer.serialize(large)
+    small_serialized = serializer.serialize(small)
+
+    assert len(large_serialized) < len(pickle.dumps(large))
+    assert small_serialized[1:] == pickle.dumps(small)
+    assert serializer.deserialize(large_serialized) == large
+    assert serializer.deserialize(memoryview(small_serialized)) == small
+
+    stats = serializer.get_stats()
+    assert (stats.compressed, stats.uncompressed) == (1, 1)
+    assert stats.bytes_in == len(pickle.dumps(large)) + len(pickle.dumps(small))
+    assert stats.bytes_out == len(large_serialized) + len(small_serialized)
+    assert stats.ratio > 1
+
+
+def test_compressing_serializer_reads_any_algorithm() -> None:
+    value = {"key": "value" * 1_000}
+    zlib_serializer = jwm.cache.CompressingSerializer(
+        jwm.cache.JsonSerializer(), min_size=0
+    )
+    lzma_serializer = jwm.cache.CompressingSerializer(
+        jwm.cache.JsonSerializer(), algorithm="lzma", level=1
+    )
+
+    assert lzma_serializer.deserialize(zlib_serializer.serialize(value)) == value
+    assert zlib_serializer.deserialize(lzma_serializer.serialize(value)) == value
+
+
+def test_compressing_serializer_keeps_incompressible() -> None:
+    serializer = jwm.cache.CompressingSerializer(min_size=0)
+    value = os.urandom(1_024)
+
+    serialized = serializer.serialize(value)
+
+    assert serialized[0] == 0
+    assert serializer.deserialize(serialized) == value
+
+
+def test_compressing_serializer_invalid() -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.CompressingSerializer(algorithm="brotli")
+    with pytest.raises(ValueError):
+        jwm.cache.CompressingSerializer(min_size=-1)
+    with pytest.raises(ValueError):
+        jwm.cache.CompressingSerializer().deserialize(b"\xff")
@@ -0,0 +1,114 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+import jwm.cache
+
+
+class _CountingCache(jwm.cache.AsyncLocalTTLCache):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[bytes]] = []
+
+    async def get_many(self, namespace, keys):
+        self.batches.append(list(keys))
+        return await super().get_many(namespace, keys)
+
+
+async def test_batching_coalesces_gets() -> None:
+    cache = _CountingCache()
+    batching = jwm.cache.BatchingAsyncTTLCache(cache)
+    await batching.set_many(b"test_namespace", {b"a": b"1", b"b": b"2"})
+
+    values = await asyncio.gather(
+        batching.get(b"test_namespace", b"a"),
+        batching.get(b"test_namespace", b"b"),
+        batching.get(b"test_namespace", b"a"),
+        batching.get(b"test_namespace", b"c"),
+    )
+
+    assert values == [b"1", b"2", b"1", None]
+    assert cache.batches == [[b"a", b"b", b"c"]]
+
+
+async def test_batching_window_and_max_batch_size() -> None:
+    cache = _CountingCache()
+    batching = jwm.cache.BatchingAsyncTTLCache(
+        cache, window_seconds=0.01, max_batch_size=2
+    )
+
+    async def delayed_get(key: bytes) -> bytes | None:
+        await asyncio.sleep(0.001)
+        return await batching.get(b"test_namespace", key)
+
+    await asyncio.gather(
+        batching.get(b"test_namespace", b"a"),
+        delayed_get(b"b"),
+        delayed_get(b"c"),
+    )
+
+    assert cache.batches == [[b"a", b"b"], [b"c"]]
+
+
+async def test_batching_redis_single_mget(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = fakeredis.FakeAsyncRedis()
+    batching = jwm.cache.BatchingAsyncTTLCache(jwm.cache.AsyncRedisTTLCache(client))
+    await batching.set(b"test_namespace", b"a", b"1")
+
+    calls = []
+    mget = client.mget
+
+    async def counting_mget(*args, **kwargs):
+        calls.append(args)
+        return await mget(*args, **kwargs)
+
+    monkeypatch.setattr(client, "mget", counting_mget)
+    values = await asyncio.gather(
+        *(batching.get(b"test_namespace", key) for key in (b"a", b"b", b"c"))
+    )
+
+    assert values == [b"1", None, None]
+    assert len(calls) == 1
+    assert await batching.get_size(b"test_namespace") == 1
+
+
+async def test_batching_error_reaches_every_waiter() -> None:
+    class _FailingCache(jwm.cache.AsyncLocalTTLCache):
+        async def get_many(self, namespace, keys):
+            raise ConnectionError("unavailable")
+
+    batching = jwm.cache.BatchingAsyncTTLCache(_FailingCache())
+
+    results = await asyncio.gather(
+        batching.get(b"test_namespace", b"a"),
+        batching.get(b"test_namespace", b"b"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_batching_forwards_optional_methods() -> None:
+    cache = jwm.cache.AsyncLocalTTLCache()
+    batching = jwm.cache.BatchingAsyncTTLCache(cache)
+
+    @jwm.cache.ttl_cache(cache=batching, maxsize=1)
+    async def double(value: int) -> int:
+        return value * 2
+
+    assert await asyncio.gather(double(1), double(1)) == [2, 2]
+    assert await double(2) == 4
+    info = await double.cache_info()
+    assert info.current_size == 1
+    assert info.evictions == 1
+
+
+@pytest.mark.parametrize("window_seconds, max_batch_size", ((-1, 1), (0, 0)))
+def test_batching_invalid(window_seconds: float, max_batch_size: int) -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.BatchingAsyncTTLCache(
+            jwm.cache.AsyncLocalTTLCache(),
+            window_seconds=window_seconds,
+            max_batch_size=max_batch_size,
+        )
@@ -1,5 +1,10 @@
+import asyncio
 import collections.abc
+import concurrent.futures
 import contextlib
+import pathlib
+import threading
+import time
 import typing
 import unittest.mock
 
@@ -281,3 +286,541 @@ def test_ttl_cache_decorator(
     wrapper = jwm._cache.ttl.decorator.ttl_cache(function)
 
     assert isinstance(wrapper, expected_wrapper)
+
+
+def test_ttl_cache_maxsize() -> None:
+    @jwm._cache.ttl.decorator.ttl_cache(maxsize=2)
+    def identity(x: int) -> int:
+        return x
+
+    for x in (1, 2, 3, 1):
+        identity(x)
+
+    info = identity.cache_info()
+    assert info.current_size == 2
+    assert info.evictions == 2
+    assert identity.cache_parameters().maxsize == 2
+
+
+@pytest.mark.parametrize("shards", (1, 4))
+def test_ttl_cache_maxsize_sharded(shards: int) -> None:
+    @jwm._cache.ttl.decorator.ttl_cache(
+        maxsize=1, cache=jwm._cache.ttl.local.LocalTTLCache(shards=shards)
+    )
+    def identity(x: int) -> int:
+        return x
+
+    for x in range(100):
+        identity(x)
+
+    # Each shard keeps its own share of the limit, rounded up
+    assert identity.cache_info().current_size == shards
+
+
+async def test_async_ttl_cache_maxsize() -> None:
+    @jwm._cache.ttl.decorator.ttl_cache(maxsize=1, cache="async_local")
+    async def identity(x: int) -> int:
+        return x
+
+    for x in (1, 2, 2):
+        await identity(x)
+
+    info = await identity.cache_info()
+    assert info.hits == 1
+    assert info.current_size == 1
+    assert info.evictions == 1
+
+
+@pytest.mark.parametrize("maxsize, cache", ((-1, "local"), (1, object())))
+def test_ttl_cache_maxsize_invalid(maxsize: int, cache: typing.Any) -> None:
+    with pytest.raises(ValueError):
+        jwm._cache.ttl.decorator.ttl_cache(maxsize=maxsize, cache=cache)
+
+
+def test_ttl_cache_current_bytes() -> None:
+    @jwm._cache.ttl.decorator.ttl_cache(
+        cache=jwm._cache.ttl.local.LocalTTLCache(max_bytes=1_000_000)
+    )
+    def identity(x: int) -> int:
+        return x
+
+    identity(1)
+    assert identity.cache_info().current_bytes > 0
+
+
+def test_ttl_cache_single_flight() -> None:
+    calls = []
+    started = threading.Event()
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    def slow(x: int) -> list[int]:
+        calls.append(x)
+        started.set()
+        time.sleep(0.2)
+        return [x]
+
+    with concurrent.futures.ThreadPoolExecutor(16) as executor:
+        futures = [executor.submit(slow, 1) for _ in range(16)]
+        started.wait()
+        futures.append(executor.submit(slow, 2))
+    results = [future.result() for future in futures]
+
+    assert calls == [1, 2]
+    assert results == [[1]] * 16 + [[2]]
+    # Waiters receive their own copy of the result
+    assert len({id(result) for result in results}) == len(results)
+    assert jwm._cache.ttl.wrapper._flights == {}
+
+
+def test_ttl_cache_single_flight_exception() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    def failing(x: int) -> int:
+        calls.append(x)
+        time.sleep(0.1)
+        raise ValueError("failed")
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        futures = [executor.submit(failing, 1) for _ in range(8)]
+
+    assert all(isinstance(future.exception(), ValueError) for future in futures)
+    assert len(calls) < 8
+    assert jwm._cache.ttl.wrapper._flights == {}
+
+    # A failed flight is not cached
+    with pytest.raises(ValueError):
+        failing(1)
+
+
+def test_ttl_cache_single_flight_reentrant() -> None:
+    depth = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    def reentrant(x: int) -> int:
+        depth.append(x)
+        if len(depth) == 1:
+            # Same key on the leading thread must not wait on itself
+            return reentrant(x) + 1
+        return x
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        assert executor.submit(reentrant, 1).result(timeout=5) == 2
+
+
+async def test_async_ttl_cache_single_flight() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    async def slow(x: int) -> list[int]:
+        calls.append(x)
+        await asyncio.sleep(0.1)
+        return [x]
+
+    results = await asyncio.gather(*(slow(1) for _ in range(16)), slow(2))
+
+    assert calls == [1, 2]
+    assert results == [[1]] * 16 + [[2]]
+    assert len({id(result) for result in results}) == len(results)
+    assert jwm._cache.ttl.wrapper._async_flights[asyncio.get_running_loop()] == {}
+
+
+async def test_async_ttl_cache_single_flight_cancel_waiter() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    async def slow(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.1)
+        return x
+
+    first = asyncio.ensure_future(slow(1))
+    second = asyncio.ensure_future(slow(1))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == 1
+    assert first.cancelled()
+    assert calls == [1]
+    assert (await slow.cache_info()).current_size == 1
+
+
+async def test_async_ttl_cache_single_flight_cancel_all() -> None:
+    calls = []
+    finished = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    async def slow(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.1)
+        finished.append(x)
+        return x
+
+    waiters = [asyncio.ensure_future(slow(1)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+
+    # Nobody waits so the computation is cancelled, a new call starts over
+    assert await slow(1) == 1
+    assert calls == [1, 1]
+    assert finished == [1]
+
+
+async def test_async_ttl_cache_single_flight_exception() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    async def failing(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        *(failing(1) for _ in range(4)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == [1]
+
+
+async def test_async_ttl_cache_single_flight_reentrant() -> None:
+    depth = []
+
+    @jwm._cache.ttl.decorator.ttl_cache
+    async def reentrant(x: int) -> int:
+        depth.append(x)
+        if len(depth) == 1:
+            return await reentrant(x) + 1
+        return x
+
+    assert await asyncio.wait_for(reentrant(1), 5) == 2
+
+
+@pytest.mark.parametrize("stale_ttl_seconds", (-1, -0.5))
+def test_ttl_cache_stale_ttl_invalid(stale_ttl_seconds: float) -> None:
+    with pytest.raises(ValueError):
+        jwm._cache.ttl.decorator.ttl_cache(stale_ttl_seconds=stale_ttl_seconds)
+
+
+def test_ttl_cache_stale_while_revalidate() -> None:
+    calls = []
+    refreshed = threading.Event()
+
+    @jwm._cache.ttl.decorator.ttl_cache(ttl_seconds=0.1, stale_ttl_seconds=0.5)
+    def slow(x: int) -> int:
+        calls.append(x)
+        if len(calls) > 1:
+            time.sleep(0.1)
+            refreshed.set()
+        return len(calls)
+
+    assert slow(1) == 1
+    time.sleep(0.15)
+
+    # Stale values are returned immediately while one refresh runs
+    start = time.monotonic()
+    assert [slow(1) for _ in range(8)] == [1] * 8
+    assert time.monotonic() - start < 0.1
+    assert refreshed.wait(5)
+    time.sleep(0.05)
+
+    assert slow(1) == 2
+    assert calls == [1, 1]
+    assert slow.cache_parameters().stale_ttl_seconds == 0.5
+
+    # Values expire once stale for longer than stale_ttl_seconds
+    time.sleep(0.7)
+    assert slow(1) == 3
+
+
+def test_ttl_cache_stale_while_revalidate_exception() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(ttl_seconds=0.05, stale_ttl_seconds=5)
+    def flaky(x: int) -> int:
+        calls.append(x)
+        if len(calls) > 1:
+            raise ValueError("failed")
+        return x
+
+    assert flaky(1) == 1
+    time.sleep(0.1)
+
+    # Failed refreshes keep serving the stale value
+    assert flaky(1) == 1
+    time.sleep(0.1)
+    assert flaky(1) == 1
+    time.sleep(0.1)
+    assert len(calls) == 3
+
+
+async def test_async_ttl_cache_stale_while_revalidate() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(
+        ttl_seconds=0.1, stale_ttl_seconds=0.5, cache="async_local"
+    )
+    async def slow(x: int) -> int:
+        calls.append(x)
+        if len(calls) > 1:
+            await asyncio.sleep(0.1)
+        return len(calls)
+
+    assert await slow(1) == 1
+    await asyncio.sleep(0.15)
+
+    start = time.monotonic()
+    assert await asyncio.gather(*(slow(1) for _ in range(8))) == [1] * 8
+    assert time.monotonic() - start < 0.1
+    await asyncio.sleep(0.15)
+
+    assert await slow(1) == 2
+    assert calls == [1, 1]
+
+    await asyncio.sleep(0.7)
+    assert await slow(1) == 3
+
+
+@pytest.mark.parametrize("early_refresh_beta", (0, -1))
+def test_ttl_cache_early_refresh_beta_invalid(early_refresh_beta: float) -> None:
+    with pytest.raises(ValueError):
+        jwm._cache.ttl.decorator.ttl_cache(early_refresh_beta=early_refresh_beta)
+
+
+def test_ttl_cache_early_refresh() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(ttl_seconds=1, early_refresh_beta=1)
+    def slow(x: int) -> int:
+        calls.append(x)
+        time.sleep(0.05)
+        return len(calls)
+
+    assert slow(1) == 1
+    assert slow(1) == 1
+
+    # A sample near 1 outweighs the time left, the caller recomputes
+    with unittest.mock.patch("random.random", return_value=1 - 1e-12):
+        assert slow(1) == 2
+    assert slow(1) == 2
+    assert calls == [1, 1]
+    assert slow.cache_parameters().early_refresh_beta == 1
+
+
+def test_ttl_cache_early_refresh_stale_while_revalidate() -> None:
+    calls = []
+    refreshed = threading.Event()
+
+    @jwm._cache.ttl.decorator.ttl_cache(
+        ttl_seconds=1, stale_ttl_seconds=60, early_refresh_beta=1
+    )
+    def slow(x: int) -> int:
+        calls.append(x)
+        time.sleep(0.05)
+        if len(calls) > 1:
+            refreshed.set()
+        return len(calls)
+
+    assert slow(1) == 1
+
+    # Early refreshes run in the background when stale values are kept
+    with unittest.mock.patch("random.random", return_value=1 - 1e-12):
+        assert slow(1) == 1
+    assert refreshed.wait(5)
+    time.sleep(0.05)
+    assert slow(1) == 2
+
+
+async def test_async_ttl_cache_early_refresh() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(ttl_seconds=1, early_refresh_beta=1)
+    async def slow(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    assert await slow(1) == 1
+    assert await slow(1) == 1
+    with unittest.mock.patch("random.random", return_value=1 - 1e-12):
+        assert await slow(1) == 2
+    assert await slow(1) == 2
+    assert calls == [1, 1]
+
+
+def test_ttl_cache_identity_serializer() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(serializer="identity")
+    def build(x: int) -> list[int] | None:
+        calls.append(x)
+        return [x] if x else None
+
+    first = build(1)
+    assert build(1) is first
+    assert build(0) is None
+    assert build(0) is None
+    assert calls == [1, 0]
+    assert isinstance(
+        build.cache_parameters().serializer, jwm._cache.serializers.IdentitySerializer
+    )
+
+
+async def test_async_ttl_cache_identity_serializer() -> None:
+    @jwm._cache.ttl.decorator.ttl_cache(serializer="identity", cache="async_local")
+    async def build(x: int) -> list[int]:
+        return [x]
+
+    assert await build(1) is await build(1)
+    assert (await build.cache_info()).hits == 1
+
+
+def test_ttl_cache_identity_serializer_dump(tmp_path: pathlib.Path) -> None:
+    cache = jwm._cache.ttl.local.LocalTTLCache()
+    cache.set(b"test_namespace", b"a", b"1")
+
+    @jwm._cache.ttl.decorator.ttl_cache(cache=cache, serializer="identity")
+    def build(x: int) -> list[int]:
+        return [x]
+
+    build(1)
+
+    # Only the bytes entry is written
+    assert cache.dump(tmp_path / "snapshot") == 1
+    assert [path.name for path in tmp_path.iterdir()] == ["snapshot"]
+    loaded = jwm._cache.ttl.local.LocalTTLCache()
+    assert loaded.load(tmp_path / "snapshot") == 1
+    assert loaded.get(b"test_namespace", b"a") == b"1"
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    (
+        {"cache": jwm._cache.ttl.local.LocalTTLCache(), "stale_ttl_seconds": 1},
+        {"early_refresh_beta": 1},
+        {"cache": unittest.mock.Mock()},
+    ),
+)
+def test_ttl_cache_identity_serializer_invalid(kwargs: dict) -> None:
+    with pytest.raises(ValueError):
+        jwm._cache.ttl.decorator.ttl_cache(serializer="identity", **kwargs)
+
+
+def test_ttl_cache_cache_exceptions() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(
+        ttl_seconds=60, cache_exceptions=(TimeoutError,), exception_ttl_seconds=0.1
+    )
+    def fetch(x: int) -> int:
+        calls.append(x)
+        if len(calls) == 1:
+            raise TimeoutError("down")
+        return x
+
+    for _ in range(3):
+        with pytest.raises(TimeoutError, match="down"):
+            fetch(1)
+    assert calls == [1]
+    assert fetch.cache_info().hits == 2
+
+    # Exceptions expire on their own time to live
+    time.sleep(0.15)
+    assert fetch(1) == 1
+    assert fetch(1) == 1
+    assert calls == [1, 1]
+
+
+def test_ttl_cache_cache_exceptions_uncached() -> None:
+    calls = []
+
+    class Unpicklable(Exception):
+        def __reduce__(self) -> typing.Any:
+            raise TypeError("cannot pickle")
+
+    @jwm._cache.ttl.decorator.ttl_cache(cache_exceptions=(KeyError, Unpicklable))
+    def fetch(x: int) -> int:
+        calls.append(x)
+        raise (ValueError if x else Unpicklable)("failed")
+
+    # Only matching exceptions that can be pickled are cached
+    for x in (1, 1, 0, 0):
+        with pytest.raises((ValueError, Unpicklable)):
+            fetch(x)
+    assert calls == [1, 1, 0, 0]
+
+
+async def test_async_ttl_cache_cache_exceptions() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(
+        cache="async_local", cache_exceptions=(TimeoutError,)
+    )
+    async def fetch(x: int) -> int:
+        calls.append(x)
+        raise TimeoutError("down")
+
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            await fetch(1)
+    assert calls == [1]
+
+
+def test_ttl_cache_none_ttl() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(ttl_seconds=60, none_ttl_seconds=0.1)
+    def find(x: int) -> int | None:
+        calls.append(x)
+        return x or None
+
+    assert [find(x) for x in (0, 0, 1, 1)] == [None, None, 1, 1]
+    assert calls == [0, 1]
+
+    time.sleep(0.15)
+    assert [find(x) for x in (0, 1)] == [None, 1]
+    assert calls == [0, 1, 0]
+
+
+def test_ttl_cache_zero_ttl_stale_while_revalidate() -> None:
+    calls = []
+
+    @jwm._cache.ttl.decorator.ttl_cache(
+        ttl_seconds=60,
+        stale_ttl_seconds=5,
+        none_ttl_seconds=0,
+        cache_exceptions=(TimeoutError,),
+        exception_ttl_seconds=0,
+    )
+    def find(x: int) -> int | None:
+        calls.append(x)
+        if x:
+            raise TimeoutError("down")
+        return None
+
+    # A time to live of 0 is not extended by the stale window
+    for x in (0, 0, 1, 1):
+        with contextlib.suppress(TimeoutError):
+            find(x)
+    assert calls == [0, 0, 1, 1]
+    info = find.cache_info()
+    assert (info.hits, info.current_size) == (0, 0)
+
+
+@pytest.mark.parametrize(
+    "kwargs, error",
+    (
+        ({"cache_exceptions": (1,)}, TypeError),
+        ({"cache_exceptions": (int,)}, TypeError),
+        ({"exception_ttl_seconds": -1}, ValueError),
+        ({"none_ttl_seconds": -1}, ValueError),
+        ({"cache_exceptions": (KeyError,), "serializer": "identity"}, ValueError),
+    ),
+)
+def test_ttl_cache_cache_exceptions_invalid(
+    kwargs: dict, error: type[Exception]
+) -> None:
+    with pytest.raises(error):
+        jwm._cache.ttl.decorator.ttl_cache(**kwargs)
@@ -0,0 +1,150 @@
+import collections.abc
+import os
+import pathlib
+import time
+
+import pytest
+
+import jwm.cache
+
+
+@pytest.fixture
+def disk_ttl_cache(tmp_path: pathlib.Path) -> jwm.cache.DiskTTLCache:
+    return jwm.cache.DiskTTLCache(
+        tmp_path, segment_bytes=1_024, compact_interval_seconds=60
+    )
+
+
+def _segment_count(disk_ttl_cache: jwm.cache.DiskTTLCache) -> int:
+    return len(os.listdir(disk_ttl_cache.directory))
+
+
+@pytest.mark.parametrize(
+    "namespaces, keyss, valuess",
+    (
+        (
+            (b"test_namespace_a", b"test_namespace_b"),
+            ((b"a", b"b", b"c"), (b"d", b"e", b"f")),
+            ((b"1", b"2", b"3"), (b"4", b"5", b"6")),
+        ),
+        (
+            (b"test_namespace_2", b"test_namespace_1"),
+            ((b"fa", b"eb", b"dc"), (b"cd", b"be", b"af")),
+            ((b"61", b"52", b"43"), (b"34", b"25", b"16")),
+        ),
+    ),
+)
+def test_disk_multiple_namespaces(
+    namespaces: collections.abc.Sequence[bytes],
+    keyss: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    valuess: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    disk_ttl_cache: jwm.cache.DiskTTLCache,
+) -> None:
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            disk_ttl_cache.set(namespace, key, value)
+
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            assert disk_ttl_cache.get(namespace, key) == value
+        assert disk_ttl_cache.get_size(namespace) == len(keys)
+
+    disk_ttl_cache.clear(namespaces[0])
+    assert disk_ttl_cache.get_size(namespaces[0]) == 0
+    assert disk_ttl_cache.get_size(namespaces[1]) == len(keyss[1])
+
+
+def test_disk_returns_read_only_views(disk_ttl_cache: jwm.cache.DiskTTLCache) -> None:
+    disk_ttl_cache.set(b"test_namespace", b"a", b"1" * 100)
+
+    value = disk_ttl_cache.get(b"test_namespace", b"a")
+
+    assert isinstance(value, memoryview)
+    assert value.readonly
+    assert value == b"1" * 100
+
+
+@pytest.mark.parametrize("ttl_seconds", (0.1, 0))
+def test_disk_expire(
+    ttl_seconds: float, disk_ttl_cache: jwm.cache.DiskTTLCache
+) -> None:
+    disk_ttl_cache.set(b"test_namespace", b"a", b"1", ttl_seconds=ttl_seconds)
+
+    time.sleep(ttl_seconds + 0.1)
+    assert disk_ttl_cache.get(b"test_namespace", b"a") is None
+    assert disk_ttl_cache.get_size(b"test_namespace") == 0
+    # Emptied namespaces are dropped from the index
+    assert b"test_namespace" not in disk_ttl_cache._index
+
+
+def test_disk_large_value(disk_ttl_cache: jwm.cache.DiskTTLCache) -> None:
+    disk_ttl_cache.set(b"test_namespace", b"a", b"1" * 10_000)
+    disk_ttl_cache.set(b"test_namespace", b"b", b"2")
+
+    assert disk_ttl_cache.get(b"test_namespace", b"a") == b"1" * 10_000
+    assert disk_ttl_cache.get(b"test_namespace", b"b") == b"2"
+    assert disk_ttl_cache.get_bytes(b"test_namespace") == 10_001
+
+
+def test_disk_compaction(disk_ttl_cache: jwm.cache.DiskTTLCache) -> None:
+    for _ in range(10):
+        for key in (b"a", b"b", b"c"):
+            disk_ttl_cache.set(b"test_namespace", key, key * 300)
+    held = disk_ttl_cache.get(b"test_namespace", b"a")
+    assert _segment_count(disk_ttl_cache) == 10
+
+    disk_ttl_cache._compact_once()
+
+    assert _segment_count(disk_ttl_cache) <= 2
+    for key in (b"a", b"b", b"c"):
+        assert disk_ttl_cache.get(b"test_namespace", key) == key * 300
+    # Views of compacted segments remain readable
+    assert held == b"a" * 300
+
+
+def test_disk_compaction_drops_expired(
+    disk_ttl_cache: jwm.cache.DiskTTLCache,
+) -> None:
+    for index in range(10):
+        disk_ttl_cache.set(
+            b"test_namespace", str(index).encode(), b"1" * 500, ttl_seconds=0.1
+        )
+
+    time.sleep(0.2)
+    disk_ttl_cache._compact_once()
+
+    assert _segment_count(disk_ttl_cache) == 1
+
+
+def test_disk_max_bytes(tmp_path: pathlib.Path) -> None:
+    disk_ttl_cache = jwm.cache.DiskTTLCache(
+        tmp_path, segment_bytes=1_024, max_bytes=4_096
+    )
+
+    for index in range(20):
+        disk_ttl_cache.set(b"test_namespace", str(index).encode(), b"1" * 500)
+
+    assert disk_ttl_cache.get(b"test_namespace", b"0") is None
+    assert disk_ttl_cache.get(b"test_namespace", b"19") == b"1" * 500
+    assert disk_ttl_cache.get_evictions(b"test_namespace") > 0
+    assert _segment_count(disk_ttl_cache) * 1_024 <= 4_096 + 1_024
+
+
+def test_disk_removes_stale_segments(tmp_path: pathlib.Path) -> None:
+    jwm.cache.DiskTTLCache(tmp_path).set(b"test_namespace", b"a", b"1")
+    (tmp_path / "00000005.segment").write_bytes(b"1")
+
+    disk_ttl_cache = jwm.cache.DiskTTLCache(tmp_path)
+
+    assert disk_ttl_cache.get(b"test_namespace", b"a") is None
+    assert _segment_count(disk_ttl_cache) == 0
+
+
+def test_disk_with_json_serializer(tmp_path: pathlib.Path) -> None:
+    @jwm.cache.ttl_cache(cache=jwm.cache.DiskTTLCache(tmp_path), serializer="json")
+    def double(value: int) -> list[int]:
+        return [value, value]
+
+    assert double(1) == [1, 1]
+    assert double(1) == [1, 1]
+    assert double.cache_info().hits == 1
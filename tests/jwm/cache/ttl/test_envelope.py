@@ -0,0 +1,65 @@
+import pickle
+import time
+import unittest.mock
+
+import pytest
+
+import jwm._cache.ttl.envelope
+
+
+@pytest.mark.parametrize("serialized", (b"", b"value", bytes(range(256))))
+def test_envelope_round_trip(serialized: bytes) -> None:
+    stored = jwm._cache.ttl.envelope.pack(serialized, 60, 0.5)
+
+    assert jwm._cache.ttl.envelope.unpack(stored) == (serialized, False)
+    assert jwm._cache.ttl.envelope.unpack(memoryview(stored))[0] == serialized
+
+
+def test_envelope_stale() -> None:
+    stored = jwm._cache.ttl.envelope.pack(b"value", 0.05)
+    assert not jwm._cache.ttl.envelope.unpack(stored)[1]
+
+    time.sleep(0.1)
+    assert jwm._cache.ttl.envelope.unpack(stored)[1]
+
+
+@pytest.mark.parametrize(
+    "sample, delta_seconds, expected_stale",
+    (
+        # -log(1 - sample) * delta_seconds against 10 seconds left
+        (0.0, 100, False),
+        (0.5, 1, False),
+        (0.5, 100, True),
+        (1 - 1e-9, 0.1, False),
+        (1 - 1e-9, 1, True),
+    ),
+)
+def test_envelope_early_refresh(
+    sample: float, delta_seconds: float, expected_stale: bool
+) -> None:
+    stored = jwm._cache.ttl.envelope.pack(b"value", 10, delta_seconds)
+
+    with unittest.mock.patch("random.random", return_value=sample):
+        assert jwm._cache.ttl.envelope.unpack(stored, beta=1)[1] == expected_stale
+        # Without a beta only expiry counts
+        assert not jwm._cache.ttl.envelope.unpack(stored)[1]
+
+
+def test_envelope_early_refresh_rises_towards_expiry() -> None:
+    def early_refreshes(fresh_seconds: float) -> int:
+        stored = jwm._cache.ttl.envelope.pack(b"value", fresh_seconds, 1)
+        return sum(
+            jwm._cache.ttl.envelope.unpack(stored, beta=1)[1] for _ in range(2_000)
+        )
+
+    assert early_refreshes(20) < early_refreshes(2) < early_refreshes(0.5)
+
+
+def test_envelope_outcome() -> None:
+    stored = jwm._cache.ttl.envelope.pack_value(b"\x01value")
+    assert jwm._cache.ttl.envelope.unpack_outcome(stored) == (b"\x01value", False)
+
+    stored = jwm._cache.ttl.envelope.pack_exception(KeyError("missing"))
+    pickled, is_exception = jwm._cache.ttl.envelope.unpack_outcome(memoryview(stored))
+    assert is_exception
+    assert pickle.loads(pickled).args == ("missing",)
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+import jwm._cache.ttl.invalidation
+import jwm.cache
+
+
+def _wait_for(condition: object, timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+async def _async_wait_for(condition: object, timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await condition():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+@pytest.mark.parametrize(
+    "namespace, key", ((b"test_namespace", b"a"), (b"test_namespace", None))
+)
+def test_invalidation_message(namespace: bytes, key: bytes | None) -> None:
+    origin = b"0" * 16
+    message = jwm._cache.ttl.invalidation._encode(origin, namespace, key)
+
+    assert jwm._cache.ttl.invalidation._decode(message) == (origin, namespace, key)
+
+
+def test_sync_invalidation_bus() -> None:
+    server = fakeredis.FakeServer()
+    node_a = jwm.cache.RedisInvalidationBus(fakeredis.FakeRedis(server=server))
+    node_b = jwm.cache.RedisInvalidationBus(fakeredis.FakeRedis(server=server))
+    received_a: list[tuple[bytes, bytes | None]] = []
+    received_b: list[tuple[bytes, bytes | None]] = []
+    node_a.subscribe(lambda namespace, key: received_a.append((namespace, key)))
+    node_b.subscribe(lambda namespace, key: received_b.append((namespace, key)))
+
+    node_a.publish(b"test_namespace", b"a")
+    node_a.publish(b"test_namespace")
+
+    assert _wait_for(lambda: len(received_b) == 2)
+    assert received_b == [(b"test_namespace", b"a"), (b"test_namespace", None)]
+    # Publishers do not receive their own invalidations
+    assert received_a == []
+
+    node_a.close()
+    node_b.close()
+
+
+def test_sync_invalidation_bus_survives_errors(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    server = fakeredis.FakeServer()
+    publisher = fakeredis.FakeRedis(server=server)
+    node_a = jwm.cache.RedisInvalidationBus(publisher)
+    node_b = jwm.cache.RedisInvalidationBus(fakeredis.FakeRedis(server=server))
+    received: list[tuple[bytes, bytes | None]] = []
+
+    def failing(namespace: bytes, key: bytes | None) -> None:
+        raise RuntimeError("subscriber failed")
+
+    node_b.subscribe(failing)
+    node_b.subscribe(lambda namespace, key: received.append((namespace, key)))
+
+    publisher.publish(node_b.channel, b"garbage")
+    node_a.publish(b"test_namespace", b"a")
+    node_a.publish(b"test_namespace", b"b")
+
+    assert _wait_for(lambda: len(received) == 2)
+    assert received == [(b"test_namespace", b"a"), (b"test_namespace", b"b")]
+    assert "malformed" in caplog.text
+    assert "subscriber failed" in caplog.text
+
+    node_a.close()
+    node_b.close()
+
+
+async def test_async_invalidation_bus_survives_errors() -> None:
+    server = fakeredis.FakeServer()
+    publisher = fakeredis.FakeAsyncRedis(server=server)
+    node_a = jwm.cache.AsyncRedisInvalidationBus(publisher)
+    node_b = jwm.cache.AsyncRedisInvalidationBus(
+        fakeredis.FakeAsyncRedis(server=server)
+    )
+    received: list[tuple[bytes, bytes | None]] = []
+
+    async def failing(namespace: bytes, key: bytes | None) -> None:
+        raise RuntimeError("subscriber failed")
+
+    await node_b.subscribe(failing)
+    await node_b.subscribe(lambda namespace, key: received.append((namespace, key)))
+
+    await publisher.publish(node_b.channel, b"garbage")
+    await node_a.publish(b"test_namespace", b"a")
+    await node_a.publish(b"test_namespace", b"b")
+
+    async def received_both() -> bool:
+        return len(received) == 2
+
+    assert await _async_wait_for(received_both)
+    assert received == [(b"test_namespace", b"a"), (b"test_namespace", b"b")]
+
+    await node_a.close()
+    await node_b.close()
+
+
+def test_sync_tiered_invalidation() -> None:
+    server = fakeredis.FakeServer()
+    nodes = [
+        jwm.cache.TieredTTLCache(
+            (
+                jwm.cache.LocalTTLCache(),
+                jwm.cache.RedisTTLCache(fakeredis.FakeRedis(server=server)),
+            ),
+            promote_ttl_seconds=600,
+            invalidation_bus=jwm.cache.RedisInvalidationBus(
+                fakeredis.FakeRedis(server=server)
+            ),
+        )
+        for _ in range(2)
+    ]
+    node_a, node_b = nodes
+    local_b = node_b.tiers[0]
+
+    node_a.set(b"test_namespace", b"a", b"1")
+    assert node_b.get(b"test_namespace", b"a") == b"1"
+    assert local_b.get(b"test_namespace", b"a") == b"1"
+
+    node_a.set(b"test_namespace", b"a", b"2")
+    assert _wait_for(lambda: local_b.get(b"test_namespace", b"a") is None)
+    assert node_b.get(b"test_namespace", b"a") == b"2"
+    assert node_a.tiers[0].get(b"test_namespace", b"a") == b"2"
+
+    node_a.clear(b"test_namespace")
+    assert _wait_for(lambda: local_b.get_size(b"test_namespace") == 0)
+    assert node_b.get(b"test_namespace", b"a") is None
+
+    for node in nodes:
+        node.invalidation_bus.close()
+
+
+async def test_async_tiered_invalidation() -> None:
+    server = fakeredis.FakeServer()
+    nodes = [
+        jwm.cache.AsyncTieredTTLCache(
+            (
+                jwm.cache.AsyncLocalTTLCache(),
+                jwm.cache.AsyncRedisTTLCache(fakeredis.FakeAsyncRedis(server=server)),
+            ),
+            promote_ttl_seconds=600,
+            invalidation_bus=jwm.cache.AsyncRedisInvalidationBus(
+                fakeredis.FakeAsyncRedis(server=server)
+            ),
+        )
+        for _ in range(2)
+    ]
+    node_a, node_b = nodes
+    local_b = node_b.tiers[0]
+
+    await node_a.set(b"test_namespace", b"a", b"1")
+    assert await node_b.get(b"test_namespace", b"a") == b"1"
+    assert await local_b.get(b"test_namespace", b"a") == b"1"
+
+    async def local_b_missing() -> bool:
+        return await local_b.get(b"test_namespace", b"a") is None
+
+    await node_a.set(b"test_namespace", b"a", b"2")
+    assert await _async_wait_for(local_b_missing)
+    assert await node_b.get(b"test_namespace", b"a") == b"2"
+    assert await node_a.tiers[0].get(b"test_namespace", b"a") == b"2"
+
+    async def local_b_empty() -> bool:
+        return await local_b.get_size(b"test_namespace") == 0
+
+    await node_a.clear(b"test_namespace")
+    assert await _async_wait_for(local_b_empty)
+
+    for node in nodes:
+        await node.invalidation_bus.close()
@@ -1,9 +1,12 @@
 import asyncio
 import collections.abc
+import pathlib
+import threading
 import time
 
 import pytest
 
+import jwm._cache.ttl.local
 import jwm.cache
 
 
@@ -217,3 +220,347 @@ async def test_async_local_expire(
 
     await asyncio.sleep(ttl_seconds + 0.1)
     assert await local_.get(namespace, key) == None
+
+
+def test_local_single_reaper_thread() -> None:
+    local_ = jwm.cache.LocalTTLCache()
+
+    local_.set(b"test_namespace", b"warmup", b"0")
+    thread_count = threading.active_count()
+
+    for index in range(1_000):
+        local_.set(b"test_namespace", str(index).encode(), b"1")
+
+    assert threading.active_count() == thread_count
+
+
+def test_local_reaper_expire() -> None:
+    local_ = jwm.cache.LocalTTLCache()
+
+    local_.set(b"test_namespace", b"a", b"1", ttl_seconds=0.1)
+    local_.set(b"test_namespace", b"b", b"2", ttl_seconds=60)
+    assert local_.get_size(b"test_namespace") == 2
+
+    # Entry is removed by the reaper without being read
+    time.sleep(0.3)
+    assert local_.get_size(b"test_namespace") == 1
+    assert local_.get(b"test_namespace", b"b") == b"2"
+
+
+def test_local_overwrite_extends_ttl() -> None:
+    local_ = jwm.cache.LocalTTLCache()
+
+    local_.set(b"test_namespace", b"a", b"1", ttl_seconds=0.1)
+    local_.set(b"test_namespace", b"a", b"2", ttl_seconds=60)
+
+    time.sleep(0.2)
+    assert local_.get(b"test_namespace", b"a") == b"2"
+
+
+async def test_async_local_single_sweep_task() -> None:
+    local_ = jwm.cache.AsyncLocalTTLCache()
+
+    await local_.set(b"test_namespace", b"warmup", b"0")
+    task_count = len(asyncio.all_tasks())
+
+    for index in range(1_000):
+        await local_.set(b"test_namespace", str(index).encode(), b"1")
+
+    assert len(asyncio.all_tasks()) == task_count
+
+
+async def test_async_local_sweep_expire() -> None:
+    local_ = jwm.cache.AsyncLocalTTLCache(sweep_interval_seconds=0.05)
+
+    await local_.set(b"test_namespace", b"a", b"1", ttl_seconds=0.1)
+    await local_.set(b"test_namespace", b"b", b"2", ttl_seconds=60)
+
+    # Entry is removed by the sweep without being read
+    await asyncio.sleep(0.3)
+    assert local_._store.size(b"test_namespace") == 1
+    assert await local_.get(b"test_namespace", b"b") == b"2"
+
+
+def test_local_maxsize_evicts_least_recently_used() -> None:
+    local_ = jwm.cache.LocalTTLCache(maxsize=2)
+
+    local_.set(b"test_namespace_a", b"a", b"1")
+    local_.set(b"test_namespace_b", b"b", b"2")
+    assert local_.get(b"test_namespace_a", b"a") == b"1"
+    local_.set(b"test_namespace_a", b"c", b"3")
+
+    assert local_.get(b"test_namespace_a", b"a") == b"1"
+    assert local_.get(b"test_namespace_b", b"b") is None
+    assert local_.get(b"test_namespace_a", b"c") == b"3"
+    assert local_.get_evictions(b"test_namespace_b") == 1
+    assert local_.get_evictions(b"test_namespace_a") == 0
+
+
+def test_local_namespace_maxsize() -> None:
+    local_ = jwm.cache.LocalTTLCache()
+    local_.set_maxsize(b"test_namespace_a", 2)
+
+    for key in (b"a", b"b", b"c"):
+        local_.set(b"test_namespace_a", key, b"1")
+        local_.set(b"test_namespace_b", key, b"1")
+
+    assert local_.get_size(b"test_namespace_a") == 2
+    assert local_.get(b"test_namespace_a", b"a") is None
+    assert local_.get_evictions(b"test_namespace_a") == 1
+    assert local_.get_size(b"test_namespace_b") == 3
+
+    local_.clear(b"test_namespace_a")
+    assert local_.get_evictions(b"test_namespace_a") == 0
+
+
+async def test_async_local_maxsize_evicts_least_recently_used() -> None:
+    local_ = jwm.cache.AsyncLocalTTLCache(maxsize=2)
+
+    await local_.set(b"test_namespace", b"a", b"1")
+    await local_.set(b"test_namespace", b"b", b"2")
+    assert await local_.get(b"test_namespace", b"a") == b"1"
+    await local_.set(b"test_namespace", b"c", b"3")
+
+    assert await local_.get(b"test_namespace", b"b") is None
+    assert await local_.get_size(b"test_namespace") == 2
+    assert await local_.get_evictions(b"test_namespace") == 1
+
+
+@pytest.mark.parametrize("maxsize", (-1, -10))
+def test_local_maxsize_negative(maxsize: int) -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.LocalTTLCache(maxsize=maxsize)
+
+
+def test_local_max_bytes() -> None:
+    entry_size = 1 + 100 + jwm._cache.ttl.local.ENTRY_OVERHEAD_BYTES
+    local_ = jwm.cache.LocalTTLCache(max_bytes=2 * entry_size)
+
+    local_.set(b"test_namespace", b"a", b"1" * 100)
+    local_.set(b"test_namespace", b"b", b"2" * 100)
+    assert local_.get_bytes(b"test_namespace") == 2 * entry_size
+
+    local_.set(b"test_namespace", b"c", b"3" * 100)
+    assert local_.get(b"test_namespace", b"a") is None
+    assert local_.get_bytes(b"test_namespace") == 2 * entry_size
+    assert local_.get_evictions(b"test_namespace") == 1
+
+    # Values larger than the budget are never stored
+    local_.set(b"test_namespace", b"b", b"4" * 2 * entry_size)
+    assert local_.get(b"test_namespace", b"b") is None
+    assert local_.get(b"test_namespace", b"c") == b"3" * 100
+
+    local_.clear(b"test_namespace")
+    assert local_.get_bytes(b"test_namespace") == 0
+
+
+async def test_async_local_max_bytes() -> None:
+    entry_size = 1 + 100 + jwm._cache.ttl.local.ENTRY_OVERHEAD_BYTES
+    local_ = jwm.cache.AsyncLocalTTLCache(max_bytes=entry_size)
+
+    await local_.set(b"test_namespace", b"a", b"1" * 100)
+    await local_.set(b"test_namespace", b"b", b"2" * 100)
+
+    assert await local_.get(b"test_namespace", b"a") is None
+    assert await local_.get_bytes(b"test_namespace") == entry_size
+
+
+def test_local_shards() -> None:
+    local_ = jwm.cache.LocalTTLCache(shards=8)
+    keys = [str(index).encode() for index in range(256)]
+
+    def write(namespace: bytes) -> None:
+        for key in keys:
+            local_.set(namespace, key, key)
+
+    threads = [
+        threading.Thread(target=write, args=(b"test_namespace_%d" % index,))
+        for index in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(store.entries > 0 for store, _ in local_._shards)
+    for index in range(8):
+        namespace = b"test_namespace_%d" % index
+        assert local_.get_size(namespace) == len(keys)
+        assert all(local_.get(namespace, key) == key for key in keys)
+
+    local_.clear(b"test_namespace_0")
+    assert local_.get_size(b"test_namespace_0") == 0
+
+
+def test_local_shards_split_maxsize() -> None:
+    local_ = jwm.cache.LocalTTLCache(maxsize=64, shards=4)
+
+    for index in range(1_000):
+        local_.set(b"test_namespace", str(index).encode(), b"1")
+
+    assert local_.get_size(b"test_namespace") <= 64
+    assert local_.get_evictions(b"test_namespace") >= 1_000 - 64
+
+
+@pytest.mark.parametrize("shards", (0, -1))
+def test_local_shards_invalid(shards: int) -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.LocalTTLCache(shards=shards)
+
+
+@pytest.mark.parametrize("dump_shards, load_shards", ((1, 1), (4, 1), (1, 3)))
+def test_local_dump_load(
+    dump_shards: int, load_shards: int, tmp_path: pathlib.Path
+) -> None:
+    local_ = jwm.cache.LocalTTLCache(shards=dump_shards)
+    for index in range(100):
+        local_.set(b"test_namespace", str(index).encode(), b"1" * index)
+    local_.set(b"test_namespace_2", b"a", b"")
+
+    assert local_.dump(tmp_path / "snapshot") == 101
+
+    loaded = jwm.cache.LocalTTLCache(shards=load_shards)
+    assert loaded.load(tmp_path / "snapshot") == 101
+    for index in range(100):
+        assert loaded.get(b"test_namespace", str(index).encode()) == b"1" * index
+    assert loaded.get(b"test_namespace_2", b"a") == b""
+    assert loaded.get_size(b"test_namespace") == 100
+    assert loaded.get_bytes(b"test_namespace") == local_.get_bytes(b"test_namespace")
+
+
+def test_local_dump_removes_temporary_file(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    local_ = jwm.cache.LocalTTLCache()
+    local_.set(b"test_namespace", b"a", b"1")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(jwm._cache.ttl.local, "_write_snapshot_block", fail)
+    with pytest.raises(OSError, match="disk full"):
+        local_.dump(tmp_path / "snapshot")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_local_load_keeps_remaining_ttl(tmp_path: pathlib.Path) -> None:
+    local_ = jwm.cache.LocalTTLCache()
+    local_.set(b"test_namespace", b"short", b"1", ttl_seconds=0.2)
+    local_.set(b"test_namespace", b"long", b"2")
+    local_.dump(tmp_path / "snapshot")
+
+    time.sleep(0.1)
+    loaded = jwm.cache.LocalTTLCache()
+    assert loaded.load(tmp_path / "snapshot") == 2
+    assert loaded.get(b"test_namespace", b"short") == b"1"
+
+    time.sleep(0.15)
+    assert loaded.get(b"test_namespace", b"short") is None
+    assert loaded.get(b"test_namespace", b"long") == b"2"
+
+
+def test_local_load_drops_expired(tmp_path: pathlib.Path) -> None:
+    local_ = jwm.cache.LocalTTLCache()
+    local_.set(b"test_namespace", b"short", b"1", ttl_seconds=0.1)
+    local_.set(b"test_namespace", b"long", b"2")
+    local_.dump(tmp_path / "snapshot")
+
+    time.sleep(0.15)
+    loaded = jwm.cache.LocalTTLCache()
+    assert loaded.load(tmp_path / "snapshot") == 1
+    assert loaded.get_size(b"test_namespace") == 1
+
+
+def test_local_load_overwrites_and_limits(tmp_path: pathlib.Path) -> None:
+    local_ = jwm.cache.LocalTTLCache()
+    for index in range(10):
+        local_.set(b"test_namespace", str(index).encode(), b"snapshot")
+    local_.dump(tmp_path / "snapshot")
+
+    unbounded = jwm.cache.LocalTTLCache()
+    unbounded.set(b"test_namespace", b"0", b"old_value")
+    unbounded.load(tmp_path / "snapshot")
+    assert unbounded.get(b"test_namespace", b"0") == b"snapshot"
+    assert unbounded.get_size(b"test_namespace") == 10
+    assert unbounded.get_bytes(b"test_namespace") == local_.get_bytes(b"test_namespace")
+
+    bounded = jwm.cache.LocalTTLCache(maxsize=4)
+    bounded.load(tmp_path / "snapshot")
+    assert bounded.get_size(b"test_namespace") == 4
+    assert bounded.get_evictions(b"test_namespace") == 6
+
+
+@pytest.mark.parametrize("contents", (b"", b"not a snapshot", b"JWMSNAP1"))
+def test_local_load_invalid(contents: bytes, tmp_path: pathlib.Path) -> None:
+    (tmp_path / "snapshot").write_bytes(contents)
+
+    with pytest.raises(ValueError):
+        jwm.cache.LocalTTLCache().load(tmp_path / "snapshot")
+
+
+def test_local_load_truncated(tmp_path: pathlib.Path) -> None:
+    local_ = jwm.cache.LocalTTLCache()
+    local_.set(b"test_namespace", b"a", b"1" * 100)
+    local_.dump(tmp_path / "snapshot")
+    snapshot = (tmp_path / "snapshot").read_bytes()
+    (tmp_path / "snapshot").write_bytes(snapshot[:-10])
+
+    loaded = jwm.cache.LocalTTLCache()
+    with pytest.raises(ValueError):
+        loaded.load(tmp_path / "snapshot")
+    assert loaded.get_size(b"test_namespace") == 0
+
+
+@pytest.mark.parametrize("shards", (1, 4))
+def test_local_get_set_many(shards: int) -> None:
+    local_ = jwm.cache.LocalTTLCache(shards=shards)
+    items = {str(index).encode(): b"%d" % (index * 2) for index in range(100)}
+
+    local_.set(b"test_namespace", b"0", b"old")
+    local_.set_many(b"test_namespace", items)
+    local_.set_many(b"test_namespace", {b"expired": b"1"}, ttl_seconds=0)
+
+    keys = [b"99", b"missing", b"0", b"expired"]
+    assert local_.get_many(b"test_namespace", keys) == [b"198", None, b"0", None]
+    assert local_.get_size(b"test_namespace") == 100
+    assert local_.get_bytes(b"test_namespace") == sum(
+        len(key) + len(value) + jwm._cache.ttl.local.ENTRY_OVERHEAD_BYTES
+        for key, value in items.items()
+    )
+
+
+def test_local_set_many_respects_maxsize() -> None:
+    local_ = jwm.cache.LocalTTLCache(maxsize=10)
+
+    local_.set_many(b"test_namespace", {b"%d" % index: b"1" for index in range(20)})
+
+    assert local_.get_size(b"test_namespace") == 10
+    assert local_.get_many(b"test_namespace", [b"0", b"19"]) == [None, b"1"]
+
+
+async def test_async_local_get_set_many() -> None:
+    local_ = jwm.cache.AsyncLocalTTLCache()
+
+    await local_.set_many(b"test_namespace", {b"a": b"1", b"b": b"2"}, ttl_seconds=0.1)
+
+    assert await local_.get_many(b"test_namespace", [b"b", b"c", b"a"]) == [
+        b"2",
+        None,
+        b"1",
+    ]
+    await asyncio.sleep(0.15)
+    assert await local_.get_many(b"test_namespace", [b"a"]) == [None]
+
+
+async def test_async_local_get_many_refreshes_recency() -> None:
+    local_ = jwm.cache.AsyncLocalTTLCache(maxsize=2)
+
+    await local_.set_many(b"test_namespace", {b"a": b"1", b"b": b"2"})
+    assert await local_.get_many(b"test_namespace", [b"a"]) == [b"1"]
+    await local_.set(b"test_namespace", b"c", b"3")
+
+    assert await local_.get_many(b"test_namespace", [b"a", b"b", b"c"]) == [
+        b"1",
+        None,
+        b"3",
+    ]
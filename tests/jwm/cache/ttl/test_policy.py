@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+import jwm._cache.ttl.policy
+import jwm.cache
+
+
+def test_lru_policy_victim() -> None:
+    policy = jwm.cache.LRUPolicy()
+
+    for key in ("a", "b", "c"):
+        policy.insert(key)
+    policy.access("a")
+    assert policy.victim() == "b"
+
+    policy.remove("b")
+    assert policy.victim() == "c"
+
+
+def test_count_min_sketch_frequency() -> None:
+    sketch = jwm._cache.ttl.policy.CountMinSketch(64)
+
+    for _ in range(5):
+        sketch.increment("hot")
+    sketch.increment("cold")
+
+    assert sketch.frequency("hot") >= 5
+    assert sketch.frequency("hot") > sketch.frequency("cold")
+
+
+def test_count_min_sketch_saturates() -> None:
+    sketch = jwm._cache.ttl.policy.CountMinSketch(1_024)
+
+    for _ in range(100):
+        sketch.increment("hot")
+
+    assert sketch.frequency("hot") == jwm._cache.ttl.policy.SKETCH_MAX_COUNT
+
+
+def test_wtinylfu_policy_keeps_frequent_keys() -> None:
+    policy = jwm.cache.WTinyLFUPolicy(capacity=100)
+
+    tracked = set(range(100))
+    for key in tracked:
+        policy.insert(key)
+    for _ in range(3):
+        for key in range(100):
+            policy.access(key)
+
+    # Scan keys are evicted rather than frequently used ones, int keys hash
+    # the same whatever PYTHONHASHSEED so the outcome is deterministic
+    for key in range(100, 1_100):
+        policy.insert(key)
+        tracked.add(key)
+
+        victim = policy.victim()
+        policy.remove(victim)
+        tracked.remove(victim)
+
+    assert len(tracked.intersection(range(100))) >= 98
+
+
+@pytest.mark.parametrize("policy", ("lru", "wtinylfu", jwm.cache.LRUPolicy))
+def test_local_policy(policy: str) -> None:
+    local_ = jwm.cache.LocalTTLCache(maxsize=2, policy=policy)
+
+    for key in (b"a", b"b", b"c"):
+        local_.set(b"test_namespace", key, b"1")
+
+    assert local_.get_size(b"test_namespace") == 2
+    assert local_.get_evictions(b"test_namespace") == 1
+
+
+def test_local_unknown_policy() -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.LocalTTLCache(maxsize=2, policy="unknown")
+
+
+def test_wtinylfu_scan_resistance() -> None:
+    random_ = random.Random(0)
+    hot_keys = [b"hot-%d" % index for index in range(50)]
+
+    trace: list[bytes] = []
+    for burst in range(20):
+        trace.extend(random_.choice(hot_keys) for _ in range(200))
+        trace.extend(b"scan-%d-%d" % (burst, index) for index in range(200))
+
+    ratios: dict[str, float] = {}
+    for policy in ("lru", "wtinylfu"):
+        local_ = jwm.cache.LocalTTLCache(maxsize=100, policy=policy)
+
+        hits = 0
+        for key in trace:
+            if local_.get(b"test_namespace", key) is not None:
+                hits += 1
+            else:
+                local_.set(b"test_namespace", key, b"1")
+        ratios[policy] = hits / len(trace)
+
+    assert ratios["wtinylfu"] > ratios["lru"]
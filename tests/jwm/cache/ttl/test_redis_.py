@@ -1,10 +1,16 @@
 import asyncio
 import collections.abc
+import concurrent.futures
+import inspect
+import sys
+import threading
 import time
 
 import fakeredis
 import pytest
 
+import jwm._cache.hash_
+import jwm._cache.ttl.redis_
 import jwm.cache
 
 
@@ -238,3 +244,401 @@ async def test_async_redis_expire(
     await async_redis_ttl_cache.set(namespace, key, value, ttl_seconds=ttl_seconds)
     await asyncio.sleep(ttl_seconds + 0.1)
     assert await async_redis_ttl_cache.get(namespace, key) == None
+
+
+def test_redis_clear_increments_generation(
+    sync_redis_client: fakeredis.FakeRedis,
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    for index in range(100):
+        sync_redis_ttl_cache.set(b"test_namespace", str(index).encode(), b"1")
+    sync_redis_ttl_cache.set(b"test_namespace_2", b"a", b"2")
+    key_count = sync_redis_client.dbsize()
+
+    sync_redis_ttl_cache.clear(b"test_namespace")
+
+    # Old generation keys are left to expire rather than deleted
+    assert sync_redis_client.dbsize() == key_count + 1
+    assert sync_redis_ttl_cache.get(b"test_namespace", b"0") is None
+    assert sync_redis_ttl_cache.get_size(b"test_namespace") == 0
+    assert sync_redis_ttl_cache.get(b"test_namespace_2", b"a") == b"2"
+
+    sync_redis_ttl_cache.set(b"test_namespace", b"0", b"3")
+    assert sync_redis_ttl_cache.get(b"test_namespace", b"0") == b"3"
+    assert sync_redis_ttl_cache.get_size(b"test_namespace") == 1
+
+
+def test_redis_generation_cached_locally(
+    sync_redis_client: fakeredis.FakeRedis,
+) -> None:
+    writer = jwm.cache.RedisTTLCache(sync_redis_client)
+    reader = jwm.cache.RedisTTLCache(sync_redis_client, generation_ttl_seconds=0.1)
+    writer.set(b"test_namespace", b"a", b"1")
+    assert reader.get(b"test_namespace", b"a") == b"1"
+
+    writer.clear(b"test_namespace")
+
+    assert writer.get(b"test_namespace", b"a") is None
+    assert reader.get(b"test_namespace", b"a") == b"1"
+    time.sleep(0.15)
+    assert reader.get(b"test_namespace", b"a") is None
+
+
+async def test_async_redis_clear_increments_generation(
+    async_redis_client: fakeredis.FakeAsyncRedis,
+    async_redis_ttl_cache: jwm.cache.AsyncRedisTTLCache,
+) -> None:
+    for index in range(100):
+        await async_redis_ttl_cache.set(b"test_namespace", str(index).encode(), b"1")
+    key_count = await async_redis_client.dbsize()
+
+    await async_redis_ttl_cache.clear(b"test_namespace")
+
+    assert await async_redis_client.dbsize() == key_count + 1
+    assert await async_redis_ttl_cache.get(b"test_namespace", b"0") is None
+    assert await async_redis_ttl_cache.get_size(b"test_namespace") == 0
+
+
+def test_redis_size_escapes_namespace(
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    sync_redis_ttl_cache.set(b"test_namespace_a", b"a", b"1")
+    sync_redis_ttl_cache.set(b"test_namespace_?", b"a", b"1")
+    sync_redis_ttl_cache.set(b"test_namespace_?", b"b", b"1")
+
+    assert sync_redis_ttl_cache.get_size(b"test_namespace_?") == 2
+
+
+def test_redis_expire_generation(sync_redis_client: fakeredis.FakeRedis) -> None:
+    writer = jwm.cache.RedisTTLCache(sync_redis_client)
+    reader = jwm.cache.RedisTTLCache(sync_redis_client, generation_ttl_seconds=60)
+    writer.set(b"test_namespace", b"a", b"1")
+    assert reader.get(b"test_namespace", b"a") == b"1"
+
+    writer.clear(b"test_namespace")
+    reader.expire_generation(b"test_namespace")
+
+    assert reader.get(b"test_namespace", b"a") is None
+
+
+def test_redis_size_does_not_scan(
+    monkeypatch: pytest.MonkeyPatch,
+    sync_redis_client: fakeredis.FakeRedis,
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    def scan(*args, **kwargs):
+        raise AssertionError("get_size must not scan the keyspace")
+
+    monkeypatch.setattr(sync_redis_client, "scan", scan)
+    sync_redis_ttl_cache.set(b"test_namespace", b"a", b"1", ttl_seconds=0.1)
+    sync_redis_ttl_cache.set(b"test_namespace", b"b", b"2")
+    sync_redis_ttl_cache.set(b"test_namespace", b"b", b"3")
+    sync_redis_ttl_cache.set(b"test_namespace", b"c", b"4")
+    sync_redis_ttl_cache.set(b"test_namespace", b"c", b"4", ttl_seconds=0)
+    assert sync_redis_ttl_cache.get_size(b"test_namespace") == 2
+
+    time.sleep(0.15)
+    assert sync_redis_ttl_cache.get_size(b"test_namespace") == 1
+
+
+def test_redis_size_index_expires(
+    sync_redis_client: fakeredis.FakeRedis,
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    sync_redis_ttl_cache.set(b"test_namespace", b"a", b"1", ttl_seconds=0.1)
+    sync_redis_ttl_cache.set(b"test_namespace", b"b", b"2", ttl_seconds=0.2)
+    sync_redis_ttl_cache.set(b"test_namespace", b"c", b"3", ttl_seconds=0.1)
+
+    time.sleep(0.25)
+    assert sync_redis_client.dbsize() == 0
+
+
+@pytest.mark.parametrize("locked", (False, True))
+def test_redis_size_index_bounded(
+    locked: bool,
+    sync_redis_client: fakeredis.FakeRedis,
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    index = jwm._cache.ttl.redis_._index_key(
+        jwm._cache.ttl.redis_._key_prefix(b"test_namespace", 0)
+    )
+
+    def set_(key: bytes) -> None:
+        if locked:
+            token = sync_redis_ttl_cache.acquire_lock(b"test_namespace", key, 1)
+            sync_redis_ttl_cache.set_locked(b"test_namespace", key, b"1", 0.05, token)
+        else:
+            sync_redis_ttl_cache.set(b"test_namespace", key, b"1", ttl_seconds=0.05)
+
+    # Steady writes keep the index alive, get_size is never called
+    for key in range(50):
+        set_(b"%d" % key)
+        time.sleep(0.01)
+
+    # Only the keys written within the last time to live remain indexed
+    assert sync_redis_client.zcard(index) <= 10
+
+
+async def test_async_redis_size_expires(
+    async_redis_ttl_cache: jwm.cache.AsyncRedisTTLCache,
+) -> None:
+    await async_redis_ttl_cache.set(b"test_namespace", b"a", b"1", ttl_seconds=0.1)
+    await async_redis_ttl_cache.set(b"test_namespace", b"b", b"2")
+    assert await async_redis_ttl_cache.get_size(b"test_namespace") == 2
+
+    await asyncio.sleep(0.15)
+    assert await async_redis_ttl_cache.get_size(b"test_namespace") == 1
+
+
+def test_redis_get_set_many(
+    monkeypatch: pytest.MonkeyPatch,
+    sync_redis_client: fakeredis.FakeRedis,
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    sync_redis_ttl_cache.set_many(b"test_namespace", {b"a": b"1", b"b": b"2"})
+    sync_redis_ttl_cache.set_many(b"test_namespace", {b"b": b"3"}, ttl_seconds=0)
+
+    def get(*args, **kwargs):
+        raise AssertionError("get_many must use a single MGET")
+
+    monkeypatch.setattr(sync_redis_client, "get", get)
+    assert sync_redis_ttl_cache.get_many(b"test_namespace", [b"a", b"b", b"c"]) == [
+        b"1",
+        None,
+        None,
+    ]
+    assert sync_redis_ttl_cache.get_many(b"test_namespace", []) == []
+    assert sync_redis_ttl_cache.get_size(b"test_namespace") == 1
+
+
+async def test_async_redis_get_set_many(
+    async_redis_ttl_cache: jwm.cache.AsyncRedisTTLCache,
+) -> None:
+    await async_redis_ttl_cache.set_many(
+        b"test_namespace", {b"a": b"1", b"b": b"2"}, ttl_seconds=0.1
+    )
+
+    assert await async_redis_ttl_cache.get_many(b"test_namespace", [b"b", b"a"]) == [
+        b"2",
+        b"1",
+    ]
+    assert await async_redis_ttl_cache.get_size(b"test_namespace") == 2
+    await asyncio.sleep(0.15)
+    assert await async_redis_ttl_cache.get_many(b"test_namespace", [b"a"]) == [None]
+
+
+def test_redis_lock_fencing(sync_redis_ttl_cache: jwm.cache.RedisTTLCache) -> None:
+    token = sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 0.1)
+    assert token is not None
+    assert sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 0.1) is None
+
+    # The holder stalls past its lock, a newer holder must win
+    time.sleep(0.15)
+    newer_token = sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 1)
+    assert newer_token > token
+    assert not sync_redis_ttl_cache.set_locked(b"test_namespace", b"a", b"1", 60, token)
+    assert sync_redis_ttl_cache.set_locked(
+        b"test_namespace", b"a", b"2", 60, newer_token
+    )
+
+    assert sync_redis_ttl_cache.get(b"test_namespace", b"a") == b"2"
+    assert sync_redis_ttl_cache.get_size(b"test_namespace") == 1
+    # Setting released the lock
+    released_token = sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 1)
+    assert released_token is not None
+
+    sync_redis_ttl_cache.release_lock(b"test_namespace", b"a", token)
+    assert sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 1) is None
+    sync_redis_ttl_cache.release_lock(b"test_namespace", b"a", released_token)
+    assert sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 1) is not None
+
+
+def test_redis_lock_fence_expires(
+    sync_redis_client: fakeredis.FakeRedis,
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    fence = jwm._cache.ttl.redis_._FENCE_PREFIX + b"test_namespace"
+
+    sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 1)
+    fence_ttl_ms = jwm._cache.ttl.redis_.FENCE_TTL_SECONDS * 1_000
+    assert fence_ttl_ms - 1_000 < sync_redis_client.pttl(fence) <= fence_ttl_ms
+
+    # The counter always outlives the locks it issued
+    long_ttl_seconds = jwm._cache.ttl.redis_.FENCE_TTL_SECONDS * 2
+    sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"b", long_ttl_seconds)
+    assert sync_redis_client.pttl(fence) > fence_ttl_ms
+
+
+def test_redis_lock_cleared_namespace(
+    sync_redis_ttl_cache: jwm.cache.RedisTTLCache,
+) -> None:
+    token = sync_redis_ttl_cache.acquire_lock(b"test_namespace", b"a", 1)
+    sync_redis_ttl_cache.clear(b"test_namespace")
+
+    assert not sync_redis_ttl_cache.set_locked(b"test_namespace", b"a", b"1", 60, token)
+    assert sync_redis_ttl_cache.get(b"test_namespace", b"a") is None
+
+
+def test_redis_ttl_cache_lock(sync_redis_client: fakeredis.FakeRedis) -> None:
+    calls = []
+
+    @jwm.cache.ttl_cache(
+        cache=jwm.cache.RedisTTLCache(sync_redis_client), lock_timeout_seconds=5
+    )
+    def slow(x: int) -> int:
+        calls.append(x)
+        time.sleep(0.2)
+        return x * 2
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(slow, [1] * 8))
+
+    assert results == [2] * 8
+    assert calls == [1]
+    assert slow.cache_parameters().lock_timeout_seconds == 5
+
+
+def test_redis_ttl_cache_lock_holder_fails(
+    sync_redis_client: fakeredis.FakeRedis,
+) -> None:
+    cache = jwm.cache.RedisTTLCache(sync_redis_client)
+    calls = []
+
+    @jwm.cache.ttl_cache(cache=cache, identifier="double", lock_timeout_seconds=5)
+    def double(x: int) -> int:
+        calls.append(x)
+        return x * 2
+
+    # Held by another process that fails without storing a value
+    hash_ = jwm._cache.hash_.hash_bound(
+        inspect.signature(double.__wrapped__).bind(1), typed=False
+    ).to_bytes(sys.hash_info.width, "little")
+    token = cache.acquire_lock(b"double", hash_, 60)
+    release = threading.Timer(0.1, cache.release_lock, (b"double", hash_, token))
+    release.start()
+
+    start = time.monotonic()
+    assert double(1) == 2
+    assert time.monotonic() - start < 1
+    assert calls == [1]
+    release.join()
+
+
+async def test_async_redis_ttl_cache_lock(
+    async_redis_client: fakeredis.FakeAsyncRedis,
+) -> None:
+    calls = []
+
+    @jwm.cache.ttl_cache(
+        cache=jwm.cache.AsyncRedisTTLCache(async_redis_client),
+        lock_timeout_seconds=5,
+    )
+    async def slow(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.1)
+        return x * 2
+
+    assert await asyncio.gather(*(slow(1) for _ in range(8))) == [2] * 8
+    assert calls == [1]
+
+
+async def test_async_redis_ttl_cache_lock_timeout(
+    async_redis_client: fakeredis.FakeAsyncRedis,
+) -> None:
+    cache = jwm.cache.AsyncRedisTTLCache(async_redis_client)
+    calls = []
+
+    @jwm.cache.ttl_cache(cache=cache, identifier="slow", lock_timeout_seconds=0.1)
+    async def slow(x: int) -> int:
+        calls.append(x)
+        return x
+
+    # Held by a caller that never finishes, waiters give up after the timeout
+    hash_ = jwm._cache.hash_.hash_bound(
+        inspect.signature(slow.__wrapped__).bind(1), typed=False
+    ).to_bytes(sys.hash_info.width, "little")
+    assert await cache.acquire_lock(b"slow", hash_, 60) is not None
+
+    start = time.monotonic()
+    assert await slow(1) == 1
+    assert 0.1 <= time.monotonic() - start < 1
+    assert calls == [1]
+    assert await slow(1) == 1
+    assert calls == [1]
+
+
+def test_ttl_cache_lock_unsupported() -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.ttl_cache(lock_timeout_seconds=1)
+    with pytest.raises(ValueError):
+        jwm.cache.ttl_cache(
+            cache=jwm.cache.RedisTTLCache(fakeredis.FakeRedis()),
+            lock_timeout_seconds=0,
+        )
+
+
+def test_redis_ttl_cache_stale_while_revalidate(
+    sync_redis_client: fakeredis.FakeRedis,
+) -> None:
+    calls = []
+    refreshed = threading.Event()
+
+    def make_wrapper() -> collections.abc.Callable[[int], int]:
+        # Each wrapper stands in for another process sharing the cache
+        @jwm.cache.ttl_cache(
+            ttl_seconds=0.1,
+            stale_ttl_seconds=5,
+            cache=jwm.cache.RedisTTLCache(sync_redis_client),
+            identifier="stale",
+            lock_timeout_seconds=5,
+        )
+        def count(x: int) -> int:
+            calls.append(x)
+            if len(calls) > 1:
+                refreshed.set()
+            return len(calls)
+
+        return count
+
+    first, second = make_wrapper(), make_wrapper()
+    assert first(1) == 1
+    assert second(1) == 1
+    time.sleep(0.15)
+
+    assert second(1) == 1
+    assert refreshed.wait(5)
+    time.sleep(0.05)
+    assert first(1) == 2
+    assert calls == [1, 1]
+
+    # Entries outlive ttl_seconds by stale_ttl_seconds
+    (key,) = sync_redis_client.scan_iter(b"stale\0*")
+    assert sync_redis_client.pttl(key) > 1000
+
+
+def test_redis_ttl_cache_cache_exceptions(
+    sync_redis_client: fakeredis.FakeRedis,
+) -> None:
+    calls = []
+
+    def make_wrapper() -> collections.abc.Callable[[int], int]:
+        @jwm.cache.ttl_cache(
+            cache=jwm.cache.RedisTTLCache(sync_redis_client),
+            identifier="failing",
+            serializer="json",
+            lock_timeout_seconds=5,
+            cache_exceptions=(TimeoutError,),
+        )
+        def fetch(x: int) -> int:
+            calls.append(x)
+            raise TimeoutError("down")
+
+        return fetch
+
+    # Cached exceptions are shared across processes and release the lock
+    first, second = make_wrapper(), make_wrapper()
+    for fetch in (first, second, first):
+        with pytest.raises(TimeoutError, match="down"):
+            fetch(1)
+    assert calls == [1]
+    assert list(sync_redis_client.scan_iter(b"jwm.cache.lock:*")) == []
@@ -0,0 +1,194 @@
+import collections.abc
+import concurrent.futures
+import pathlib
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+import jwm.cache
+
+pytestmark = pytest.mark.skipif(
+    not jwm.cache.HAS_TTL_SHARED_CACHE, reason="Requires POSIX record locks"
+)
+
+
+@pytest.fixture
+def shared_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    return tmp_path / "shared_ttl_cache"
+
+
+@pytest.fixture
+def shared_ttl_cache(
+    shared_path: pathlib.Path,
+) -> collections.abc.Iterator[jwm.cache.SharedTTLCache]:
+    cache = jwm.cache.SharedTTLCache(shared_path, capacity=256, slab_bytes=1 << 20)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize(
+    "namespace, keys, values",
+    (
+        (b"test_namespace", (b"a", b"b", b"c"), (b"1", b"2", b"3")),
+        (b"test_namespace_2", (b"ca", b"bb", b"ac"), (b"31", b"22", b"13")),
+    ),
+)
+def test_shared_single_namespace(
+    namespace: bytes,
+    keys: collections.abc.Sequence[bytes],
+    values: collections.abc.Sequence[bytes],
+    shared_ttl_cache: jwm.cache.SharedTTLCache,
+) -> None:
+    for key, value in zip(keys, values):
+        shared_ttl_cache.set(namespace, key, value)
+
+    for key, value in zip(keys, values):
+        assert shared_ttl_cache.get(namespace, key) == value
+
+
+@pytest.mark.parametrize(
+    "namespaces, keyss, valuess",
+    (
+        (
+            (b"test_namespace_a", b"test_namespace_b"),
+            ((b"a", b"b", b"c"), (b"d", b"e", b"f")),
+            ((b"1", b"2", b"3"), (b"4", b"5", b"6")),
+        ),
+        (
+            (b"test_namespace_2", b"test_namespace_1"),
+            ((b"fa", b"eb", b"dc"), (b"cd", b"be", b"af")),
+            ((b"61", b"52", b"43"), (b"34", b"25", b"16")),
+        ),
+    ),
+)
+def test_shared_multiple_namespaces(
+    namespaces: collections.abc.Sequence[bytes],
+    keyss: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    valuess: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    shared_ttl_cache: jwm.cache.SharedTTLCache,
+) -> None:
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            shared_ttl_cache.set(namespace, key, value)
+
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            assert shared_ttl_cache.get(namespace, key) == value
+        assert shared_ttl_cache.get_size(namespace) == len(keys)
+
+
+def test_shared_overwrite_and_clear(
+    shared_ttl_cache: jwm.cache.SharedTTLCache,
+) -> None:
+    shared_ttl_cache.set(b"test_namespace", b"a", b"1")
+    shared_ttl_cache.set(b"test_namespace", b"a", b"2" * 1_000)
+    shared_ttl_cache.set(b"test_namespace_2", b"a", b"3")
+
+    assert shared_ttl_cache.get(b"test_namespace", b"a") == b"2" * 1_000
+    assert shared_ttl_cache.get_size(b"test_namespace") == 1
+
+    shared_ttl_cache.clear(b"test_namespace")
+    assert shared_ttl_cache.get(b"test_namespace", b"a") is None
+    assert shared_ttl_cache.get(b"test_namespace_2", b"a") == b"3"
+
+
+@pytest.mark.parametrize("ttl_seconds", (0.1, 0))
+def test_shared_expire(
+    ttl_seconds: float, shared_ttl_cache: jwm.cache.SharedTTLCache
+) -> None:
+    shared_ttl_cache.set(b"test_namespace", b"a", b"1", ttl_seconds=ttl_seconds)
+
+    time.sleep(ttl_seconds + 0.1)
+    assert shared_ttl_cache.get(b"test_namespace", b"a") is None
+    assert shared_ttl_cache.get_size(b"test_namespace") == 0
+
+
+def test_shared_reclaims_space(shared_ttl_cache: jwm.cache.SharedTTLCache) -> None:
+    # Far more entries than there are slots or chunks
+    for index in range(5_000):
+        shared_ttl_cache.set(b"test_namespace", str(index).encode(), b"1" * 100)
+
+    assert shared_ttl_cache.get(b"test_namespace", b"4999") == b"1" * 100
+    assert 0 < shared_ttl_cache.get_size(b"test_namespace") <= 256
+
+
+def test_shared_value_too_large(shared_ttl_cache: jwm.cache.SharedTTLCache) -> None:
+    shared_ttl_cache.set(b"test_namespace", b"a", b"1")
+    shared_ttl_cache.set(b"test_namespace", b"a", b"2" * (2 * 1024 * 1024))
+
+    assert shared_ttl_cache.get(b"test_namespace", b"a") is None
+
+
+def test_shared_across_processes(
+    shared_path: pathlib.Path, shared_ttl_cache: jwm.cache.SharedTTLCache
+) -> None:
+    shared_ttl_cache.set(b"test_namespace", b"parent", b"1")
+
+    process = subprocess.run(
+        (
+            sys.executable,
+            "-c",
+            textwrap.dedent(f"""
+                    import jwm.cache;
+                    cache = jwm.cache.SharedTTLCache({str(shared_path)!r});
+                    cache.set(b"test_namespace", b"child", b"2");
+                    print(cache.get(b"test_namespace", b"parent"), end="")
+                """).replace("\n", ""),
+        ),
+        capture_output=True,
+    )
+
+    assert process.stdout == b"b'1'"
+    assert shared_ttl_cache.get(b"test_namespace", b"child") == b"2"
+
+
+def test_shared_same_file_in_process(
+    shared_path: pathlib.Path, shared_ttl_cache: jwm.cache.SharedTTLCache
+) -> None:
+    link = shared_path.with_name("shared_ttl_cache_link")
+    link.symlink_to(shared_path)
+    other = jwm.cache.SharedTTLCache(link)
+
+    def set_get(i: int) -> bool:
+        cache = (shared_ttl_cache, other)[i % 2]
+        key = str(i).encode()
+        cache.set(b"test_namespace", key, key * 64)
+        return cache.get(b"test_namespace", key) == key * 64
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        assert all(executor.map(set_get, range(128)))
+
+    for i in range(128):
+        key = str(i).encode()
+        assert other.get(b"test_namespace", key) == key * 64
+
+    # A record held through one instance excludes the other
+    acquired = threading.Event()
+
+    def lock_other() -> None:
+        with other._bucket_lock(0):
+            acquired.set()
+
+    with shared_ttl_cache._bucket_lock(0):
+        thread = threading.Thread(target=lock_other)
+        thread.start()
+        assert not acquired.wait(0.1)
+    thread.join()
+    assert acquired.is_set()
+
+    # Closing one instance keeps the file mapped and locked for the other
+    other.close()
+    shared_ttl_cache.set(b"test_namespace", b"a", b"1")
+    assert shared_ttl_cache.get(b"test_namespace", b"a") == b"1"
+
+
+def test_shared_not_cache_file(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "not_a_cache"
+    path.write_bytes(b"0" * 1_024)
+
+    with pytest.raises(ValueError):
+        jwm.cache.SharedTTLCache(path)
@@ -0,0 +1,205 @@
+import asyncio
+import collections.abc
+import pathlib
+import sqlite3
+import time
+
+import pytest
+
+import jwm.cache
+
+
+@pytest.fixture
+def sqlite_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    return tmp_path / "ttl_cache.sqlite3"
+
+
+def _row_count(path: pathlib.Path) -> int:
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM ttl_cache").fetchone()[0]
+
+
+@pytest.mark.parametrize(
+    "namespaces, keyss, valuess",
+    (
+        (
+            (b"test_namespace_a", b"test_namespace_b"),
+            ((b"a", b"b", b"c"), (b"d", b"e", b"f")),
+            ((b"1", b"2", b"3"), (b"4", b"5", b"6")),
+        ),
+        (
+            (b"test_namespace_2", b"test_namespace_1"),
+            ((b"fa", b"eb", b"dc"), (b"cd", b"be", b"af")),
+            ((b"61", b"52", b"43"), (b"34", b"25", b"16")),
+        ),
+    ),
+)
+def test_sync_sqlite_multiple_namespaces(
+    namespaces: collections.abc.Sequence[bytes],
+    keyss: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    valuess: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    sqlite_path: pathlib.Path,
+) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(sqlite_path)
+
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            sqlite_.set(namespace, key, value)
+
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            assert sqlite_.get(namespace, key) == value
+        assert sqlite_.get_size(namespace) == len(keys)
+
+    sqlite_.clear(namespaces[0])
+    assert sqlite_.get_size(namespaces[0]) == 0
+    assert sqlite_.get_size(namespaces[1]) == len(keyss[1])
+
+
+@pytest.mark.parametrize(
+    "namespaces, keyss, valuess",
+    (
+        (
+            (b"test_namespace_a", b"test_namespace_b"),
+            ((b"a", b"b", b"c"), (b"d", b"e", b"f")),
+            ((b"1", b"2", b"3"), (b"4", b"5", b"6")),
+        ),
+    ),
+)
+async def test_async_sqlite_multiple_namespaces(
+    namespaces: collections.abc.Sequence[bytes],
+    keyss: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    valuess: collections.abc.Sequence[collections.abc.Sequence[bytes]],
+    sqlite_path: pathlib.Path,
+) -> None:
+    sqlite_ = jwm.cache.AsyncSQLiteTTLCache(sqlite_path)
+
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            await sqlite_.set(namespace, key, value)
+
+    for namespace, keys, values in zip(namespaces, keyss, valuess):
+        for key, value in zip(keys, values):
+            assert await sqlite_.get(namespace, key) == value
+        assert await sqlite_.get_size(namespace) == len(keys)
+
+    await sqlite_.clear(namespaces[0])
+    assert await sqlite_.get_size(namespaces[0]) == 0
+    assert await sqlite_.get_size(namespaces[1]) == len(keyss[1])
+
+    await sqlite_.close()
+
+
+@pytest.mark.parametrize("ttl_seconds", (0.1, 0))
+def test_sync_sqlite_expire(ttl_seconds: float, sqlite_path: pathlib.Path) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(sqlite_path)
+
+    sqlite_.set(b"test_namespace", b"a", b"1", ttl_seconds=ttl_seconds)
+
+    time.sleep(ttl_seconds + 0.1)
+    assert sqlite_.get(b"test_namespace", b"a") is None
+    assert sqlite_.get_size(b"test_namespace") == 0
+
+
+@pytest.mark.parametrize("ttl_seconds", (0.1, 0))
+async def test_async_sqlite_expire(
+    ttl_seconds: float, sqlite_path: pathlib.Path
+) -> None:
+    sqlite_ = jwm.cache.AsyncSQLiteTTLCache(sqlite_path)
+
+    await sqlite_.set(b"test_namespace", b"a", b"1", ttl_seconds=ttl_seconds)
+
+    await asyncio.sleep(ttl_seconds + 0.1)
+    assert await sqlite_.get(b"test_namespace", b"a") is None
+    assert await sqlite_.get_size(b"test_namespace") == 0
+
+
+def test_sync_sqlite_persists(sqlite_path: pathlib.Path) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(sqlite_path)
+    sqlite_.set(b"test_namespace", b"a", b"1")
+    sqlite_.close()
+
+    reopened = jwm.cache.SQLiteTTLCache(sqlite_path)
+    assert reopened.get(b"test_namespace", b"a") == b"1"
+
+
+def test_sync_sqlite_batches_writes(sqlite_path: pathlib.Path) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(
+        sqlite_path, batch_size=10, flush_interval_seconds=60
+    )
+
+    for index in range(5):
+        sqlite_.set(b"test_namespace", str(index).encode(), b"1")
+    # Buffered writes are visible before they are flushed
+    assert sqlite_.get(b"test_namespace", b"4") == b"1"
+    assert _row_count(sqlite_path) == 0
+
+    for index in range(5, 10):
+        sqlite_.set(b"test_namespace", str(index).encode(), b"1")
+    assert _row_count(sqlite_path) == 10
+
+
+def test_sync_sqlite_flushes_in_background(sqlite_path: pathlib.Path) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(sqlite_path, flush_interval_seconds=0.01)
+
+    sqlite_.set(b"test_namespace", b"a", b"1")
+
+    time.sleep(0.2)
+    assert _row_count(sqlite_path) == 1
+
+
+def test_sync_sqlite_maintenance_recovers(
+    sqlite_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(
+        sqlite_path, flush_interval_seconds=0.01, purge_interval_seconds=0.05
+    )
+    store = sqlite_._store
+    failures = {"flush": 0, "purge": 0}
+
+    def failing_once(name: str) -> collections.abc.Callable[[], None]:
+        original = getattr(store, name)
+
+        def method() -> None:
+            if failures[name] == 0:
+                failures[name] += 1
+                raise sqlite3.OperationalError("database is locked")
+            original()
+
+        return method
+
+    monkeypatch.setattr(store, "flush", failing_once("flush"))
+    monkeypatch.setattr(store, "purge", failing_once("purge"))
+
+    sqlite_.set(b"test_namespace", b"expired", b"1", ttl_seconds=0)
+    sqlite_.set(b"test_namespace", b"a", b"1")
+
+    # Writes buffered during the failure are flushed by a later pass
+    time.sleep(0.5)
+    assert failures == {"flush": 1, "purge": 1}
+    assert _row_count(sqlite_path) == 1
+    assert sqlite_.get(b"test_namespace", b"a") == b"1"
+
+
+def test_sync_sqlite_purges_expired(sqlite_path: pathlib.Path) -> None:
+    sqlite_ = jwm.cache.SQLiteTTLCache(
+        sqlite_path, purge_interval_seconds=0.1, purge_batch_size=2
+    )
+
+    for index in range(5):
+        sqlite_.set(b"test_namespace", str(index).encode(), b"1", ttl_seconds=0)
+    sqlite_.set(b"test_namespace", b"live", b"1")
+
+    time.sleep(0.5)
+    assert _row_count(sqlite_path) == 1
+    assert sqlite_.get(b"test_namespace", b"live") == b"1"
+
+
+@pytest.mark.parametrize(
+    "kwargs", ({"batch_size": 0}, {"purge_batch_size": 0}, {"purge_batch_size": -1})
+)
+def test_sqlite_invalid_batch_sizes(
+    kwargs: dict[str, int], sqlite_path: pathlib.Path
+) -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.SQLiteTTLCache(sqlite_path, **kwargs)
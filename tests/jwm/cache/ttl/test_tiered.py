@@ -0,0 +1,156 @@
+import time
+
+import fakeredis
+import pytest
+
+import jwm.cache
+
+
+def test_sync_tiered_read_through_and_promote() -> None:
+    l1 = jwm.cache.LocalTTLCache()
+    l2 = jwm.cache.RedisTTLCache(fakeredis.FakeRedis())
+    tiered = jwm.cache.TieredTTLCache((l1, l2))
+
+    l2.set(b"test_namespace", b"a", b"1")
+
+    assert tiered.get(b"test_namespace", b"a") == b"1"
+    assert l1.get(b"test_namespace", b"a") == b"1"
+    assert tiered.get(b"test_namespace", b"a") == b"1"
+    assert tiered.get(b"test_namespace", b"b") is None
+    assert tiered.get_tier_hits(b"test_namespace") == (1, 1)
+
+
+async def test_async_tiered_read_through_and_promote() -> None:
+    l1 = jwm.cache.AsyncLocalTTLCache()
+    l2 = jwm.cache.AsyncRedisTTLCache(fakeredis.FakeAsyncRedis())
+    tiered = jwm.cache.AsyncTieredTTLCache((l1, l2))
+
+    await l2.set(b"test_namespace", b"a", b"1")
+
+    assert await tiered.get(b"test_namespace", b"a") == b"1"
+    assert await l1.get(b"test_namespace", b"a") == b"1"
+    assert await tiered.get(b"test_namespace", b"a") == b"1"
+    assert await tiered.get(b"test_namespace", b"b") is None
+    assert await tiered.get_tier_hits(b"test_namespace") == (1, 1)
+
+
+def test_sync_tiered_write_through_and_clear() -> None:
+    l1 = jwm.cache.LocalTTLCache()
+    l2 = jwm.cache.LocalTTLCache()
+    tiered = jwm.cache.TieredTTLCache((l1, l2))
+
+    tiered.set(b"test_namespace", b"a", b"1")
+    assert l1.get(b"test_namespace", b"a") == b"1"
+    assert l2.get(b"test_namespace", b"a") == b"1"
+    assert tiered.get_size(b"test_namespace") == 1
+
+    tiered.get(b"test_namespace", b"a")
+    tiered.clear(b"test_namespace")
+    assert l1.get_size(b"test_namespace") == 0
+    assert l2.get_size(b"test_namespace") == 0
+    assert tiered.get_tier_hits(b"test_namespace") == (0, 0)
+
+
+async def test_async_tiered_mixed_tiers() -> None:
+    l1 = jwm.cache.LocalTTLCache()
+    l2 = jwm.cache.AsyncLocalTTLCache()
+    tiered = jwm.cache.AsyncTieredTTLCache((l1, l2))
+
+    await tiered.set(b"test_namespace", b"a", b"1")
+    assert l1.get(b"test_namespace", b"a") == b"1"
+    assert await l2.get(b"test_namespace", b"a") == b"1"
+
+    await tiered.clear(b"test_namespace")
+    assert await tiered.get(b"test_namespace", b"a") is None
+
+
+def test_sync_tiered_promote_ttl() -> None:
+    l1 = jwm.cache.LocalTTLCache()
+    l2 = jwm.cache.LocalTTLCache()
+    tiered = jwm.cache.TieredTTLCache((l1, l2), promote_ttl_seconds=0.1)
+
+    tiered.set(b"test_namespace", b"a", b"1")
+    l2.set(b"test_namespace", b"b", b"2")
+    assert tiered.get(b"test_namespace", b"b") == b"2"
+
+    time.sleep(0.2)
+    assert l1.get(b"test_namespace", b"a") is None
+    assert l1.get(b"test_namespace", b"b") is None
+    assert tiered.get(b"test_namespace", b"a") == b"1"
+
+
+def test_tiered_no_tiers() -> None:
+    with pytest.raises(ValueError):
+        jwm.cache.TieredTTLCache(())
+
+
+def test_tiered_cache_info() -> None:
+    tiered = jwm.cache.TieredTTLCache(
+        (jwm.cache.LocalTTLCache(), jwm.cache.LocalTTLCache())
+    )
+
+    @jwm.cache.ttl_cache(cache=tiered)
+    def identity(value: int) -> int:
+        return value
+
+    identity(1)
+    identity(1)
+
+    info = identity.cache_info()
+    assert info.hits == 1
+    assert info.tier_hits == (1, 0)
+
+
+class _SingleKeyCache:
+    "Third party style cache with only the single key methods."
+
+    def __init__(self) -> None:
+        self.values: dict[tuple[bytes, bytes], bytes] = {}
+
+    def get(self, namespace: bytes, key: bytes) -> bytes | None:
+        return self.values.get((namespace, key), None)
+
+    def set(
+        self, namespace: bytes, key: bytes, value: bytes, ttl_seconds: float = 60
+    ) -> None:
+        self.values[(namespace, key)] = value
+
+    def clear(self, namespace: bytes) -> None:
+        self.values = {k: v for k, v in self.values.items() if k[0] != namespace}
+
+    def get_size(self, namespace: bytes) -> int:
+        return sum(1 for k in self.values if k[0] == namespace)
+
+
+def test_sync_tiered_get_set_many() -> None:
+    l1 = jwm.cache.LocalTTLCache()
+    l2 = _SingleKeyCache()
+    l3 = jwm.cache.RedisTTLCache(fakeredis.FakeRedis())
+    tiered = jwm.cache.TieredTTLCache((l1, l2, l3))
+
+    tiered.set_many(b"test_namespace", {b"a": b"1"})
+    l2.set(b"test_namespace", b"b", b"2")
+    l3.set(b"test_namespace", b"c", b"3")
+
+    keys = [b"a", b"b", b"c", b"d"]
+    assert tiered.get_many(b"test_namespace", keys) == [b"1", b"2", b"3", None]
+    assert l1.get_many(b"test_namespace", keys) == [b"1", b"2", b"3", None]
+    assert l2.get(b"test_namespace", b"c") == b"3"
+    assert tiered.get_tier_hits(b"test_namespace") == (1, 1, 1)
+
+
+async def test_async_tiered_get_set_many() -> None:
+    l1 = jwm.cache.AsyncLocalTTLCache()
+    l2 = jwm.cache.AsyncRedisTTLCache(fakeredis.FakeAsyncRedis())
+    tiered = jwm.cache.AsyncTieredTTLCache((l1, l2))
+
+    await tiered.set_many(b"test_namespace", {b"a": b"1", b"b": b"2"})
+    await l1.clear(b"test_namespace")
+
+    assert await tiered.get_many(b"test_namespace", [b"b", b"c", b"a"]) == [
+        b"2",
+        None,
+        b"1",
+    ]
+    assert await l1.get_many(b"test_namespace", [b"a", b"b"]) == [b"1", b"2"]
+    assert await tiered.get_tier_hits(b"test_namespace") == (0, 2)